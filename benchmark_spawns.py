@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Spawn Load Simulator
+Drives PokemonBot.on_message with synthetic chat across many fake channels
+and users, and records throughput, spawn/catch latency and database queries
+per message to a JSON file so runs can be compared across commits.
+
+    python benchmark_spawns.py --messages 20000 --channels 2000 --users 5000
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot import PokemonBot
+from database.db_manager import DatabaseManager
+
+WORDS = ['hello', 'gg', 'anyone', 'trade', 'battle', 'lol', 'nice', 'catch', 'shiny', 'when', 'spawn', 'ok']
+
+
+class StubGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class StubAuthor:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.bot = False
+        self.display_name = f"Trainer{user_id}"
+        self.name = self.display_name
+        self.mention = f"<@{user_id}>"
+
+
+class StubMessage:
+    def __init__(self, message_id: int, content: str, author, channel):
+        self.id = message_id
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self._state = None  # read by commands.Context
+        self.embeds = []
+        self.attachments = []
+        self.edits = []
+
+    async def edit(self, **kwargs):
+        self.edits.append(kwargs)
+        return self
+
+
+class StubChannel:
+    """Records everything the bot sends instead of calling Discord"""
+
+    message_ids = itertools.count(1)
+
+    def __init__(self, channel_id: int, guild):
+        self.id = channel_id
+        self.guild = guild
+        self.mention = f"<#{channel_id}>"
+        self.sent: List[Dict[str, Any]] = []
+
+    async def send(self, content=None, **kwargs):
+        message = StubMessage(next(self.message_ids), content or '', None, self)
+        self.sent.append({'time': time.perf_counter(), 'content': content, **kwargs})
+        return message
+
+    def get_partial_message(self, message_id: int):
+        return StubMessage(message_id, '', None, self)
+
+
+class OfflineRenderer:
+    """Skips sprite downloads; spawns go out with the thumbnail fallback"""
+
+    async def render_silhouette(self, sprite_url):
+        return None
+
+    async def close(self):
+        pass
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max in milliseconds"""
+    if not samples:
+        return {'count': 0, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {'count': len(ordered), 'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99), 'max': at(1.0)}
+
+
+def seed_species(db_path: str, count: int):
+    """Fill an empty species table with synthetic rows"""
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    categories = ['normal'] * 95 + ['legendary', 'mythical', 'ultra_beast'] * 2
+    with conn:
+        conn.executemany("""
+            INSERT INTO pokemon_species (
+                pokemon_id, name, pokedex_number, type1, base_hp, base_attack, base_defense,
+                base_sp_attack, base_sp_defense, base_speed, height, weight, category, generation
+            ) VALUES (?, ?, ?, 'normal', ?, ?, ?, ?, ?, ?, 10, 100, ?, ?)
+        """, [
+            (i, f"mon{i}", i, *[random.randint(30, 130) for _ in range(6)],
+             random.choice(categories), 1 + (i - 1) * 9 // count)
+            for i in range(1, count + 1)
+        ])
+    conn.close()
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='spawn_bench_')
+
+    bot = PokemonBot()
+    reference = args.reference if args.reference and os.path.exists(args.reference) else None
+    bot.db = DatabaseManager(os.path.join(workdir, 'bench.db'), reference)
+    bot.config.persist_cooldowns = False
+
+    try:
+        await bot.setup_hook()
+        bot.spawn_task.cancel()
+        bot.cleanup_task.cancel()
+        bot.spawn_system.renderer = OfflineRenderer()
+        if args.spawn_cooldown is not None:
+            bot.spawn_system.cooldown_time = args.spawn_cooldown
+
+        # get_context compares message authors against the logged-in user
+        bot._connection.user = StubAuthor(0)
+
+        species = await bot.db.fetch_val("SELECT COUNT(*) FROM pokemon_species")
+        if not species:
+            if reference:
+                raise RuntimeError(f"Reference database {reference} has no species")
+            seed_species(os.path.join(workdir, 'bench.db'), args.species)
+            await bot.spawn_system.sampler.refresh_catalog(bot.db)
+
+        guilds = [StubGuild(10_000 + i) for i in range(args.guilds)]
+        channels = [StubChannel(100_000 + i, guilds[i % len(guilds)]) for i in range(args.channels)]
+        users = [StubAuthor(1_000_000 + i) for i in range(args.users)]
+
+        queries = itertools.count()
+        await bot.db.pool.set_trace_callback(lambda statement: next(queries))
+        base_queries = next(queries)
+
+        spawn_latency: List[float] = []
+        catch_latency: List[float] = []
+        message_ids = itertools.count(1)
+        sent_messages = itertools.count()
+
+        # Spawns claimed per chatter task, counted where the claim is decided
+        catches_won: Dict[asyncio.Task, int] = {}
+        catch_spawn = bot.db.catch_spawn
+
+        async def counted_catch_spawn(*args, **kwargs):
+            caught = await catch_spawn(*args, **kwargs)
+            if caught:
+                task = asyncio.current_task()
+                catches_won[task] = catches_won.get(task, 0) + 1
+            return caught
+
+        bot.db.catch_spawn = counted_catch_spawn
+
+        async def tick():
+            # Scheduler ticks are driven by message count so runs are reproducible
+            for channel in bot.spawn_scheduler.tick():
+                started = time.perf_counter()
+                if await bot.spawn_system.handle_spawn(channel):
+                    spawn_latency.append(time.perf_counter() - started)
+                else:
+                    bot.spawn_scheduler.refund(channel)
+
+        async def chatter():
+            while True:
+                index = next(sent_messages)
+                if index >= args.messages:
+                    return
+                if index and index % args.tick_every == 0:
+                    await tick()
+
+                channel = rng.choice(channels)
+                author = rng.choice(users)
+                active = bot.spawn_system.registry.get(str(channel.id))
+                if active and rng.random() < args.catch_ratio:
+                    content = active[0]['name']
+                else:
+                    content = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+
+                message = StubMessage(next(message_ids), content, author, channel)
+                task = asyncio.current_task()
+                won = catches_won.get(task, 0)
+                started = time.perf_counter()
+                await bot.on_message(message)
+                # Only a message whose catch_spawn claimed the spawn counts; naming it after someone else did doesn't
+                if catches_won.get(task, 0) > won:
+                    catch_latency.append(time.perf_counter() - started)
+
+                # on_message may not await anything; let queued sends and background work run
+                await asyncio.sleep(0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(chatter() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        total_queries = next(queries) - base_queries - 1
+        sends = sum(len(channel.sent) for channel in channels)
+
+        return {
+            'commit': current_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'params': vars(args),
+            'messages': args.messages,
+            'elapsed_seconds': round(elapsed, 3),
+            'messages_per_second': round(args.messages / elapsed, 1),
+            'spawns': len(spawn_latency),
+            'catches': len(catch_latency),
+            'spawn_latency_ms': percentiles(spawn_latency),
+            'catch_latency_ms': percentiles(catch_latency),
+            'db_queries': total_queries,
+            'db_queries_per_message': round(total_queries / args.messages, 4),
+            'messages_sent': sends
+        }
+    finally:
+        # Also runs when setup fails, so the database thread doesn't keep the process alive
+        await bot.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the spawn and catch path against fake channels")
+    parser.add_argument('--messages', type=int, default=20000, help="Synthetic chat messages to send")
+    parser.add_argument('--channels', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--guilds', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=32, help="Messages in flight at once")
+    parser.add_argument('--catch-ratio', type=float, default=0.3,
+                        help="Chance a message in a channel with a spawn names it")
+    parser.add_argument('--tick-every', type=int, default=100,
+                        help="Messages between spawn scheduler ticks (each tick stands for spawn_tick_seconds)")
+    parser.add_argument('--spawn-cooldown', type=float, default=None,
+                        help="Override the per-channel spawn cooldown in seconds (0 to stress spawning)")
+    parser.add_argument('--species', type=int, default=1008,
+                        help="Synthetic species to create when no species data is available")
+    parser.add_argument('--reference', default='data/reference.db',
+                        help="Reference database to attach read-only, if it exists")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='spawn_benchmark.json')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        results = asyncio.run(run(args))
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        sys.exit(1)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+
+    print(f"✅ {results['messages_per_second']} msg/s, {results['spawns']} spawns, {results['catches']} catches, "
+          f"{results['db_queries_per_message']} queries/msg -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,19 @@ import logging
 logger = logging.getLogger(__name__)
 import os
 from datetime import datetime, timedelta
-import random
 import json
 
 from config import Config
 from database.db_manager import DatabaseManager
+from database.reference_snapshot import load_snapshot
+from database.npc_teams import load_npc_teams
 from pokemon.pokeapi_client import PokeAPIClient
 from utils.battle_system import BattleSystem
 from utils.spawn_system import SpawnSystem
+from utils.spawn_scheduler import SpawnScheduler
+from utils.timer_wheel import TimerService
+from utils.message_dispatcher import MessageDispatcher
+from utils.guild_settings import GuildSettingsCache
 from utils.economy_system import EconomySystem
 # from utils.mission_system import MissionSystem
 from utils.fishing_system import FishingSystem
@@ -49,16 +54,23 @@ class PokemonBot(commands.Bot):
         )
         
         self.config = Config()
-        self.db = DatabaseManager(self.config.database_path)
+        self.db = DatabaseManager(self.config.database_path, self.config.reference_database_path)
+        self.timers = TimerService()
+        self.dispatcher = MessageDispatcher()
         self.pokeapi = None
+        self.reference = None
+        self.npc_teams = None
         self.battle_system = None
         self.spawn_system = None
+        self.spawn_scheduler = None
+        self.guild_settings = None
         self.economy_system = None
      #   self.mission_system = None
         self.fishing_system = None
     #    self.market_system = None
     #    self.trading_system = None
         self.tournament_system = None
+        self.cooldown_stores = []
         
         # Active sessions
         self.active_battles = {}
@@ -73,20 +85,59 @@ class PokemonBot(commands.Bot):
         # Initialize database
         await self.db.initialize()
         
+        # Map the static reference data snapshot; it is tied to the separate reference DB file
+        if self.db.reference_attached:
+            self.reference = load_snapshot(self.config.reference_snapshot_path, self.db.reference_db_path)
+        
+        # Prebuilt NPC parties; NPC battles are unavailable until the pool is built
+        self.npc_teams = load_npc_teams(self.config.npc_team_pool_path)
+        
         # Initialize PokeAPI client
         self.pokeapi = PokeAPIClient(self.db)
         await self.pokeapi.initialize()
         
+        # Per-guild spawn channels, rates and disabled features, read from memory
+        self.guild_settings = GuildSettingsCache(self.db)
+        await self.guild_settings.load()
+        
         # Initialize systems
-        self.battle_system = BattleSystem(self.db, self.config)
-        self.spawn_system = SpawnSystem(self.db, self.config)
+        self.battle_system = BattleSystem(
+            self.db, self.config, timers=self.timers, dispatcher=self.dispatcher, reference=self.reference
+        )
+        self.spawn_system = SpawnSystem(
+            self.db, self.config, bot=self, timers=self.timers,
+            dispatcher=self.dispatcher, guild_settings=self.guild_settings
+        )
+        self.spawn_scheduler = SpawnScheduler(self.config, self.spawn_system.registry, guild_settings=self.guild_settings)
         self.economy_system = EconomySystem(self.db, self.config)
 #        self.mission_system = MissionSystem(self.db, self.config)
         self.fishing_system = FishingSystem(self.db, self.config)
-#        self.market_system = MarketSystem(self.db, self.config)
-#        self.trading_system = TradingSystem(self.db, self.config)
+#        self.market_system = MarketSystem(self.db, self.config, timers=self.timers)
+#        self.trading_system = TradingSystem(self.db, self.config, timers=self.timers)
         self.tournament_system = TournamentSystem(self.db, self.config)
         
+        # Catalogs load straight from the snapshot when available
+        if self.reference:
+            self.spawn_system.sampler.load_catalog(
+                self.reference.species.iter_columns('pokemon_id', 'category', 'generation')
+            )
+        
+        # Rebuild the in-memory spawn registry so catching never queries per message
+        await self.spawn_system.registry.load(self.db)
+        
+        # Expiries are punctual timers instead of periodic table sweeps
+        await self.schedule_expiries()
+        
+        # Cooldowns live in memory; snapshots only carry them across restarts
+        self.cooldown_stores = [
+            self.spawn_system.channel_cooldowns,
+            self.fishing_system.user_cooldowns,
+            self.economy_system.daily_cooldowns
+        ]
+        if self.config.persist_cooldowns:
+            for store in self.cooldown_stores:
+                await store.restore(self.db)
+        
         # --- COG LOADING CONSOLIDATED HERE ---
         logger.info("Loading Cogs...")
         await self.load_extension('cogs.general')
@@ -102,11 +153,37 @@ class PokemonBot(commands.Bot):
         # -------------------------------------
         
         # Start background tasks
+        self.timers.start()
         self.cleanup_task.start()
+        self.spawn_task.change_interval(seconds=self.config.spawn_tick_seconds)
         self.spawn_task.start()
         
         logger.info("Pokemon Bot setup completed")
     
+    async def schedule_expiries(self):
+        """Rehydrate despawn, listing, trade and battle timers from the database"""
+        await self.spawn_system.schedule_despawns()
+        
+        for listing in await self.db.get_market_listing_expiries():
+            expires = listing['expires_date']
+            if isinstance(expires, str):
+                expires = datetime.fromisoformat(expires)
+            self.timers.schedule_at(
+                ('listing', listing['listing_id']), expires or datetime.now(),
+                self.db.expire_market_listing, listing['listing_id']
+            )
+        
+        for trade in await self.db.get_pending_trade_expiries(self.config.trade_timeout):
+            self.timers.schedule(('trade', trade['trade_id']), trade['remaining'], self.db.expire_trade, trade['trade_id'])
+        
+        for battle in await self.db.get_battle_expiries(self.config.battle_timeout):
+            self.timers.schedule(
+                ('battle', battle['battle_id']), battle['remaining'],
+                self.battle_system.timeout_battle, battle['battle_id']
+            )
+        
+        logger.info(f"Scheduled {len(self.timers)} expiry timers")
+    
     async def on_ready(self):
         """Called when the bot is ready"""
         logger.info(f'{self.user} has connected to Discord!')
@@ -133,41 +210,31 @@ class PokemonBot(commands.Bot):
         if message.content and not message.content.startswith(self.command_prefix):
             await self.handle_pokemon_catching(message)
         
-        # Random Pokemon spawning
-        if random.random() < self.config.spawn_rate:
-            await self.spawn_system.handle_spawn(message.channel)
+        # Count activity; spawns are decided by spawn_task
+        self.spawn_scheduler.record_message(message.channel)
     
     async def handle_pokemon_catching(self, message):
         """Handle Pokemon catching by name"""
-        # Check if there's an active spawn in this channel
-        active_spawns = await self.db.get_active_spawns(str(message.channel.id))
+        # Check if there's an active spawn in this channel (in-memory, no query)
+        active_spawns = self.spawn_system.registry.get(str(message.channel.id))
         
         if active_spawns:
             for spawn in active_spawns:
-                # Note: The original logic here assumes 'name' and 'sprite_url' are directly in the spawn dictionary,
-                # which may not be true if the `get_active_spawns` only returns IDs. This is left as-is for now.
                 pokemon_name = spawn['name'].lower()
                 message_content = message.content.lower()
                 
                 # Check if the message contains the Pokemon name
                 if pokemon_name in message_content or message_content in pokemon_name:
-                    user = await self.db.get_or_create_user(str(message.author.id), message.author.display_name)
+                    # Claim the spawn, add the Pokemon, grant rewards and mission progress in one transaction
+                    caught = await self.db.catch_spawn(
+                        spawn, str(message.author.id), message.author.display_name,
+                        self.config.catch_credits, self.config.catch_exp
+                    )
                     
-                    # Catch the Pokemon
-                    success = await self.db.catch_spawn(spawn['spawn_id'], user['user_id'])
+                    # Caught here or by someone else first, either way it's gone
+                    self.spawn_system.registry.remove(spawn['spawn_id'])
                     
-                    if success:
-                        # Add to user's collection
-                        pokemon_uid = await self.db.add_pokemon_to_user(
-                            user['user_id'],
-                            spawn['pokemon_id'],
-                            is_shiny=spawn['is_shiny']
-                        )
-                        
-                        # Update user stats
-                        await self.db.update_user_credits(user['user_id'], self.config.catch_credits)
-                        await self.db.update_user_exp(user['user_id'], self.config.catch_exp)
-                        
+                    if caught:
                         # Send success message
                         embed = discord.Embed(
                             title="🎉 Pokemon Caught!",
@@ -181,29 +248,37 @@ class PokemonBot(commands.Bot):
                         embed.add_field(name="Credits Earned", value=f"+{self.config.catch_credits}", inline=True)
                         embed.add_field(name="EXP Gained", value=f"+{self.config.catch_exp}", inline=True)
                         
-                        await message.channel.send(embed=embed)
-                        
-                        # Update mission progress
-                        await self.mission_system.update_progress(user['user_id'], 'catch', 1)
+                        # Catches landing together go out as one message
+                        self.dispatcher.announce_catch(message.channel, embed)
                         
                         break
     
     @tasks.loop(minutes=10)
     async def cleanup_task(self):
-        """Periodic cleanup task"""
+        """Periodic cooldown snapshot (expired cooldowns evict themselves)"""
         try:
-            await self.db.cleanup_expired_spawns()
-            await self.db.cleanup_expired_market_listings()
-            await self.db.cleanup_old_battles()
-            await self.fishing_system.cleanup_cooldowns()
+            await self.snapshot_cooldowns()
             logger.info("Cleanup task completed")
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
     
-    @tasks.loop(minutes=1)
+    async def snapshot_cooldowns(self):
+        """Write running cooldowns to the database"""
+        if not self.config.persist_cooldowns:
+            return
+        for store in self.cooldown_stores:
+            await store.snapshot(self.db)
+    
+    @tasks.loop(seconds=10)
     async def spawn_task(self):
-        """Periodic spawn task (placeholder since message-based is used)"""
-        pass
+        """Emit the spawns the scheduler has budgeted for"""
+        try:
+            for channel in self.spawn_scheduler.tick():
+                # Cooldowns and per-channel caps are checked in handle_spawn; a skipped spawn keeps its budget
+                if not await self.spawn_system.handle_spawn(channel):
+                    self.spawn_scheduler.refund(channel)
+        except Exception as e:
+            logger.error(f"Error in spawn task: {e}")
     
     async def close(self):
         """Clean shutdown"""
@@ -212,13 +287,33 @@ class PokemonBot(commands.Bot):
         # Cancel tasks
         self.cleanup_task.cancel()
         self.spawn_task.cancel()
+        self.timers.stop()
+        await self.dispatcher.close()
         
         # Close systems
         if self.pokeapi:
             await self.pokeapi.close()
         
+        if self.spawn_system:
+            await self.spawn_system.renderer.close()
+        
+        try:
+            await self.snapshot_cooldowns()
+        except Exception as e:
+            logger.error(f"Error saving cooldowns: {e}")
+        
+        # Turns still waiting on a batched checkpoint or action log write
+        if self.battle_system:
+            await self.battle_system.stop_actors()
+            await self.battle_system.flush_checkpoints()
+            await self.battle_system.action_logger.flush()
+            self.battle_system.npc_ai.close()
+        
         await self.db.close()
         
+        if self.reference:
+            self.reference.close()
+        
         await super().close()
 
 # The if __name__ == "__main__": block is REMOVED, as run_bot.py handles execution.
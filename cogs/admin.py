@@ -3,6 +3,8 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 
+from utils.guild_settings import FEATURES
+
 logger = logging.getLogger(__name__)
 
 class Admin(commands.Cog):
@@ -15,7 +17,7 @@ class Admin(commands.Cog):
     
     @app_commands.command(name="admin", description="Admin commands")
     @app_commands.default_permissions(administrator=True)
-    async def admin(self, interaction: discord.Interaction, action: str, target: discord.User = None, amount: int = None):
+    async def admin(self, interaction: discord.Interaction, action: str, target: discord.User = None, amount: int = None, feature: str = None, generations: str = None):
         """Admin management commands"""
         # Check if user has admin permissions
         if not interaction.user.guild_permissions.administrator:
@@ -60,8 +62,7 @@ class Admin(commands.Cog):
                 return
             
             # Reset fishing cooldown
-            if hasattr(self.bot.fishing_system, 'user_cooldowns') and target.id in self.bot.fishing_system.user_cooldowns:
-                del self.bot.fishing_system.user_cooldowns[target.id]
+            self.bot.fishing_system.user_cooldowns.reset(target.id)
             
             embed = discord.Embed(
                 title="✅ Cooldown Reset",
@@ -89,6 +90,78 @@ class Admin(commands.Cog):
             else:
                 await interaction.response.send_message("Failed to spawn Pokemon!", ephemeral=True)
         
+        elif action in ("set_spawn_channel", "clear_spawn_channel"):
+            if not interaction.guild:
+                await interaction.response.send_message("This can only be used in a server!", ephemeral=True)
+                return
+            
+            channel_id = interaction.channel.id if action == "set_spawn_channel" else None
+            await self.bot.guild_settings.set_spawn_channel(interaction.guild.id, channel_id)
+            
+            embed = discord.Embed(
+                title="✅ Spawn Channel Updated",
+                description=f"Pokemon will now spawn in {interaction.channel.mention}!" if channel_id else "Pokemon will spawn wherever chat is active!",
+                color=discord.Color.blue()
+            )
+            
+            await interaction.response.send_message(embed=embed)
+        
+        elif action == "set_spawn_rate":
+            if not interaction.guild or amount is None or amount < 0:
+                await interaction.response.send_message("Please specify a spawn rate percentage (100 = normal)!", ephemeral=True)
+                return
+            
+            await self.bot.guild_settings.set_spawn_rate(interaction.guild.id, amount / 100)
+            
+            embed = discord.Embed(
+                title="✅ Spawn Rate Updated",
+                description=f"Spawn rate set to **{amount}%** of normal!",
+                color=discord.Color.blue()
+            )
+            
+            await interaction.response.send_message(embed=embed)
+        
+        elif action in ("enable_feature", "disable_feature"):
+            if not interaction.guild or feature not in FEATURES:
+                await interaction.response.send_message(f"Please specify a feature: {', '.join(FEATURES)}", ephemeral=True)
+                return
+            
+            enabled = action == "enable_feature"
+            await self.bot.guild_settings.set_feature_enabled(interaction.guild.id, feature, enabled)
+            
+            embed = discord.Embed(
+                title="✅ Feature Updated",
+                description=f"{feature.title()} {'enabled' if enabled else 'disabled'} for this server!",
+                color=discord.Color.blue()
+            )
+            
+            await interaction.response.send_message(embed=embed)
+        
+        elif action in ("set_spawn_generations", "clear_spawn_generations"):
+            if not interaction.guild:
+                await interaction.response.send_message("This can only be used in a server!", ephemeral=True)
+                return
+            
+            chosen = None
+            if action == "set_spawn_generations":
+                try:
+                    chosen = tuple(int(gen) for gen in (generations or "").replace(" ", "").split(",") if gen)
+                except ValueError:
+                    chosen = ()
+                if not chosen or any(gen < 1 or gen > 9 for gen in chosen):
+                    await interaction.response.send_message("Please specify generations between 1 and 9, e.g. `1,2,3`!", ephemeral=True)
+                    return
+            
+            await self.bot.guild_settings.set_spawn_generations(interaction.guild.id, chosen)
+            
+            embed = discord.Embed(
+                title="✅ Spawn Generations Updated",
+                description=f"Only Pokemon from generation {', '.join(map(str, sorted(set(chosen))))} will spawn!" if chosen else "Pokemon from every generation will spawn!",
+                color=discord.Color.blue()
+            )
+            
+            await interaction.response.send_message(embed=embed)
+        
         elif action == "bot_stats":
             # Get bot statistics
             total_users = await self.bot.db.fetch_val("SELECT COUNT(*) FROM users") or 0
@@ -108,7 +181,7 @@ class Admin(commands.Cog):
             await interaction.response.send_message(embed=embed)
         
         else:
-            await interaction.response.send_message("Invalid admin action! Available: give_credits, remove_credits, reset_cooldown, spawn_pokemon, bot_stats", ephemeral=True)
+            await interaction.response.send_message("Invalid admin action! Available: give_credits, remove_credits, reset_cooldown, spawn_pokemon, set_spawn_channel, clear_spawn_channel, set_spawn_rate, set_spawn_generations, clear_spawn_generations, enable_feature, disable_feature, bot_stats", ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(Admin(bot))
\ No newline at end of file
@@ -4,6 +4,8 @@ from discord import app_commands
 import asyncio
 import logging
 
+from utils.npc_ai import DIFFICULTY_BUDGETS
+
 logger = logging.getLogger(__name__)
 
 class Battle(commands.Cog):
@@ -11,6 +13,24 @@ class Battle(commands.Cog):
         self.bot = bot
         self.active_battle_views = {}
     
+    async def cog_load(self):
+        """Reattach the controls of battles that were running when the bot went down"""
+        for row in await self.bot.db.get_battle_messages():
+            battle_id = row['battle_id']
+            channel = self.bot.get_partial_messageable(int(row['channel_id']))
+            message = channel.get_partial_message(int(row['message_id']))
+            names = (row['player1_name'] or "Player 1", row['player2_name'] or "NPC Trainer")
+            
+            if not await self.bot.battle_system.resume_battle(battle_id, message, names):
+                logger.warning(f"Battle {battle_id} could not be restored")
+                continue
+            
+            view = BattleControlsView(self.bot, battle_id, None, None)
+            self.active_battle_views[battle_id] = view
+            self.bot.add_view(view, message_id=message.id)
+        
+        logger.info(f"Resumed {len(self.active_battle_views)} battles")
+    
     @commands.Cog.listener()
     async def on_ready(self):
         logger.info(f"Battle cog loaded")
@@ -64,14 +84,26 @@ class Battle(commands.Cog):
             await interaction.response.send_message("You need Pokemon in your party to battle!", ephemeral=True)
             return
         
-        # Create NPC battle
-        battle_id = await self.bot.battle_system.create_battle(
-            user['user_id'], None, 'npc', str(interaction.channel.id)
-        )
+        difficulty = difficulty.lower()
+        if difficulty not in DIFFICULTY_BUDGETS:
+            await interaction.response.send_message(
+                f"Difficulty must be one of: {', '.join(DIFFICULTY_BUDGETS)}", ephemeral=True
+            )
+            return
         
         # Generate NPC team based on difficulty
         npc_party = await self._generate_npc_party(difficulty, party[0]['level'])
         
+        if not npc_party:
+            await interaction.response.send_message("No NPC trainers are available right now!", ephemeral=True)
+            return
+        
+        # Create NPC battle
+        battle_id = await self.bot.battle_system.create_battle(
+            user['user_id'], None, 'npc', str(interaction.channel.id),
+            npc_party=npc_party, difficulty=difficulty
+        )
+        
         embed = discord.Embed(
             title=f"⚔️ NPC Battle - {difficulty.title()}",
             description="Battle against a computer-controlled trainer!",
@@ -97,9 +129,30 @@ class Battle(commands.Cog):
     
     async def _generate_npc_party(self, difficulty: str, player_level: int) -> list:
         """Generate NPC party based on difficulty"""
-        # This would generate a balanced NPC team
-        # For now, return a placeholder
-        return []
+        # Teams are prebuilt per level band (python -m database.npc_teams build); this only samples
+        if not self.bot.npc_teams:
+            return []
+        return self.bot.npc_teams.sample(player_level, difficulty)
+    
+    @app_commands.command(name="spectate", description="Follow a live battle in this channel")
+    async def spectate(self, interaction: discord.Interaction, battle_id: int):
+        """Post a battle here and keep it updated until it ends"""
+        result = await self.bot.battle_system.spectate(battle_id, interaction.channel)
+        
+        if result.get('error'):
+            await interaction.response.send_message(f"❌ {result['error']}", ephemeral=True)
+            return
+        
+        await interaction.response.send_message(f"👀 Following battle #{battle_id} in this channel.", ephemeral=True)
+    
+    @app_commands.command(name="unspectate", description="Stop following a battle in this channel")
+    async def unspectate(self, interaction: discord.Interaction, battle_id: int):
+        """Stop updating a followed battle in this channel"""
+        if not self.bot.battle_system.stop_spectating(battle_id, interaction.channel.id):
+            await interaction.response.send_message("This channel isn't following that battle!", ephemeral=True)
+            return
+        
+        await interaction.response.send_message(f"Stopped following battle #{battle_id}.", ephemeral=True)
     
     @app_commands.command(name="umoves", description="View available moves in battle")
     async def battle_moves(self, interaction: discord.Interaction):
@@ -113,7 +166,7 @@ class Battle(commands.Cog):
             return
         
         battle = active_battles[0]
-        battle_state = self.bot.battle_system.active_battles.get(battle['battle_id'])
+        battle_state = await self.bot.battle_system.get_battle(battle['battle_id'])
         
         if not battle_state:
             await interaction.response.send_message("Battle not found!", ephemeral=True)
@@ -123,16 +176,35 @@ class Battle(commands.Cog):
         active_pokemon = self.bot.battle_system._get_active_pokemon(battle_state, user['user_id'])
         
         embed = discord.Embed(
-            title=f"📝 {active_pokemon['name']}'s Moves",
+            title=f"📝 {active_pokemon.name}'s Moves",
             color=discord.Color.blue()
         )
         
-        # This would show the Pokemon's actual moves
-        # For now, show placeholder
-        embed.add_field(name="Available Moves", value="Move list would appear here", inline=False)
+        move_list = "\n".join(
+            f"**{move.name}** ({move.type.title()}, {move.category.title()}) - PP {move.pp}/{move.max_pp}"
+            for move in active_pokemon.moves
+        )
+        embed.add_field(name="Available Moves", value=move_list, inline=False)
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+async def submit_action(bot, battle_id, interaction: discord.Interaction, action: dict):
+    """Hand an action to the battle and show the outcome on the selection message"""
+    # NPC replies can take a few seconds to search, longer than an interaction may go unanswered
+    await interaction.response.defer()
+    
+    user = await bot.db.get_or_create_user(str(interaction.user.id), interaction.user.display_name)
+    result = await bot.battle_system.process_turn(battle_id, user['user_id'], action)
+    
+    if result.get('error'):
+        await interaction.edit_original_response(content=f"❌ {result['error']}", view=None)
+        return
+    
+    summary = "\n".join(result['actions'])
+    if result.get('battle_over'):
+        summary += "\n🏁 The battle is over!"
+    await interaction.edit_original_response(content=summary, view=None)
+
 class BattleView(discord.ui.View):
     def __init__(self, bot, battle_id, challenger, opponent):
         super().__init__(timeout=300)
@@ -150,13 +222,18 @@ class BattleView(discord.ui.View):
         
         self.accepted = True
         
-        # Start the battle
-        embed = await self.bot.battle_system.get_battle_embed(self.battle_id)
-        embed.title = "⚔️ Battle Started!"
+        # Start the battle; from here on turns update this message's embed
+        embed = await self.bot.battle_system.show_battle(
+            self.battle_id, interaction.message, "⚔️ Battle Started!",
+            (self.challenger.display_name, self.opponent.display_name)
+        )
+        if not embed:
+            await interaction.response.edit_message(content="This battle has expired.", embed=None, view=None)
+            return
         
         # Create battle controls view
         controls_view = BattleControlsView(self.bot, self.battle_id, self.challenger, self.opponent)
-        self.bot.active_battle_views[self.battle_id] = controls_view
+        self.bot.get_cog('Battle').active_battle_views[self.battle_id] = controls_view
         
         await interaction.response.edit_message(
             content=f"🎮 **Battle Started!**\n{self.challenger.mention} vs {self.opponent.mention}",
@@ -179,8 +256,7 @@ class BattleView(discord.ui.View):
         await interaction.response.edit_message(embed=embed, view=None)
         
         # Clean up battle
-        if self.battle_id in self.bot.battle_system.active_battles:
-            del self.bot.battle_system.active_battles[self.battle_id]
+        await self.bot.battle_system.cancel_battle(self.battle_id)
 
 class BattleControlsView(discord.ui.View):
     def __init__(self, bot, battle_id, player1, player2):
@@ -189,42 +265,66 @@ class BattleControlsView(discord.ui.View):
         self.battle_id = battle_id
         self.player1 = player1
         self.player2 = player2
-        self.current_turn = player1  # Player 1 starts
+        
+        # Persistent: fixed custom_ids and no timeout, so cog_load can re-register it after a restart
+        for button, action in ((self.fight, 'fight'), (self.switch_pokemon, 'switch'),
+                               (self.use_item, 'item'), (self.forfeit, 'forfeit')):
+            button.custom_id = f"battle:{battle_id}:{action}"
+    
+    async def _get_turn_side(self, interaction: discord.Interaction):
+        """The interacting player's side if it's their turn; otherwise tells them why not"""
+        battle = await self.bot.battle_system.get_battle(self.battle_id)
+        if not battle:
+            await interaction.response.send_message("Battle not found!", ephemeral=True)
+            return None
+        
+        user = await self.bot.db.get_or_create_user(str(interaction.user.id), interaction.user.display_name)
+        if battle.turn_player_id != user['user_id']:
+            await interaction.response.send_message("It's not your turn!", ephemeral=True)
+            return None
+        
+        return battle.side_for(user['user_id'])
     
     @discord.ui.button(label="Fight", style=discord.ButtonStyle.red, emoji="⚔️", row=0)
     async def fight(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.current_turn.id:
-            await interaction.response.send_message("It's not your turn!", ephemeral=True)
+        side = await self._get_turn_side(interaction)
+        if not side:
             return
         
         # Show move selection
-        moves_view = MoveSelectionView(self.bot, self.battle_id, interaction.user)
+        moves_view = MoveSelectionView(self.bot, self.battle_id, interaction.user, side.active)
         await interaction.response.send_message("Select a move:", view=moves_view, ephemeral=True)
     
     @discord.ui.button(label="Pokemon", style=discord.ButtonStyle.green, emoji="🐾", row=0)
     async def switch_pokemon(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.current_turn.id:
-            await interaction.response.send_message("It's not your turn!", ephemeral=True)
+        side = await self._get_turn_side(interaction)
+        if not side:
             return
         
         # Show Pokemon selection
-        party_view = PokemonSelectionView(self.bot, self.battle_id, interaction.user)
+        party_view = PokemonSelectionView(self.bot, self.battle_id, interaction.user, side)
         await interaction.response.send_message("Select a Pokemon:", view=party_view, ephemeral=True)
     
     @discord.ui.button(label="Item", style=discord.ButtonStyle.blurple, emoji="🎒", row=0)
     async def use_item(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.current_turn.id:
-            await interaction.response.send_message("It's not your turn!", ephemeral=True)
+        side = await self._get_turn_side(interaction)
+        if not side:
+            return
+        
+        user = await self.bot.db.get_or_create_user(str(interaction.user.id), interaction.user.display_name)
+        items = await self.bot.db.get_user_inventory(user['user_id'])
+        if not items:
+            await interaction.response.send_message("You don't have any items!", ephemeral=True)
             return
         
         # Show item selection
-        item_view = ItemSelectionView(self.bot, self.battle_id, interaction.user)
+        item_view = ItemSelectionView(self.bot, self.battle_id, interaction.user, items)
         await interaction.response.send_message("Select an item:", view=item_view, ephemeral=True)
     
     @discord.ui.button(label="Run", style=discord.ButtonStyle.gray, emoji="🏃", row=0)
     async def forfeit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.current_turn.id:
-            await interaction.response.send_message("It's not your turn!", ephemeral=True)
+        side = await self._get_turn_side(interaction)
+        if not side:
             return
         
         # Confirm forfeit
@@ -232,45 +332,43 @@ class BattleControlsView(discord.ui.View):
         await interaction.response.send_message("Are you sure you want to forfeit?", view=confirm_view, ephemeral=True)
 
 class MoveSelectionView(discord.ui.View):
-    def __init__(self, bot, battle_id, player):
+    def __init__(self, bot, battle_id, player, pokemon):
         super().__init__(timeout=60)
         self.bot = bot
         self.battle_id = battle_id
         self.player = player
         
-        # Add move buttons (placeholder)
-        moves = ["Tackle", "Ember", "Water Gun", "Thunder Shock"]
-        for i, move in enumerate(moves):
-            self.add_item(MoveButton(move, i))
+        # One button per known move
+        for move in pokemon.moves:
+            self.add_item(MoveButton(move))
 
 class MoveButton(discord.ui.Button):
-    def __init__(self, move_name, index):
-        super().__init__(label=move_name, style=discord.ButtonStyle.red)
-        self.move_name = move_name
+    def __init__(self, move):
+        super().__init__(label=f"{move.name} ({move.pp}/{move.max_pp})", style=discord.ButtonStyle.red, disabled=move.pp <= 0)
+        self.move_id = move.move_id
+        self.move_name = move.name
     
     async def callback(self, interaction: discord.Interaction):
         # Process move selection
         action = {
             'type': 'move',
-            'move_name': self.move_name,
-            'player_id': interaction.user.id
+            'move_id': self.move_id
         }
         
-        # This would process the move in battle system
-        await interaction.response.send_message(f"Used {self.move_name}!", ephemeral=True)
-        await interaction.message.delete()
+        await submit_action(self.view.bot, self.view.battle_id, interaction, action)
 
 class PokemonSelectionView(discord.ui.View):
-    def __init__(self, bot, battle_id, player):
+    def __init__(self, bot, battle_id, player, side):
         super().__init__(timeout=60)
         self.bot = bot
         self.battle_id = battle_id
         self.player = player
         
-        # Add Pokemon buttons (placeholder)
-        pokemon_names = ["Pikachu", "Charizard", "Blastoise", "Venusaur"]
-        for i, pokemon in enumerate(pokemon_names):
-            self.add_item(PokemonButton(pokemon, i + 1))
+        # One button per party member; the active and fainted ones can't be picked
+        for i, pokemon in enumerate(side.party):
+            button = PokemonButton(f"{pokemon.name} ({pokemon.current_hp}/{pokemon.max_hp})", i + 1)
+            button.disabled = pokemon.fainted or i == side.active_index
+            self.add_item(button)
 
 class PokemonButton(discord.ui.Button):
     def __init__(self, pokemon_name, slot):
@@ -281,39 +379,35 @@ class PokemonButton(discord.ui.Button):
     async def callback(self, interaction: discord.Interaction):
         action = {
             'type': 'switch',
-            'pokemon_index': self.slot - 1,
-            'player_id': interaction.user.id
+            'pokemon_index': self.slot - 1
         }
         
-        await interaction.response.send_message(f"Switched to {self.pokemon_name}!", ephemeral=True)
-        await interaction.message.delete()
+        await submit_action(self.view.bot, self.view.battle_id, interaction, action)
 
 class ItemSelectionView(discord.ui.View):
-    def __init__(self, bot, battle_id, player):
+    def __init__(self, bot, battle_id, player, items):
         super().__init__(timeout=60)
         self.bot = bot
         self.battle_id = battle_id
         self.player = player
         
-        # Add item buttons (placeholder)
-        items = ["Potion", "Super Potion", "Hyper Potion", "Max Potion"]
-        for item in items:
+        # One button per inventory item (a view holds at most 25)
+        for item in items[:25]:
             self.add_item(ItemButton(item))
 
 class ItemButton(discord.ui.Button):
-    def __init__(self, item_name):
-        super().__init__(label=item_name, style=discord.ButtonStyle.blurple)
-        self.item_name = item_name
+    def __init__(self, item):
+        super().__init__(label=f"{item['name'].replace('-', ' ').title()} x{item['quantity']}", style=discord.ButtonStyle.blurple)
+        self.item_id = item['item_id']
     
     async def callback(self, interaction: discord.Interaction):
         action = {
             'type': 'item',
-            'item_name': self.item_name,
-            'player_id': interaction.user.id
+            'item_id': self.item_id,
+            'target_pokemon': None
         }
         
-        await interaction.response.send_message(f"Used {self.item_name}!", ephemeral=True)
-        await interaction.message.delete()
+        await submit_action(self.view.bot, self.view.battle_id, interaction, action)
 
 class ConfirmForfeitView(discord.ui.View):
     def __init__(self, bot, battle_id, player):
@@ -325,17 +419,14 @@ class ConfirmForfeitView(discord.ui.View):
     @discord.ui.button(label="Yes, Forfeit", style=discord.ButtonStyle.red, emoji="⚠️")
     async def confirm_forfeit(self, interaction: discord.Interaction, button: discord.ui.Button):
         action = {
-            'type': 'forfeit',
-            'player_id': interaction.user.id
+            'type': 'forfeit'
         }
         
-        await interaction.response.send_message("Battle forfeited!", ephemeral=True)
-        await interaction.message.delete()
+        await submit_action(self.bot, self.battle_id, interaction, action)
     
     @discord.ui.button(label="No, Continue", style=discord.ButtonStyle.green, emoji="✅")
     async def cancel_forfeit(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_message("Continuing battle!", ephemeral=True)
-        await interaction.message.delete()
+        await interaction.response.edit_message(content="Continuing battle!", view=None)
 
 class NPCBattleView(discord.ui.View):
     def __init__(self, bot, battle_id, player, npc_party):
@@ -351,13 +442,18 @@ class NPCBattleView(discord.ui.View):
             await interaction.response.send_message("This isn't your battle!", ephemeral=True)
             return
         
-        # Start NPC battle
-        embed = await self.bot.battle_system.get_battle_embed(self.battle_id)
-        embed.title = "⚔️ NPC Battle Started!"
+        # Start NPC battle; from here on turns update this message's embed
+        embed = await self.bot.battle_system.show_battle(
+            self.battle_id, interaction.message, "⚔️ NPC Battle Started!",
+            (self.player.display_name, "NPC Trainer")
+        )
+        if not embed:
+            await interaction.response.edit_message(content="This battle has expired.", embed=None, view=None)
+            return
         
         # Create battle controls
         controls_view = BattleControlsView(self.bot, self.battle_id, self.player, None)
-        self.bot.active_battle_views[self.battle_id] = controls_view
+        self.bot.get_cog('Battle').active_battle_views[self.battle_id] = controls_view
         
         await interaction.response.edit_message(embed=embed, view=controls_view)
     
@@ -376,8 +472,7 @@ class NPCBattleView(discord.ui.View):
         await interaction.response.edit_message(embed=embed, view=None)
         
         # Clean up
-        if self.battle_id in self.bot.battle_system.active_battles:
-            del self.bot.battle_system.active_battles[self.battle_id]
+        await self.bot.battle_system.cancel_battle(self.battle_id)
 
 async def setup(bot):
     await bot.add_cog(Battle(bot))
\ No newline at end of file
@@ -1,9 +1,10 @@
-from .views import FishingView
 import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
 
+from utils.fishing_system import FishingView
+
 logger = logging.getLogger(__name__)
 
 class Fishing(commands.Cog):
@@ -17,6 +18,10 @@ class Fishing(commands.Cog):
     @app_commands.command(name="fish", description="Go fishing for water Pokemon")
     async def fish(self, interaction: discord.Interaction):
         """Start fishing mini-game"""
+        if not self.bot.guild_settings.get(interaction.guild_id).is_enabled('fishing'):
+            await interaction.response.send_message("Fishing is disabled in this server!", ephemeral=True)
+            return
+        
         user = await self.bot.db.get_or_create_user(str(interaction.user.id), interaction.user.display_name)
         
         # Get fishing stats
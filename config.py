@@ -6,10 +6,27 @@ class Config:
         self.token = os.getenv('DISCORD_TOKEN', 'your-bot-token-here')
         self.client_id = os.getenv('CLIENT_ID', 'your-client-id-here')
         self.database_path = 'data/pokemon_database.db'
+        self.reference_database_path = 'data/reference.db'
+        self.reference_snapshot_path = 'data/reference.snapshot'
+        self.npc_team_pool_path = 'data/npc_teams.pool'
         self.spawn_rate = 0.05  # 5% chance per message
+        self.spawn_tick_seconds = 10  # How often the spawn scheduler runs
+        self.spawn_message_cap = 30  # Messages per minute per channel that count toward spawns
+        self.spawn_channel_burst = 2  # Spawns a channel can bank
+        self.guild_spawns_per_minute = 6
+        self.guild_spawn_burst = 10
         self.despawn_time = 2400  # 40 minutes in seconds
         self.max_spawns_per_channel = 3
+        self.spawn_generations = None  # e.g. [1, 2, 3]; None spawns every generation
+        self.spawn_event_weights = None  # e.g. {'legendary': 3}; category multipliers while a spawn event runs
         self.battle_timeout = 180  # 3 minutes
+        self.battle_checkpoint_delay = 2  # Seconds turns are batched before battle state is written
+        self.battle_log_batch_size = 50  # Battle actions buffered before a forced write
+        self.battle_log_flush_seconds = 5  # Longest a buffered battle action waits to be written
+        self.battle_actor_idle_seconds = 60  # A battle's turn-processing task exits after this long without input
+        self.battle_render_delay = 1.0  # Seconds battle message edits are held so quick turns share one edit
+        self.spectate_interval = 5.0  # Seconds between updates to each channel following a battle
+        self.max_spectator_channels = 10  # Channels that can follow one battle
         self.trade_timeout = 300  # 5 minutes
         self.daily_credits = 100
         self.catch_credits = 10
@@ -27,11 +44,16 @@ class Config:
         self.battle_win_exp = 50
         self.battle_lose_exp = 10
         self.npc_battle_exp = 25
+        self.npc_ai_workers = 2  # Processes running NPC battle searches
         
         # Fishing settings
         self.fish_cooldown = 300  # 5 minutes
         self.fish_exp_rate = 0.5
         
+        # Cooldown settings
+        self.cooldown_max_entries = 200000  # Per store; soonest-expiring entries are evicted past this
+        self.persist_cooldowns = True  # Snapshot cooldowns to the database so they survive restarts
+        
         # Market settings
         self.market_tax = 0.05  # 5% tax
         self.max_listing_days = 7
@@ -45,10 +67,27 @@ class Config:
             'token': self.token,
             'client_id': self.client_id,
             'database_path': self.database_path,
+            'reference_database_path': self.reference_database_path,
+            'reference_snapshot_path': self.reference_snapshot_path,
+            'npc_team_pool_path': self.npc_team_pool_path,
             'spawn_rate': self.spawn_rate,
+            'spawn_tick_seconds': self.spawn_tick_seconds,
+            'spawn_message_cap': self.spawn_message_cap,
+            'spawn_channel_burst': self.spawn_channel_burst,
+            'guild_spawns_per_minute': self.guild_spawns_per_minute,
+            'guild_spawn_burst': self.guild_spawn_burst,
             'despawn_time': self.despawn_time,
             'max_spawns_per_channel': self.max_spawns_per_channel,
+            'spawn_generations': self.spawn_generations,
+            'spawn_event_weights': self.spawn_event_weights,
             'battle_timeout': self.battle_timeout,
+            'battle_checkpoint_delay': self.battle_checkpoint_delay,
+            'battle_log_batch_size': self.battle_log_batch_size,
+            'battle_log_flush_seconds': self.battle_log_flush_seconds,
+            'battle_actor_idle_seconds': self.battle_actor_idle_seconds,
+            'battle_render_delay': self.battle_render_delay,
+            'spectate_interval': self.spectate_interval,
+            'max_spectator_channels': self.max_spectator_channels,
             'trade_timeout': self.trade_timeout,
             'daily_credits': self.daily_credits,
             'catch_credits': self.catch_credits,
@@ -62,8 +101,11 @@ class Config:
             'battle_win_exp': self.battle_win_exp,
             'battle_lose_exp': self.battle_lose_exp,
             'npc_battle_exp': self.npc_battle_exp,
+            'npc_ai_workers': self.npc_ai_workers,
             'fish_cooldown': self.fish_cooldown,
             'fish_exp_rate': self.fish_exp_rate,
+            'cooldown_max_entries': self.cooldown_max_entries,
+            'persist_cooldowns': self.persist_cooldowns,
             'market_tax': self.market_tax,
             'max_listing_days': self.max_listing_days,
             'tournament_entry_fee': self.tournament_entry_fee,
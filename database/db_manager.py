@@ -5,19 +5,82 @@ import aiosqlite
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import logging
+import os
+from pathlib import Path
+
+from utils.pokemon_stats import random_nature, stats_for_row
 
 logger = logging.getLogger(__name__)
 
+# Static game data that lives in the separate reference database
+REFERENCE_TABLES = ('pokemon_species', 'moves', 'abilities', 'items', 'pokemon_moves', 'pokemon_abilities',
+                    'reference_meta')
+
+# Columns added after a table first shipped; CREATE TABLE IF NOT EXISTS won't add them
+COLUMN_MIGRATIONS = [
+    ('active_spawns', 'message_id', 'TEXT'),
+    ('active_battles', 'checkpoint', 'BLOB'),
+    ('active_battles', 'message_id', 'TEXT'),
+    ('player_pokemon', 'attack', 'INTEGER'),
+    ('player_pokemon', 'defense', 'INTEGER'),
+    ('player_pokemon', 'sp_attack', 'INTEGER'),
+    ('player_pokemon', 'sp_defense', 'INTEGER'),
+    ('player_pokemon', 'speed', 'INTEGER'),
+    ('guild_settings', 'spawn_generations', 'TEXT'),
+]
+
+PLAYER_POKEMON_INSERT = """
+    INSERT INTO player_pokemon (
+        user_id, pokemon_id, level, current_hp, max_hp, attack, defense, sp_attack, sp_defense, speed,
+        hp_iv, attack_iv, defense_iv, sp_attack_iv, sp_defense_iv, speed_iv, nature,
+        is_shiny, caught_location, ot_user_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 class DatabaseManager:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, reference_db_path: Optional[str] = None,
+                 reference_mmap_size: int = 256 * 1024 * 1024):
         self.db_path = db_path
+        self.reference_db_path = reference_db_path
+        self.reference_mmap_size = reference_mmap_size
+        self.reference_attached = False
         self.pool = None
+        # Held by every write on the shared connection, so no other write can commit
+        # (or roll back) in the middle of a multi-statement transaction
+        self.transaction_lock = asyncio.Lock()
     
     async def initialize(self):
         """Initialize the database connection pool"""
-        self.pool = await aiosqlite.connect(self.db_path)
+        self.pool = await aiosqlite.connect(self.db_path, uri=True)
         self.pool.row_factory = aiosqlite.Row
+        await self.attach_reference_database()
         await self.create_tables()
+        await self.backfill_pokemon_stats()
+    
+    async def attach_reference_database(self):
+        """Attach the static reference DB read-only so unqualified JOINs resolve to it"""
+        if not self.reference_db_path or not os.path.exists(self.reference_db_path):
+            return
+        
+        # immutable=1 lets SQLite skip locking and change detection entirely
+        uri = Path(self.reference_db_path).resolve().as_uri() + "?mode=ro&immutable=1"
+        await self.pool.execute("ATTACH DATABASE ? AS ref", (uri,))
+        await self.pool.execute(f"PRAGMA ref.mmap_size = {int(self.reference_mmap_size)}")
+        self.reference_attached = True
+        
+        # Tables left in the main file would shadow the attached ones
+        placeholders = ','.join('?' * len(REFERENCE_TABLES))
+        shadowed = await self.fetch_all(
+            f"SELECT name FROM main.sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+            REFERENCE_TABLES
+        )
+        if shadowed:
+            logger.warning(
+                f"Main database still contains reference tables ({', '.join(row['name'] for row in shadowed)}); "
+                f"run `python -m database.split_reference` to move them into {self.reference_db_path}"
+            )
+        
+        logger.info(f"Attached reference database {self.reference_db_path}")
     
     async def close(self):
         """Close the database connection"""
@@ -30,18 +93,39 @@ class DatabaseManager:
             with open('database/schema.sql', 'r') as f:
                 schema = f.read()
             
+            # Without a reference DB the static tables live in the main file
+            if not self.reference_attached:
+                with open('database/reference_schema.sql', 'r') as f:
+                    schema = f.read() + "\n" + schema
+            
             await self.pool.executescript(schema)
+            await self.migrate_columns()
             await self.pool.commit()
             logger.info("Database tables created successfully")
         except Exception as e:
             logger.error(f"Error creating database tables: {e}")
             raise
     
+    async def migrate_columns(self):
+        """Add any columns missing from tables created by an older schema"""
+        for table, column, definition in COLUMN_MIGRATIONS:
+            columns = await self.fetch_all(f"PRAGMA main.table_info({table})")
+            if columns and column not in {c['name'] for c in columns}:
+                await self.pool.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info(f"Added column {table}.{column}")
+    
     async def execute(self, query: str, params: Tuple = ()) -> int:
         """Execute a query and return the number of affected rows"""
-        async with self.pool.execute(query, params) as cursor:
+        async with self.transaction_lock:
+            async with self.pool.execute(query, params) as cursor:
+                await self.pool.commit()
+                return cursor.rowcount
+    
+    async def execute_many(self, query: str, params_seq: List[Tuple]):
+        """Execute a query for each parameter tuple in a single commit"""
+        async with self.transaction_lock:
+            await self.pool.executemany(query, params_seq)
             await self.pool.commit()
-            return cursor.rowcount
     
     async def fetch_one(self, query: str, params: Tuple = ()) -> Optional[Dict[str, Any]]:
         """Fetch a single row from the database"""
@@ -67,9 +151,10 @@ class DatabaseManager:
     
     async def insert_and_get_id(self, query: str, params: Tuple = ()) -> int:
         """Insert a row and return the inserted ID"""
-        async with self.pool.execute(query, params) as cursor:
-            await self.pool.commit()
-            return cursor.lastrowid
+        async with self.transaction_lock:
+            async with self.pool.execute(query, params) as cursor:
+                await self.pool.commit()
+                return cursor.lastrowid
     
     # User management
     async def get_or_create_user(self, discord_id: str, username: str) -> Dict[str, Any]:
@@ -118,7 +203,16 @@ class DatabaseManager:
         if not pokemon:
             raise ValueError(f"Pokemon with ID {pokemon_id} not found")
         
-        # Generate IVs (0-31)
+        pokemon_uid = await self.insert_and_get_id(
+            PLAYER_POKEMON_INSERT,
+            self._roll_pokemon_row(user_id, pokemon, level, is_shiny, caught_location)
+        )
+        
+        return pokemon_uid
+    
+    def _roll_pokemon_row(self, user_id: int, species: Dict[str, Any], level: int,
+                          is_shiny: bool, caught_location: str) -> Tuple:
+        """Roll IVs and a nature for a new Pokemon and return its PLAYER_POKEMON_INSERT parameters"""
         import random
         ivs = {
             'hp_iv': random.randint(0, 31),
@@ -128,38 +222,56 @@ class DatabaseManager:
             'sp_defense_iv': random.randint(0, 31),
             'speed_iv': random.randint(0, 31)
         }
+        nature = random_nature()
         
-        # Calculate stats
-        base_stats = {
-            'hp': pokemon['base_hp'],
-            'attack': pokemon['base_attack'],
-            'defense': pokemon['base_defense'],
-            'sp_attack': pokemon['base_sp_attack'],
-            'sp_defense': pokemon['base_sp_defense'],
-            'speed': pokemon['base_speed']
-        }
-        
-        # Simple stat calculation (simplified for this implementation)
-        max_hp = int(((2 * base_stats['hp'] + ivs['hp_iv']) * level) / 100) + level + 10
-        other_stats = {
-            stat: int(((2 * base_stats[stat.replace('_iv', '')] + ivs[f"{stat}"]) * level) / 100) + 5
-            for stat in ['attack_iv', 'defense_iv', 'sp_attack_iv', 'sp_defense_iv', 'speed_iv']
-        }
+        # Stats are stored so party loads and battles never recompute them
+        stats = stats_for_row({**species, **ivs, 'nature': nature}, level)
         
-        pokemon_uid = await self.insert_and_get_id("""
-            INSERT INTO player_pokemon (
-                user_id, pokemon_id, level, current_hp, max_hp,
-                hp_iv, attack_iv, defense_iv, sp_attack_iv, sp_defense_iv, speed_iv,
-                is_shiny, caught_location, ot_user_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            user_id, pokemon_id, level, max_hp, max_hp,
+        return (
+            user_id, species['pokemon_id'], level, stats[0], *stats,
             ivs['hp_iv'], ivs['attack_iv'], ivs['defense_iv'],
-            ivs['sp_attack_iv'], ivs['sp_defense_iv'], ivs['speed_iv'],
+            ivs['sp_attack_iv'], ivs['sp_defense_iv'], ivs['speed_iv'], nature,
             is_shiny, caught_location, user_id
-        ))
+        )
+    
+    async def backfill_pokemon_stats(self, batch_size: int = 1000) -> int:
+        """Fill the stored stat columns for Pokemon caught before they existed"""
+        updated = 0
+        last_id = 0
+        while True:
+            rows = await self.fetch_all("""
+                SELECT pp.id, pp.level, pp.nature, pp.current_hp, pp.max_hp,
+                       pp.hp_iv, pp.attack_iv, pp.defense_iv, pp.sp_attack_iv, pp.sp_defense_iv, pp.speed_iv,
+                       pp.hp_ev, pp.attack_ev, pp.defense_ev, pp.sp_attack_ev, pp.sp_defense_ev, pp.speed_ev,
+                       ps.base_hp, ps.base_attack, ps.base_defense, ps.base_sp_attack, ps.base_sp_defense, ps.base_speed
+                FROM player_pokemon pp
+                JOIN pokemon_species ps ON pp.pokemon_id = ps.pokemon_id
+                WHERE pp.attack IS NULL AND pp.id > ?
+                ORDER BY pp.id
+                LIMIT ?
+            """, (last_id, batch_size))
+            
+            if not rows:
+                break
+            
+            updates = []
+            for row in rows:
+                stats = stats_for_row(row)
+                current_hp = stats[0] if row['current_hp'] is None else min(row['current_hp'], stats[0])
+                updates.append((current_hp, *stats, row['id']))
+            
+            await self.execute_many("""
+                UPDATE player_pokemon
+                SET current_hp = ?, max_hp = ?, attack = ?, defense = ?, sp_attack = ?, sp_defense = ?, speed = ?
+                WHERE id = ?
+            """, updates)
+            
+            updated += len(updates)
+            last_id = rows[-1]['id']
         
-        return pokemon_uid
+        if updated:
+            logger.info(f"Computed stored stats for {updated} Pokemon")
+        return updated
     
     async def get_user_pokemon_count(self, user_id: int) -> int:
         """Get the number of Pokemon a user has"""
@@ -186,14 +298,16 @@ class DatabaseManager:
         return await self.fetch_all(query, tuple(params))
     
     # Spawn management
-    async def create_spawn(self, channel_id: str, pokemon_id: int, is_shiny: bool = False) -> int:
+    async def create_spawn(self, channel_id: str, pokemon_id: int, is_shiny: bool = False,
+                           despawn_time: Optional[datetime] = None, message_id: Optional[str] = None) -> int:
         """Create a new Pokemon spawn"""
-        despawn_time = datetime.now() + timedelta(minutes=40)
+        if despawn_time is None:
+            despawn_time = datetime.now() + timedelta(minutes=40)
         
         spawn_id = await self.insert_and_get_id("""
-            INSERT INTO active_spawns (channel_id, pokemon_id, is_shiny, despawn_time)
-            VALUES (?, ?, ?, ?)
-        """, (channel_id, pokemon_id, is_shiny, despawn_time))
+            INSERT INTO active_spawns (channel_id, pokemon_id, is_shiny, despawn_time, message_id)
+            VALUES (?, ?, ?, ?, ?)
+        """, (channel_id, pokemon_id, is_shiny, despawn_time, message_id))
         
         return spawn_id
     
@@ -207,31 +321,100 @@ class DatabaseManager:
             AND act.despawn_time > datetime('now')
         """, (channel_id,))
     
-    async def catch_spawn(self, spawn_id: int, user_id: int) -> bool:
-        """Mark a spawn as caught and add Pokemon to user"""
-        async with self.pool:
-            # Get spawn details
-            spawn = await self.fetch_one(
-                "SELECT * FROM active_spawns WHERE spawn_id = ?",
-                (spawn_id,)
-            )
-            
-            if not spawn or spawn['is_caught']:
-                return False
-            
-            # Mark as caught
-            await self.execute(
-                "UPDATE active_spawns SET is_caught = TRUE WHERE spawn_id = ?",
-                (spawn_id,)
-            )
-            
-            # Add Pokemon to user
-            pokemon_uid = await self.add_pokemon_to_user(
-                user_id, spawn['pokemon_id'],
-                is_shiny=spawn['is_shiny']
-            )
-            
-            return pokemon_uid is not None
+    async def get_all_active_spawns(self) -> List[Dict[str, Any]]:
+        """Get every uncaught spawn across all channels (used to rebuild the spawn registry)"""
+        return await self.fetch_all("""
+            SELECT act.*, ps.name, ps.type1, ps.type2, ps.sprite_url, ps.shiny_sprite_url, ps.category,
+                   ps.base_hp, ps.base_attack, ps.base_defense, ps.base_sp_attack, ps.base_sp_defense, ps.base_speed
+            FROM active_spawns act
+            JOIN pokemon_species ps ON act.pokemon_id = ps.pokemon_id
+            WHERE act.is_caught = FALSE
+        """)
+    
+    async def catch_spawn(self, spawn: Dict[str, Any], discord_id: str, username: str,
+                          credits: int, exp: int) -> Optional[Dict[str, Any]]:
+        """Atomically claim a spawn for a user and grant it with its rewards
+        
+        spawn needs spawn_id, pokemon_id, is_shiny and the species base stats. Returns
+        the catcher's user_id, new pokemon_uid and credits, or None if someone else
+        claimed the spawn first.
+        """
+        async with self.transaction_lock:
+            try:
+                # First claimant wins; everyone else sees rowcount 0
+                cursor = await self.pool.execute(
+                    "UPDATE active_spawns SET is_caught = TRUE WHERE spawn_id = ? AND is_caught = FALSE",
+                    (spawn['spawn_id'],)
+                )
+                if cursor.rowcount == 0:
+                    await self.pool.rollback()
+                    return None
+                
+                await self.pool.execute(
+                    "INSERT INTO users (discord_id, username) VALUES (?, ?) ON CONFLICT (discord_id) DO NOTHING",
+                    (discord_id, username)
+                )
+                async with self.pool.execute(
+                    """UPDATE users SET credits = credits + ?, total_exp = total_exp + ?
+                       WHERE discord_id = ? RETURNING user_id, credits""",
+                    (credits, exp, discord_id)
+                ) as cursor:
+                    user = dict(await cursor.fetchone())
+                
+                cursor = await self.pool.execute(
+                    PLAYER_POKEMON_INSERT,
+                    self._roll_pokemon_row(user['user_id'], spawn, 5, spawn['is_shiny'], "Wild")
+                )
+                user['pokemon_uid'] = cursor.lastrowid
+                
+                await self.pool.execute("""
+                    UPDATE daily_missions
+                    SET progress = progress + 1, completed = (progress + 1 >= requirement)
+                    WHERE user_id = ? AND mission_type = 'catch' AND mission_date = ? AND completed = FALSE
+                """, (user['user_id'], datetime.now().strftime('%Y-%m-%d')))
+                
+                await self.pool.commit()
+                return user
+            except Exception:
+                await self.pool.rollback()
+                raise
+    
+    # Cooldown snapshots
+    async def replace_cooldowns(self, namespace: str, rows: List[Tuple[str, float]]):
+        """Swap a namespace's saved cooldowns for (cooldown_key, expires_at) rows in one transaction"""
+        async with self.transaction_lock:
+            try:
+                await self.pool.execute("DELETE FROM cooldowns WHERE namespace = ?", (namespace,))
+                await self.pool.executemany(
+                    "INSERT INTO cooldowns (namespace, cooldown_key, expires_at) VALUES (?, ?, ?)",
+                    [(namespace, key, expires_at) for key, expires_at in rows]
+                )
+                await self.pool.commit()
+            except Exception:
+                await self.pool.rollback()
+                raise
+    
+    # Guild settings
+    async def get_all_guild_settings(self) -> List[Dict[str, Any]]:
+        """Get settings for every configured guild"""
+        return await self.fetch_all("SELECT * FROM guild_settings")
+    
+    async def get_guild_settings(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        """Get a guild's settings"""
+        return await self.fetch_one(
+            "SELECT * FROM guild_settings WHERE guild_id = ?",
+            (guild_id,)
+        )
+    
+    async def update_guild_setting(self, guild_id: str, column: str, value: Any):
+        """Set one guild setting, creating the guild's row if needed"""
+        if column not in ('spawn_channel_id', 'spawn_rate_multiplier', 'disabled_features', 'spawn_generations'):
+            raise ValueError(f"Unknown guild setting {column}")
+        
+        await self.execute(f"""
+            INSERT INTO guild_settings (guild_id, {column}) VALUES (?, ?)
+            ON CONFLICT (guild_id) DO UPDATE SET {column} = excluded.{column}, updated_at = CURRENT_TIMESTAMP
+        """, (guild_id, value))
     
     # Battle management
     async def create_battle(self, player1_id: int, player2_id: int, battle_type: str, channel_id: str) -> int:
@@ -250,6 +433,48 @@ class DatabaseManager:
             (battle_id,)
         )
     
+    async def save_battle_checkpoints(self, checkpoints: List[Tuple[bytes, int, Optional[int], int]]):
+        """Write (checkpoint, current_turn, turn_player_id, battle_id) rows in one commit"""
+        await self.execute_many("""
+            UPDATE active_battles
+            SET checkpoint = ?, current_turn = ?, turn_player_id = ?, last_action = CURRENT_TIMESTAMP
+            WHERE battle_id = ? AND status = 'active'
+        """, checkpoints)
+    
+    async def log_battle_actions(self, actions: List[Tuple]):
+        """Insert buffered battle_actions rows in one commit"""
+        await self.execute_many("""
+            INSERT INTO battle_actions (
+                battle_id, turn_number, player_id, pokemon_uid, action_type,
+                action_details, damage_dealt, damage_received
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, actions)
+    
+    async def get_battle_checkpoint(self, battle_id: int) -> Optional[bytes]:
+        """Latest checkpoint of a battle that is still active"""
+        return await self.fetch_val(
+            "SELECT checkpoint FROM active_battles WHERE battle_id = ? AND status = 'active'",
+            (battle_id,)
+        )
+    
+    async def set_battle_message(self, battle_id: int, message_id: str):
+        """Remember which message holds a battle's controls"""
+        await self.execute(
+            "UPDATE active_battles SET message_id = ? WHERE battle_id = ?",
+            (message_id, battle_id)
+        )
+    
+    async def get_battle_messages(self) -> List[Dict[str, Any]]:
+        """Started battles that are still active, with their message and player names"""
+        return await self.fetch_all("""
+            SELECT ab.battle_id, ab.channel_id, ab.message_id,
+                   u1.username AS player1_name, u2.username AS player2_name
+            FROM active_battles ab
+            LEFT JOIN users u1 ON ab.player1_id = u1.user_id
+            LEFT JOIN users u2 ON ab.player2_id = u2.user_id
+            WHERE ab.status = 'active' AND ab.message_id IS NOT NULL
+        """)
+    
     async def get_active_battles(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user's active battles"""
         return await self.fetch_all("""
@@ -275,12 +500,16 @@ class DatabaseManager:
             VALUES (?, ?, COALESCE((SELECT quantity FROM player_inventory WHERE user_id = ? AND item_id = ?), 0) + ?)
         """, (user_id, item_id, user_id, item_id, quantity))
     
-    async def remove_item_from_inventory(self, user_id: int, item_id: int, quantity: int = 1):
-        """Remove item from user's inventory"""
-        current_qty = await self.fetch_val(
+    async def get_item_quantity(self, user_id: int, item_id: int) -> int:
+        """How many of an item a user holds"""
+        return await self.fetch_val(
             "SELECT quantity FROM player_inventory WHERE user_id = ? AND item_id = ?",
             (user_id, item_id)
         ) or 0
+    
+    async def remove_item_from_inventory(self, user_id: int, item_id: int, quantity: int = 1):
+        """Remove item from user's inventory"""
+        current_qty = await self.get_item_quantity(user_id, item_id)
         
         if current_qty >= quantity:
             await self.execute(
@@ -291,9 +520,9 @@ class DatabaseManager:
         return False
     
     # Market management
-    async def create_market_listing(self, seller_id: int, pokemon_uid: int, price: int) -> int:
+    async def create_market_listing(self, seller_id: int, pokemon_uid: int, price: int, days: int = 7) -> int:
         """Create a market listing"""
-        expires_date = datetime.now() + timedelta(days=7)
+        expires_date = datetime.now() + timedelta(days=days)
         
         listing_id = await self.insert_and_get_id("""
             INSERT INTO market_listings (seller_id, pokemon_uid, price, expires_date)
@@ -382,6 +611,28 @@ class DatabaseManager:
             ORDER BY p.slot
         """, (user_id,))
     
+    async def get_battle_party(self, user_id: int) -> List[Dict[str, Any]]:
+        """Get user's party with the stored stats and typing needed to build combatants"""
+        return await self.fetch_all("""
+            SELECT pp.*, ps.name, ps.type1, ps.type2
+            FROM player_party p
+            JOIN player_pokemon pp ON p.pokemon_uid = pp.id
+            JOIN pokemon_species ps ON pp.pokemon_id = ps.pokemon_id
+            WHERE p.user_id = ?
+            ORDER BY p.slot
+        """, (user_id,))
+    
+    async def get_level_up_moves(self, pokemon_id: int, level: int, limit: int = 4) -> List[Dict[str, Any]]:
+        """Get the most recently learned level-up moves for a Pokemon at a level"""
+        return await self.fetch_all("""
+            SELECT m.*
+            FROM pokemon_moves pm
+            JOIN moves m ON pm.move_id = m.move_id
+            WHERE pm.pokemon_id = ? AND pm.learn_method = 'level-up' AND pm.level_learned <= ?
+            ORDER BY pm.level_learned DESC, m.move_id
+            LIMIT ?
+        """, (pokemon_id, level, limit))
+    
     async def add_pokemon_to_party(self, user_id: int, pokemon_uid: int, slot: int) -> bool:
         """Add Pokemon to party"""
         try:
@@ -468,6 +719,49 @@ class DatabaseManager:
             LIMIT ?
         """, (user_id, limit))
     
+    # Expiry management (driven by the timer service)
+    async def get_spawn_expiries(self) -> List[Dict[str, Any]]:
+        """Every spawn row with its despawn time"""
+        return await self.fetch_all("SELECT spawn_id, despawn_time FROM active_spawns")
+    
+    async def delete_spawn(self, spawn_id: int):
+        """Remove a spawn row"""
+        await self.execute("DELETE FROM active_spawns WHERE spawn_id = ?", (spawn_id,))
+    
+    async def get_market_listing_expiries(self) -> List[Dict[str, Any]]:
+        """Unsold market listings with their expiry date"""
+        return await self.fetch_all(
+            "SELECT listing_id, expires_date FROM market_listings WHERE is_sold = FALSE"
+        )
+    
+    async def expire_market_listing(self, listing_id: int):
+        """Remove a market listing if it hasn't sold"""
+        await self.execute(
+            "DELETE FROM market_listings WHERE listing_id = ? AND is_sold = FALSE",
+            (listing_id,)
+        )
+    
+    async def get_pending_trade_expiries(self, timeout: int) -> List[Dict[str, Any]]:
+        """Pending trades with the seconds left before they time out"""
+        return await self.fetch_all("""
+            SELECT trade_id, (julianday(created_date) - julianday('now')) * 86400 + ? AS remaining
+            FROM trades WHERE status = 'pending'
+        """, (timeout,))
+    
+    async def expire_trade(self, trade_id: int) -> bool:
+        """Cancel a trade that is still pending"""
+        return await self.execute(
+            "UPDATE trades SET status = 'cancelled' WHERE trade_id = ? AND status = 'pending'",
+            (trade_id,)
+        ) > 0
+    
+    async def get_battle_expiries(self, timeout: int) -> List[Dict[str, Any]]:
+        """Active battles with the seconds left before they time out"""
+        return await self.fetch_all("""
+            SELECT battle_id, (julianday(last_action) - julianday('now')) * 86400 + ? AS remaining
+            FROM active_battles WHERE status = 'active'
+        """, (timeout,))
+    
     # Cleanup methods
     async def cleanup_expired_spawns(self):
         """Clean up expired spawns"""
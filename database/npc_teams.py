@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+NPC Team Pool
+Builds NPC parties offline for every level band and difficulty from the species
+catalog, and samples them at battle start without touching the database.
+
+    python -m database.npc_teams build
+    python -m database.npc_teams show --level 35 --difficulty hard
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import zlib
+from typing import Dict, List, Optional, Any, Tuple
+import logging
+
+from utils.battle_state import Combatant, MoveSlot, STATS
+from utils.type_chart import EFFECTIVENESS, TYPE_COUNT, type_id
+
+logger = logging.getLogger(__name__)
+
+POOL_VERSION = 1
+BAND_SIZE = 10  # Levels 1-10, 11-20, ... 91-100
+BAND_COUNT = 10
+
+# difficulty -> (party size, IVs, level offset from the player, candidate teams scored per kept team)
+DIFFICULTIES = {
+    'easy': (3, 10, -3, 1),
+    'normal': (4, 20, 0, 8),
+    'hard': (6, 31, 2, 64)
+}
+
+
+def band_for(level: int) -> int:
+    return min(BAND_COUNT - 1, max(0, (level - 1) // BAND_SIZE))
+
+
+def _stat_cap(band: int, difficulty: str) -> int:
+    """Highest base stat total allowed: unevolved Pokemon early, fully evolved later"""
+    return 320 + band * 50 + {'easy': -40, 'normal': 0, 'hard': 60}[difficulty]
+
+
+def _load_catalog(conn: sqlite3.Connection) -> Tuple[List[Dict[str, Any]], Dict[int, List[Dict[str, Any]]]]:
+    """Species rows and each species' level-up moves, ordered by level learned"""
+    conn.row_factory = sqlite3.Row
+    species = [dict(row) for row in conn.execute("""
+        SELECT pokemon_id, name, type1, type2, category,
+               base_hp, base_attack, base_defense, base_sp_attack, base_sp_defense, base_speed
+        FROM pokemon_species
+    """)]
+
+    learnsets: Dict[int, List[Dict[str, Any]]] = {}
+    for row in conn.execute("""
+        SELECT pm.pokemon_id, pm.level_learned, m.*
+        FROM pokemon_moves pm
+        JOIN moves m ON pm.move_id = m.move_id
+        WHERE pm.learn_method = 'level-up'
+        ORDER BY pm.pokemon_id, pm.level_learned
+    """):
+        learnsets.setdefault(row['pokemon_id'], []).append(dict(row))
+
+    return species, learnsets
+
+
+def _stat_total(species: Dict[str, Any]) -> int:
+    return sum(species[f'base_{stat}'] for stat in STATS)
+
+
+def _pick_moves(learnset: List[Dict[str, Any]], species: Dict[str, Any], level: int, smart: bool) -> List[Dict[str, Any]]:
+    """Four moves known at a level: the latest learned, or for smart teams the strongest spread"""
+    known = [move for move in learnset if (move['level_learned'] or 0) <= level]
+    if not smart:
+        return known[-4:]
+
+    def strength(move):
+        power = move['power'] or 0
+        stab = 1.5 if move['type'] in (species['type1'], species['type2']) else 1.0
+        return power * stab * (move['accuracy'] or 100) / 100
+
+    chosen, types = [], set()
+    for move in sorted(known, key=strength, reverse=True):
+        if move['power'] and move['type'] not in types:
+            chosen.append(move)
+            types.add(move['type'])
+        if len(chosen) == 4:
+            break
+
+    # Top up with status moves or repeats of a type
+    for move in reversed(known):
+        if len(chosen) == 4:
+            break
+        if move not in chosen:
+            chosen.append(move)
+    return chosen
+
+
+def _score(team: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> float:
+    """Offensive coverage, defensive spread and raw stats, each roughly 0-1"""
+    attack_types = {type_id(move['type']) for _, moves in team for move in moves if move['power']}
+    attack_types.discard(None)
+    covered = sum(
+        1 for defender in range(TYPE_COUNT)
+        if any(EFFECTIVENESS[attacker * TYPE_COUNT + defender] > 1 for attacker in attack_types)
+    )
+
+    def resists(species, attacker):
+        multiplier = 1.0
+        for name in (species['type1'], species['type2']):
+            defender = type_id(name)
+            if defender is not None:
+                multiplier *= EFFECTIVENESS[attacker * TYPE_COUNT + defender]
+        return multiplier < 1
+
+    resisted = sum(1 for attacker in range(TYPE_COUNT) if any(resists(species, attacker) for species, _ in team))
+    stats = sum(_stat_total(species) for species, _ in team) / (len(team) * 600)
+
+    return covered / TYPE_COUNT + resisted / TYPE_COUNT + stats
+
+
+def _team_entry(team: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> List[List[Any]]:
+    """Compact per-member lists: species, typing, base stats and move slots"""
+    return [
+        [species['pokemon_id'], species['name'], species['type1'], species['type2'],
+         [species[f'base_{stat}'] for stat in STATS],
+         [MoveSlot.from_row(move).to_list() for move in moves]]
+        for species, moves in team
+    ]
+
+
+def build_pool(db_path: str, out_path: str, teams_per_bucket: int = 50, seed: int = 1) -> Dict[str, int]:
+    """Generate teams for every band and difficulty and write them to out_path"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    try:
+        species, learnsets = _load_catalog(conn)
+    finally:
+        conn.close()
+
+    buckets: Dict[str, List[Any]] = {}
+    for band in range(BAND_COUNT):
+        top_level = (band + 1) * BAND_SIZE
+        for difficulty, (size, _, _, candidates) in DIFFICULTIES.items():
+            cap = _stat_cap(band, difficulty)
+            allow_legendary = difficulty == 'hard' and band >= 7
+            eligible = [
+                row for row in species
+                if _stat_total(row) <= cap
+                and (allow_legendary or row['category'] == 'normal')
+                and any(move['power'] and (move['level_learned'] or 0) <= top_level for move in learnsets.get(row['pokemon_id'], []))
+            ]
+            if len(eligible) < size:
+                logger.warning(f"Only {len(eligible)} species fit band {band} {difficulty}; skipping")
+                continue
+
+            teams = []
+            for _ in range(teams_per_bucket):
+                best, best_score = None, float('-inf')
+                for _ in range(candidates):
+                    members = rng.sample(eligible, size)
+                    team = [
+                        (row, _pick_moves(learnsets[row['pokemon_id']], row, top_level, difficulty != 'easy'))
+                        for row in members
+                    ]
+                    score = _score(team) if candidates > 1 else 0.0
+                    if score > best_score:
+                        best, best_score = team, score
+                teams.append(_team_entry(best))
+
+            buckets[f"{band}:{difficulty}"] = teams
+
+    payload = {'version': POOL_VERSION, 'band_size': BAND_SIZE, 'buckets': buckets}
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), 9))
+    os.replace(tmp_path, out_path)
+
+    logger.info(f"Wrote NPC team pool {out_path} ({len(buckets)} buckets)")
+    return {key: len(teams) for key, teams in buckets.items()}
+
+
+class NPCTeamPool:
+    """Prebuilt NPC teams by level band and difficulty, held in memory"""
+
+    def __init__(self, buckets: Dict[str, List[Any]]):
+        self.buckets: Dict[Tuple[int, str], List[Any]] = {}
+        for key, teams in buckets.items():
+            band, difficulty = key.split(':')
+            self.buckets[(int(band), difficulty)] = teams
+
+    def __len__(self) -> int:
+        return sum(len(teams) for teams in self.buckets.values())
+
+    def sample(self, level: int, difficulty: str, rng: random.Random = random) -> List[Combatant]:
+        """A fresh NPC party for a player level; empty if the pool has nothing close"""
+        if difficulty not in DIFFICULTIES:
+            difficulty = 'normal'
+        _, iv, offset, _ = DIFFICULTIES[difficulty]
+
+        # Prefer the player's band, then the nearest one that was built
+        band = band_for(level)
+        teams = None
+        for distance in range(BAND_COUNT):
+            teams = self.buckets.get((band - distance, difficulty)) or self.buckets.get((band + distance, difficulty))
+            if teams:
+                break
+        if not teams:
+            return []
+
+        npc_level = min(100, max(1, level + offset))
+        party = []
+        for pokemon_id, name, type1, type2, base_stats, moves in rng.choice(teams):
+            row = {
+                'id': None, 'pokemon_id': pokemon_id, 'name': name, 'level': npc_level,
+                'type1': type1, 'type2': type2,
+                **{f'base_{stat}': value for stat, value in zip(STATS, base_stats)},
+                **{f'{stat}_iv': iv for stat in STATS}
+            }
+            party.append(Combatant.from_party_row(row, [MoveSlot.from_list(move) for move in moves]))
+        return party
+
+
+def load_npc_teams(path: str) -> Optional[NPCTeamPool]:
+    """Load a pool written by build_pool, or None if there isn't a usable one"""
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            payload = json.loads(zlib.decompress(f.read()))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable NPC team pool {path}: {e}")
+        return None
+
+    if payload.get('version') != POOL_VERSION or payload.get('band_size') != BAND_SIZE:
+        logger.warning(f"NPC team pool {path} is outdated; rebuild it with `python -m database.npc_teams build`")
+        return None
+
+    pool = NPCTeamPool(payload['buckets'])
+    logger.info(f"Loaded NPC team pool {path} ({len(pool)} teams)")
+    return pool
+
+
+def main():
+    """Command line entry point"""
+    from config import Config
+    config = Config()
+
+    parser = argparse.ArgumentParser(description="Build or inspect the NPC team pool")
+    parser.add_argument('command', choices=['build', 'show'])
+    default_db = config.reference_database_path if os.path.exists(config.reference_database_path) else config.database_path
+    parser.add_argument('--db', default=default_db, help="Database holding the species and move tables")
+    parser.add_argument('--out', default=config.npc_team_pool_path, help="Pool file path")
+    parser.add_argument('--teams', type=int, default=50, help="Teams per level band and difficulty")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--level', type=int, default=50, help="Player level to sample for (show)")
+    parser.add_argument('--difficulty', default='normal', choices=list(DIFFICULTIES))
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        counts = build_pool(args.db, args.out, args.teams, args.seed)
+        if not counts:
+            print(f"❌ No teams could be built from {args.db}; is the species catalog loaded?")
+            sys.exit(1)
+        print(f"✅ Wrote {args.out} ({sum(counts.values())} teams in {len(counts)} buckets)")
+        return
+
+    pool = load_npc_teams(args.out)
+    if not pool:
+        print(f"❌ {args.out} is missing or outdated")
+        sys.exit(1)
+    for pokemon in pool.sample(args.level, args.difficulty):
+        moves = ', '.join(move.name for move in pokemon.moves)
+        print(f"{pokemon.name} Lv.{pokemon.level} ({pokemon.type1}{'/' + pokemon.type2 if pokemon.type2 else ''}) - {moves}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+-- Pokemon Discord Bot Reference Schema
+-- Static game data (from PokeAPI). Lives in its own database file that the
+-- bot attaches read-only; see database/split_reference.py
+
+-- Pokemon species table (from PokeAPI)
+CREATE TABLE IF NOT EXISTS pokemon_species (
+    pokemon_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    pokedex_number INTEGER NOT NULL,
+    type1 TEXT NOT NULL,
+    type2 TEXT,
+    base_hp INTEGER NOT NULL,
+    base_attack INTEGER NOT NULL,
+    base_defense INTEGER NOT NULL,
+    base_sp_attack INTEGER NOT NULL,
+    base_sp_defense INTEGER NOT NULL,
+    base_speed INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    weight INTEGER NOT NULL,
+    sprite_url TEXT,
+    shiny_sprite_url TEXT,
+    category TEXT, -- legendary, mythical, ultra_beast, normal
+    is_mega BOOLEAN DEFAULT FALSE,
+    is_alolan BOOLEAN DEFAULT FALSE,
+    is_galarian BOOLEAN DEFAULT FALSE,
+    is_hisuian BOOLEAN DEFAULT FALSE,
+    is_paldean BOOLEAN DEFAULT FALSE,
+    evolution_chain_id INTEGER,
+    evolves_from_species_id INTEGER,
+    habitat TEXT,
+    color TEXT,
+    shape TEXT,
+    generation INTEGER
+);
+
+-- Pokemon moves table
+CREATE TABLE IF NOT EXISTS moves (
+    move_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL, -- physical, special, status
+    power INTEGER,
+    accuracy INTEGER,
+    pp INTEGER NOT NULL,
+    max_pp INTEGER NOT NULL,
+    priority INTEGER DEFAULT 0,
+    target TEXT NOT NULL, -- user, selected-pokemon, all-opponents, etc
+    effect_chance INTEGER,
+    effect_description TEXT,
+    short_effect TEXT,
+    flavor_text TEXT,
+    damage_class TEXT,
+    crit_rate INTEGER DEFAULT 0,
+    drain INTEGER DEFAULT 0,
+    healing INTEGER DEFAULT 0,
+    ailment TEXT,
+    ailment_chance INTEGER DEFAULT 0,
+    stat_changes TEXT, -- JSON string of stat changes
+    min_hits INTEGER DEFAULT 1,
+    max_hits INTEGER DEFAULT 1,
+    min_turns INTEGER DEFAULT 1,
+    max_turns INTEGER DEFAULT 1
+);
+
+-- Pokemon abilities table
+CREATE TABLE IF NOT EXISTS abilities (
+    ability_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    short_effect TEXT,
+    flavor_text TEXT,
+    is_hidden BOOLEAN DEFAULT FALSE,
+    generation INTEGER
+);
+
+-- Items table
+CREATE TABLE IF NOT EXISTS items (
+    item_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL, -- medicine, pokeballs, battle-items, etc
+    cost INTEGER DEFAULT 0,
+    description TEXT NOT NULL,
+    short_effect TEXT,
+    flavor_text TEXT,
+    sprite_url TEXT,
+    battle_effect TEXT, -- JSON string for battle effects
+    field_effect TEXT, -- JSON string for field effects
+    pocket TEXT, -- items, medicine, pokeballs, tm, hm, berries, key
+    fling_power INTEGER,
+    fling_effect TEXT
+);
+
+-- Pokemon movesets (which Pokemon can learn which moves)
+CREATE TABLE IF NOT EXISTS pokemon_moves (
+    pokemon_id INTEGER NOT NULL,
+    move_id INTEGER NOT NULL,
+    learn_method TEXT NOT NULL, -- level-up, tm, tr, egg, tutor, evolution
+    level_learned INTEGER DEFAULT 0,
+    PRIMARY KEY (pokemon_id, move_id),
+    FOREIGN KEY (pokemon_id) REFERENCES pokemon_species(pokemon_id),
+    FOREIGN KEY (move_id) REFERENCES moves(move_id)
+);
+
+-- Pokemon abilities (which Pokemon have which abilities)
+CREATE TABLE IF NOT EXISTS pokemon_abilities (
+    pokemon_id INTEGER NOT NULL,
+    ability_id INTEGER NOT NULL,
+    is_hidden BOOLEAN DEFAULT FALSE,
+    slot INTEGER NOT NULL,
+    PRIMARY KEY (pokemon_id, ability_id),
+    FOREIGN KEY (pokemon_id) REFERENCES pokemon_species(pokemon_id),
+    FOREIGN KEY (ability_id) REFERENCES abilities(ability_id)
+);
+
+-- Build metadata, e.g. the contents checksum reference snapshots are tied to
+CREATE TABLE IF NOT EXISTS reference_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- Indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_pokemon_species_name ON pokemon_species(name);
+CREATE INDEX IF NOT EXISTS idx_pokemon_species_type ON pokemon_species(type1, type2);
+CREATE INDEX IF NOT EXISTS idx_pokemon_species_category ON pokemon_species(category);
+CREATE INDEX IF NOT EXISTS idx_moves_type ON moves(type);
+CREATE INDEX IF NOT EXISTS idx_moves_category ON moves(category);
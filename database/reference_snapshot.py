@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Reference Data Snapshot
+Serializes the static reference tables into one memory-mappable file.
+
+    python -m database.reference_snapshot build
+    python -m database.reference_snapshot verify
+"""
+
+import argparse
+import bisect
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+import logging
+
+from utils.type_chart import TYPE_EFFECTIVENESS, TYPES
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PKREFSNP'
+FORMAT_VERSION = 3
+
+# magic, format version, section count, checksum of the source tables' contents
+HEADER = struct.Struct('<8sHH32s')
+# tag, offset, record count, record size
+SECTION = struct.Struct('<4sIII')
+# A string column is stored as (offset, length) into the string table
+NULL_STRING = 0xFFFFFFFF
+NULL_INT = -0x80000000
+
+# Sections: tag -> (source table, key columns, [(column, kind)])
+# kind 'i' is a nullable int32, 'b' a bool and 's' a string table reference.
+# Rows are stored sorted by the key columns so lookups can bisect.
+SECTIONS = {
+    b'SPEC': ('pokemon_species', ('pokemon_id',), [
+        ('pokemon_id', 'i'), ('name', 's'), ('pokedex_number', 'i'),
+        ('type1', 's'), ('type2', 's'),
+        ('base_hp', 'i'), ('base_attack', 'i'), ('base_defense', 'i'),
+        ('base_sp_attack', 'i'), ('base_sp_defense', 'i'), ('base_speed', 'i'),
+        ('height', 'i'), ('weight', 'i'), ('sprite_url', 's'), ('shiny_sprite_url', 's'),
+        ('category', 's'), ('is_mega', 'b'), ('is_alolan', 'b'), ('is_galarian', 'b'),
+        ('is_hisuian', 'b'), ('is_paldean', 'b'), ('evolution_chain_id', 'i'),
+        ('evolves_from_species_id', 'i'), ('habitat', 's'), ('color', 's'),
+        ('shape', 's'), ('generation', 'i')
+    ]),
+    b'MOVE': ('moves', ('move_id',), [
+        ('move_id', 'i'), ('name', 's'), ('type', 's'), ('category', 's'),
+        ('power', 'i'), ('accuracy', 'i'), ('pp', 'i'), ('max_pp', 'i'),
+        ('priority', 'i'), ('target', 's'), ('effect_chance', 'i'),
+        ('short_effect', 's'), ('damage_class', 's'), ('crit_rate', 'i'),
+        ('drain', 'i'), ('healing', 'i'), ('ailment', 's'), ('ailment_chance', 'i'),
+        ('stat_changes', 's'), ('min_hits', 'i'), ('max_hits', 'i'),
+        ('min_turns', 'i'), ('max_turns', 'i')
+    ]),
+    b'LRNS': ('pokemon_moves', ('pokemon_id', 'move_id'), [
+        ('pokemon_id', 'i'), ('move_id', 'i'), ('learn_method', 's'), ('level_learned', 'i')
+    ]),
+    b'ABIL': ('abilities', ('ability_id',), [
+        ('ability_id', 'i'), ('name', 's'), ('short_effect', 's'),
+        ('is_hidden', 'b'), ('generation', 'i')
+    ]),
+    b'PABL': ('pokemon_abilities', ('pokemon_id', 'ability_id'), [
+        ('pokemon_id', 'i'), ('ability_id', 'i'), ('is_hidden', 'b'), ('slot', 'i')
+    ]),
+    b'ITEM': ('items', ('item_id',), [
+        ('item_id', 'i'), ('name', 's'), ('category', 's'), ('cost', 'i'),
+        ('short_effect', 's'), ('sprite_url', 's'), ('battle_effect', 's'),
+        ('pocket', 's'), ('fling_power', 'i')
+    ]),
+}
+
+STRING_TABLE_TAG = b'STRS'
+TYPE_NAMES_TAG = b'TYPN'
+TYPE_CHART_TAG = b'TYPC'
+
+_KIND_CODES = {'i': 'i', 'b': '?', 's': 'II'}
+
+
+def _record_struct(columns: List[Tuple[str, str]]) -> struct.Struct:
+    return struct.Struct('<' + ''.join(_KIND_CODES[kind] for _, kind in columns))
+
+
+def reference_checksum(conn: sqlite3.Connection) -> bytes:
+    """Hash the reference tables' contents (a full read; done when building, not at startup)"""
+    digest = hashlib.sha256()
+    for tag, (table, key_columns, columns) in SECTIONS.items():
+        digest.update(tag)
+        names = ', '.join(column for column, _ in columns)
+        order = ', '.join(key_columns)
+        for row in conn.execute(f"SELECT {names} FROM {table} ORDER BY {order}"):
+            digest.update(repr(tuple(row)).encode('utf-8'))
+    digest.update(repr(sorted((k, sorted(v.items())) for k, v in TYPE_EFFECTIVENESS.items())).encode('utf-8'))
+    return digest.digest()
+
+
+def stamp_reference_checksum(conn: sqlite3.Connection) -> bytes:
+    """Store the contents checksum in reference_meta, rewriting it only if it changed"""
+    checksum = reference_checksum(conn)
+    if stored_checksum(conn) != checksum:
+        with conn:
+            # Reference DBs split before the table existed don't have it
+            conn.execute("CREATE TABLE IF NOT EXISTS reference_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute(
+                "INSERT OR REPLACE INTO reference_meta (key, value) VALUES ('content_checksum', ?)",
+                (checksum.hex(),)
+            )
+    return checksum
+
+
+def stored_checksum(conn: sqlite3.Connection) -> Optional[bytes]:
+    """The checksum recorded by stamp_reference_checksum, None if the DB was never stamped"""
+    try:
+        row = conn.execute("SELECT value FROM reference_meta WHERE key = 'content_checksum'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return bytes.fromhex(row[0]) if row else None
+
+
+class _StringTable:
+    """Deduplicating UTF-8 string pool"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets: Dict[str, int] = {}
+
+    def add(self, value: Optional[Any]) -> Tuple[int, int]:
+        if value is None:
+            return NULL_STRING, 0
+        encoded = str(value).encode('utf-8')
+        key = str(value)
+        if key not in self.offsets:
+            self.offsets[key] = len(self.data)
+            self.data.extend(encoded)
+        return self.offsets[key], len(encoded)
+
+
+def build_snapshot(db_path: str, out_path: str) -> bytes:
+    """Write a snapshot of the reference tables in db_path to out_path; returns the checksum"""
+    conn = sqlite3.connect(db_path)
+    try:
+        checksum = stamp_reference_checksum(conn)
+        strings = _StringTable()
+        sections: List[Tuple[bytes, bytes, int, int]] = []
+
+        for tag, (table, key_columns, columns) in SECTIONS.items():
+            record = _record_struct(columns)
+            names = ', '.join(column for column, _ in columns)
+            order = ', '.join(key_columns)
+            payload = bytearray()
+            count = 0
+            for row in conn.execute(f"SELECT {names} FROM {table} ORDER BY {order}"):
+                values = []
+                for (_, kind), value in zip(columns, row):
+                    if kind == 's':
+                        values.extend(strings.add(value))
+                    elif kind == 'b':
+                        values.append(bool(value))
+                    else:
+                        values.append(NULL_INT if value is None else int(value))
+                payload.extend(record.pack(*values))
+                count += 1
+            sections.append((tag, bytes(payload), count, record.size))
+
+        # Type chart as a dense float32 matrix in TYPES order
+        name_record = struct.Struct('<II')
+        type_names = b''.join(name_record.pack(*strings.add(name)) for name in TYPES)
+        sections.append((TYPE_NAMES_TAG, type_names, len(TYPES), name_record.size))
+
+        row_record = struct.Struct('<' + 'f' * len(TYPES))
+        chart = b''.join(
+            row_record.pack(*(TYPE_EFFECTIVENESS[attacker].get(defender, 1.0) for defender in TYPES))
+            for attacker in TYPES
+        )
+        sections.append((TYPE_CHART_TAG, chart, len(TYPES), row_record.size))
+
+        sections.append((STRING_TABLE_TAG, bytes(strings.data), len(strings.data), 1))
+    finally:
+        conn.close()
+
+    # Lay out the file: header, section directory, then 8-byte aligned payloads
+    offset = HEADER.size + SECTION.size * len(sections)
+    directory = bytearray()
+    blobs = bytearray()
+    for tag, payload, count, size in sections:
+        padding = (-offset) % 8
+        blobs.extend(b'\0' * padding)
+        offset += padding
+        directory.extend(SECTION.pack(tag, offset, count, size))
+        blobs.extend(payload)
+        offset += len(payload)
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), checksum))
+        f.write(directory)
+        f.write(blobs)
+    os.replace(tmp_path, out_path)
+
+    logger.info(f"Wrote reference snapshot {out_path} ({offset} bytes)")
+    return checksum
+
+
+class SnapshotTable:
+    """Zero-copy view over one fixed-width section"""
+
+    def __init__(self, snapshot: 'ReferenceSnapshot', tag: bytes, offset: int, count: int, size: int):
+        table, key_columns, columns = SECTIONS[tag]
+        self.snapshot = snapshot
+        self.name = table
+        self.columns = columns
+        self.record = _record_struct(columns)
+        self.offset = offset
+        self.count = count
+        if size != self.record.size:
+            raise ValueError(f"Snapshot section {tag!r} has record size {size}, expected {self.record.size}")
+
+        # Byte offset of each key column inside a record
+        self._key_fields = []
+        position = 0
+        for column, kind in columns:
+            if column in key_columns:
+                self._key_fields.append(position)
+            position += struct.calcsize('<' + _KIND_CODES[kind])
+        self._key = struct.Struct('<i')
+        self._keys = _KeyView(self)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        values = self.record.unpack_from(self.snapshot.buffer, self.offset + index * self.record.size)
+        return self._decode(values)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.count):
+            yield self[index]
+
+    def iter_columns(self, *names: str) -> Iterator[Tuple[Any, ...]]:
+        """Yield just the named columns of every record, unpacked straight from the mapping
+
+        Skips building a dict per row; each distinct string is decoded once.
+        """
+        positions = []
+        position = 0
+        for column, kind in self.columns:
+            positions.append((column, kind, position))
+            position += 2 if kind == 's' else 1
+        picked = []
+        for name in names:
+            column, kind, position = next(entry for entry in positions if entry[0] == name)
+            picked.append((kind, position))
+
+        strings: Dict[int, Optional[str]] = {}
+        data = self.snapshot.buffer[self.offset:self.offset + self.count * self.record.size]
+        try:
+            for values in self.record.iter_unpack(data):
+                row = []
+                for kind, position in picked:
+                    value = values[position]
+                    if kind == 's':
+                        if value not in strings:
+                            strings[value] = self.snapshot.string(value, values[position + 1])
+                        value = strings[value]
+                    elif kind == 'i' and value == NULL_INT:
+                        value = None
+                    row.append(value)
+                yield tuple(row)
+        finally:
+            data.release()
+
+    def key_at(self, index: int) -> Tuple[int, ...]:
+        base = self.offset + index * self.record.size
+        return tuple(self._key.unpack_from(self.snapshot.buffer, base + field)[0] for field in self._key_fields)
+
+    def get(self, *key: int) -> Optional[Dict[str, Any]]:
+        """Find the row with this (full) primary key"""
+        index = bisect.bisect_left(self._keys, key)
+        if index < self.count and self.key_at(index) == key:
+            return self[index]
+        return None
+
+    def prefix(self, *key: int) -> List[Dict[str, Any]]:
+        """All rows whose key starts with the given values (e.g. a species' learnset)"""
+        start = bisect.bisect_left(self._keys, key)
+        rows = []
+        for index in range(start, self.count):
+            if self.key_at(index)[:len(key)] != key:
+                break
+            rows.append(self[index])
+        return rows
+
+    def _decode(self, values: Tuple) -> Dict[str, Any]:
+        row = {}
+        position = 0
+        for column, kind in self.columns:
+            if kind == 's':
+                row[column] = self.snapshot.string(values[position], values[position + 1])
+                position += 2
+            else:
+                value = values[position]
+                row[column] = None if kind == 'i' and value == NULL_INT else value
+                position += 1
+        return row
+
+
+class _KeyView:
+    """Sequence of record keys so bisect can search a section in place"""
+
+    def __init__(self, table: SnapshotTable):
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.table.count
+
+    def __getitem__(self, index: int) -> Tuple[int, ...]:
+        return self.table.key_at(index)
+
+
+class ReferenceSnapshot:
+    """Memory-mapped reference data; pages are shared between processes on one host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self._mmap)
+
+        magic, version, section_count, checksum = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a reference snapshot")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} has snapshot format {version}, expected {FORMAT_VERSION}")
+
+        self.checksum = checksum
+        self.tables: Dict[str, SnapshotTable] = {}
+        directory = {}
+        for index in range(section_count):
+            tag, offset, count, size = SECTION.unpack_from(self.buffer, HEADER.size + index * SECTION.size)
+            directory[tag] = (offset, count, size)
+
+        strings_offset, strings_length, _ = directory[STRING_TABLE_TAG]
+        self._strings = self.buffer[strings_offset:strings_offset + strings_length]
+
+        for tag in SECTIONS:
+            offset, count, size = directory[tag]
+            table = SnapshotTable(self, tag, offset, count, size)
+            self.tables[table.name] = table
+
+        names_offset, type_count, _ = directory[TYPE_NAMES_TAG]
+        self.type_names = [
+            self.string(*struct.unpack_from('<II', self.buffer, names_offset + index * 8))
+            for index in range(type_count)
+        ]
+        chart_offset, _, row_size = directory[TYPE_CHART_TAG]
+        self.type_chart = self.buffer[chart_offset:chart_offset + row_size * type_count].cast('f')
+
+    @property
+    def species(self) -> SnapshotTable:
+        return self.tables['pokemon_species']
+
+    @property
+    def moves(self) -> SnapshotTable:
+        return self.tables['moves']
+
+    @property
+    def learnsets(self) -> SnapshotTable:
+        return self.tables['pokemon_moves']
+
+    @property
+    def abilities(self) -> SnapshotTable:
+        return self.tables['abilities']
+
+    @property
+    def pokemon_abilities(self) -> SnapshotTable:
+        return self.tables['pokemon_abilities']
+
+    @property
+    def items(self) -> SnapshotTable:
+        return self.tables['items']
+
+    def string(self, offset: int, length: int) -> Optional[str]:
+        if offset == NULL_STRING:
+            return None
+        return str(self._strings[offset:offset + length], 'utf-8')
+
+    def effectiveness(self, attacking_type: str, defending_type: str) -> float:
+        """Single-type multiplier straight from the mapped chart"""
+        count = len(self.type_names)
+        return self.type_chart[self.type_names.index(attacking_type) * count + self.type_names.index(defending_type)]
+
+    def level_up_moves(self, pokemon_id: int, level: int, limit: int = 4) -> List[Dict[str, Any]]:
+        """Same rows as DatabaseManager.get_level_up_moves, read from the mapped learnset and moves"""
+        learned = [
+            row for row in self.learnsets.prefix(pokemon_id)
+            if row['learn_method'] == 'level-up' and row['level_learned'] is not None and row['level_learned'] <= level
+        ]
+        learned.sort(key=lambda row: (-row['level_learned'], row['move_id']))
+
+        moves = []
+        for row in learned:
+            move = self.moves.get(row['move_id'])
+            if move:
+                moves.append(move)
+                if len(moves) == limit:
+                    break
+        return moves
+
+    def close(self):
+        """Release the mapping"""
+        for table in self.tables.values():
+            table.snapshot = None
+        self.tables = {}
+        if hasattr(self, '_strings'):
+            self._strings.release()
+        if hasattr(self, 'type_chart'):
+            self.type_chart.release()
+        self.buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def load_snapshot(path: str, db_path: Optional[str] = None) -> Optional[ReferenceSnapshot]:
+    """Open a snapshot if it exists and (when db_path is given) matches the checksum stored in the database"""
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        snapshot = ReferenceSnapshot(path)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable reference snapshot {path}: {e}")
+        return None
+
+    if db_path:
+        # One indexed read; the contents were hashed when the DB was split or the snapshot built
+        conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            expected = stored_checksum(conn)
+        finally:
+            conn.close()
+
+        if expected != snapshot.checksum:
+            logger.warning(f"Reference snapshot {path} is stale; rebuild it with `python -m database.reference_snapshot build`")
+            snapshot.close()
+            return None
+
+    logger.info(f"Loaded reference snapshot {path} ({len(snapshot.species)} species, {len(snapshot.moves)} moves)")
+    return snapshot
+
+
+def main():
+    """Command line entry point"""
+    from config import Config
+    config = Config()
+
+    parser = argparse.ArgumentParser(description="Build or verify the reference data snapshot")
+    parser.add_argument('command', choices=['build', 'verify'])
+    parser.add_argument('--db', default=config.reference_database_path,
+                        help="Reference database (see database.split_reference) the snapshot is tied to")
+    parser.add_argument('--out', default=config.reference_snapshot_path, help="Snapshot file path")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        checksum = build_snapshot(args.db, args.out)
+        print(f"✅ Wrote {args.out} (checksum {checksum.hex()[:16]})")
+        return
+
+    snapshot = load_snapshot(args.out, args.db)
+    if not snapshot:
+        print(f"❌ {args.out} is missing or does not match {args.db}")
+        sys.exit(1)
+    print(f"✅ {args.out} matches {args.db}")
+    snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
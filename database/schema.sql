@@ -1,5 +1,6 @@
 -- Pokemon Discord Bot Database Schema
 -- Comprehensive database structure for all game components
+-- (static reference tables are in reference_schema.sql)
 
 -- Users table
 CREATE TABLE IF NOT EXISTS users (
@@ -16,94 +17,6 @@ CREATE TABLE IF NOT EXISTS users (
     fishing_exp INTEGER DEFAULT 0
 );
 
--- Pokemon species table (from PokeAPI)
-CREATE TABLE IF NOT EXISTS pokemon_species (
-    pokemon_id INTEGER PRIMARY KEY,
-    name TEXT NOT NULL,
-    pokedex_number INTEGER NOT NULL,
-    type1 TEXT NOT NULL,
-    type2 TEXT,
-    base_hp INTEGER NOT NULL,
-    base_attack INTEGER NOT NULL,
-    base_defense INTEGER NOT NULL,
-    base_sp_attack INTEGER NOT NULL,
-    base_sp_defense INTEGER NOT NULL,
-    base_speed INTEGER NOT NULL,
-    height INTEGER NOT NULL,
-    weight INTEGER NOT NULL,
-    sprite_url TEXT,
-    shiny_sprite_url TEXT,
-    category TEXT, -- legendary, mythical, ultra_beast, normal
-    is_mega BOOLEAN DEFAULT FALSE,
-    is_alolan BOOLEAN DEFAULT FALSE,
-    is_galarian BOOLEAN DEFAULT FALSE,
-    is_hisuian BOOLEAN DEFAULT FALSE,
-    is_paldean BOOLEAN DEFAULT FALSE,
-    evolution_chain_id INTEGER,
-    evolves_from_species_id INTEGER,
-    habitat TEXT,
-    color TEXT,
-    shape TEXT,
-    generation INTEGER
-);
-
--- Pokemon moves table
-CREATE TABLE IF NOT EXISTS moves (
-    move_id INTEGER PRIMARY KEY,
-    name TEXT NOT NULL,
-    type TEXT NOT NULL,
-    category TEXT NOT NULL, -- physical, special, status
-    power INTEGER,
-    accuracy INTEGER,
-    pp INTEGER NOT NULL,
-    max_pp INTEGER NOT NULL,
-    priority INTEGER DEFAULT 0,
-    target TEXT NOT NULL, -- user, selected-pokemon, all-opponents, etc
-    effect_chance INTEGER,
-    effect_description TEXT,
-    short_effect TEXT,
-    flavor_text TEXT,
-    damage_class TEXT,
-    crit_rate INTEGER DEFAULT 0,
-    drain INTEGER DEFAULT 0,
-    healing INTEGER DEFAULT 0,
-    ailment TEXT,
-    ailment_chance INTEGER DEFAULT 0,
-    stat_changes TEXT, -- JSON string of stat changes
-    min_hits INTEGER DEFAULT 1,
-    max_hits INTEGER DEFAULT 1,
-    min_turns INTEGER DEFAULT 1,
-    max_turns INTEGER DEFAULT 1
-);
-
--- Pokemon abilities table
-CREATE TABLE IF NOT EXISTS abilities (
-    ability_id INTEGER PRIMARY KEY,
-    name TEXT NOT NULL,
-    description TEXT NOT NULL,
-    short_effect TEXT,
-    flavor_text TEXT,
-    is_hidden BOOLEAN DEFAULT FALSE,
-    generation INTEGER
-);
-
--- Items table
-CREATE TABLE IF NOT EXISTS items (
-    item_id INTEGER PRIMARY KEY,
-    name TEXT NOT NULL,
-    category TEXT NOT NULL, -- medicine, pokeballs, battle-items, etc
-    cost INTEGER DEFAULT 0,
-    description TEXT NOT NULL,
-    short_effect TEXT,
-    flavor_text TEXT,
-    sprite_url TEXT,
-    battle_effect TEXT, -- JSON string for battle effects
-    field_effect TEXT, -- JSON string for field effects
-    pocket TEXT, -- items, medicine, pokeballs, tm, hm, berries, key
-    fling_power INTEGER,
-    fling_effect TEXT
-);
-
 -- Player's Pokemon collection
 CREATE TABLE IF NOT EXISTS player_pokemon (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -126,6 +39,12 @@ CREATE TABLE IF NOT EXISTS player_pokemon (
     speed_ev INTEGER DEFAULT 0,
     current_hp INTEGER,
     max_hp INTEGER,
+    -- Computed from base stats, IVs, EVs, level and nature; rewritten whenever those change
+    attack INTEGER,
+    defense INTEGER,
+    sp_attack INTEGER,
+    sp_defense INTEGER,
+    speed INTEGER,
     is_shiny BOOLEAN DEFAULT FALSE,
     is_radiant BOOLEAN DEFAULT FALSE,
     is_shadow BOOLEAN DEFAULT FALSE,
@@ -141,28 +60,6 @@ CREATE TABLE IF NOT EXISTS player_pokemon (
     FOREIGN KEY (ability_id) REFERENCES abilities(ability_id)
 );
 
--- Pokemon movesets (which Pokemon can learn which moves)
-CREATE TABLE IF NOT EXISTS pokemon_moves (
-    pokemon_id INTEGER NOT NULL,
-    move_id INTEGER NOT NULL,
-    learn_method TEXT NOT NULL, -- level-up, tm, tr, egg, tutor, evolution
-    level_learned INTEGER DEFAULT 0,
-    PRIMARY KEY (pokemon_id, move_id),
-    FOREIGN KEY (pokemon_id) REFERENCES pokemon_species(pokemon_id),
-    FOREIGN KEY (move_id) REFERENCES moves(move_id)
-);
-
--- Pokemon abilities (which Pokemon have which abilities)
-CREATE TABLE IF NOT EXISTS pokemon_abilities (
-    pokemon_id INTEGER NOT NULL,
-    ability_id INTEGER NOT NULL,
-    is_hidden BOOLEAN DEFAULT FALSE,
-    slot INTEGER NOT NULL,
-    PRIMARY KEY (pokemon_id, ability_id),
-    FOREIGN KEY (pokemon_id) REFERENCES pokemon_species(pokemon_id),
-    FOREIGN KEY (ability_id) REFERENCES abilities(ability_id)
-);
-
 -- Player's Pokemon party (current team)
 CREATE TABLE IF NOT EXISTS player_party (
     user_id INTEGER NOT NULL,
@@ -193,9 +90,28 @@ CREATE TABLE IF NOT EXISTS active_spawns (
     despawn_time TIMESTAMP,
     is_caught BOOLEAN DEFAULT FALSE,
     hint_used BOOLEAN DEFAULT FALSE,
+    message_id TEXT,
     FOREIGN KEY (pokemon_id) REFERENCES pokemon_species(pokemon_id)
 );
 
+-- Per-guild settings
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id TEXT PRIMARY KEY,
+    spawn_channel_id TEXT, -- NULL spawns in the channel where activity happened
+    spawn_rate_multiplier REAL DEFAULT 1.0,
+    disabled_features TEXT DEFAULT '[]', -- JSON list, e.g. ["spawns", "fishing"]
+    spawn_generations TEXT, -- JSON list, e.g. [1, 2]; NULL uses the global setting
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Cooldown snapshots (the live cooldowns are kept in memory)
+CREATE TABLE IF NOT EXISTS cooldowns (
+    namespace TEXT NOT NULL,
+    cooldown_key TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, cooldown_key)
+);
+
 -- Active battles
 CREATE TABLE IF NOT EXISTS active_battles (
     battle_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -208,6 +124,7 @@ CREATE TABLE IF NOT EXISTS active_battles (
     turn_player_id INTEGER,
     battle_start TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     last_action TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    message_id TEXT, -- Message holding the battle controls, once the battle has started
     FOREIGN KEY (player1_id) REFERENCES users(user_id),
     FOREIGN KEY (player2_id) REFERENCES users(user_id)
 );
@@ -369,11 +286,6 @@ CREATE TABLE IF NOT EXISTS tournament_battles (
 );
 
 -- Indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_pokemon_species_name ON pokemon_species(name);
-CREATE INDEX IF NOT EXISTS idx_pokemon_species_type ON pokemon_species(type1, type2);
-CREATE INDEX IF NOT EXISTS idx_pokemon_species_category ON pokemon_species(category);
-CREATE INDEX IF NOT EXISTS idx_moves_type ON moves(type);
-CREATE INDEX IF NOT EXISTS idx_moves_category ON moves(category);
 CREATE INDEX IF NOT EXISTS idx_player_pokemon_user ON player_pokemon(user_id);
 CREATE INDEX IF NOT EXISTS idx_player_pokemon_pokemon ON player_pokemon(pokemon_id);
 CREATE INDEX IF NOT EXISTS idx_active_spawns_channel ON active_spawns(channel_id);
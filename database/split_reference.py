@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Reference Database Split
+Moves the static reference tables out of the main database into their own
+file, which the bot then attaches read-only.
+
+    python -m database.split_reference
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+from database.db_manager import REFERENCE_TABLES
+from database.reference_snapshot import stamp_reference_checksum
+
+
+def split_reference_database(db_path: str, reference_path: str):
+    """Copy the reference tables into reference_path and drop them from db_path"""
+    if os.path.exists(reference_path):
+        raise FileExistsError(f"{reference_path} already exists")
+
+    with open('database/reference_schema.sql', 'r') as f:
+        reference_schema = f.read()
+
+    # Create the reference file with its own schema and indexes
+    ref = sqlite3.connect(reference_path)
+    ref.executescript(reference_schema)
+    ref.close()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS ref", (reference_path,))
+        existing = {
+            row[0] for row in conn.execute("SELECT name FROM main.sqlite_master WHERE type = 'table'")
+        }
+
+        with conn:
+            for table in REFERENCE_TABLES:
+                if table not in existing:
+                    continue
+                columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+                names = ', '.join(columns)
+                conn.execute(f"INSERT INTO ref.{table} ({names}) SELECT {names} FROM main.{table}")
+                conn.execute(f"DROP TABLE main.{table}")
+                print(f"✅ Moved {table}")
+
+        conn.execute("DETACH DATABASE ref")
+        # Reclaim the pages the reference tables used
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    # The reference file is opened with immutable=1, so leave it fully checkpointed
+    ref = sqlite3.connect(reference_path)
+    ref.execute("PRAGMA journal_mode = DELETE")
+    # Snapshots are checked against this instead of re-hashing the tables at startup
+    stamp_reference_checksum(ref)
+    ref.execute("ANALYZE")
+    ref.commit()
+    ref.execute("VACUUM")
+    ref.close()
+
+
+def main():
+    """Command line entry point"""
+    from config import Config
+    config = Config()
+
+    parser = argparse.ArgumentParser(description="Move reference tables into their own database")
+    parser.add_argument('--db', default=config.database_path, help="Main (user data) database")
+    parser.add_argument('--out', default=config.reference_database_path, help="Reference database to create")
+    args = parser.parse_args()
+
+    try:
+        split_reference_database(args.db, args.out)
+    except FileExistsError as e:
+        print(f"❌ {e}; remove it first to rebuild")
+        sys.exit(1)
+
+    print(f"✅ Reference data now lives in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
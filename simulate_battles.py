@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Battle Simulator
+Runs seeded random battles between generated parties on the headless battle
+engine, across a process pool, and reports battles per second and per-turn
+timing percentiles.
+
+    python simulate_battles.py --battles 10000 --workers 4
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Dict, List, Optional, Any
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.battle_engine import BattleEngine
+from utils.battle_replay import encode_action, encode_replay, verify
+from utils.battle_state import BattleState, Side, Combatant, MoveSlot, STATS
+from utils.type_chart import TYPES
+
+CATEGORIES = ('physical', 'special', 'physical', 'special', 'status')
+AILMENTS = ('burn', 'poison', 'toxic', 'paralysis', 'sleep', 'freeze', 'confusion')
+
+
+def random_move(rng: random.Random, move_id: int) -> MoveSlot:
+    category = rng.choice(CATEGORIES)
+    power = None if category == 'status' else rng.choice((40, 60, 75, 90, 110))
+    ailment = rng.choice(AILMENTS) if category == 'status' or rng.random() < 0.2 else None
+    pp = rng.choice((10, 15, 20, 25))
+    return MoveSlot(
+        move_id, f"move{move_id}", rng.choice(TYPES), category, power,
+        rng.choice((None, 70, 85, 90, 100, 100)), 0, ailment,
+        rng.choice((10, 20, 30)) if ailment and power else None, pp, pp
+    )
+
+
+def random_party(rng: random.Random, size: int, level: int) -> List[Combatant]:
+    """Synthetic party: random typings, base stats and four random moves each"""
+    party = []
+    for slot in range(size):
+        type1 = rng.choice(TYPES)
+        type2 = rng.choice(TYPES) if rng.random() < 0.5 else None
+        row = {
+            'id': slot + 1, 'pokemon_id': rng.randint(1, 1008), 'name': f"mon{slot + 1}", 'level': level,
+            'type1': type1, 'type2': type2 if type2 != type1 else None,
+            **{f'base_{stat}': rng.randint(30, 150) for stat in STATS},
+            **{f'{stat}_iv': rng.randint(0, 31) for stat in STATS}
+        }
+        moves = [random_move(rng, rng.randint(1, 900)) for _ in range(4)]
+        party.append(Combatant.from_party_row(row, moves))
+    return party
+
+
+def run_battle(seed: int, party_size: int, level: int, max_turns: int, check_replay: bool = False) -> Dict[str, Any]:
+    """One seeded battle; returns its turn count, winner and per-turn times in seconds"""
+    rng = random.Random(seed)
+    battle = BattleState(
+        seed, 'simulation', '0',
+        Side(1, random_party(rng, party_size, level)),
+        Side(2, random_party(rng, party_size, level)),
+        seed=seed ^ 0x5EED
+    )
+    engine = BattleEngine(battle.rng)
+    if check_replay:
+        battle.start_recording()
+
+    turn_times = []
+    result = {}
+    for _ in range(max_turns):
+        player_id = battle.turn_player_id
+        action = engine.random_action(battle, player_id, rng)
+
+        started = time.perf_counter()
+        result = engine.take_turn(battle, player_id, action)
+        turn_times.append(time.perf_counter() - started)
+
+        if result.get('error'):
+            raise RuntimeError(f"Battle {seed} rejected {action}: {result['error']}")
+        if check_replay:
+            battle.actions.append(encode_action(action))
+        if result['battle_over']:
+            break
+
+    outcome = {'turns': len(turn_times), 'winner': result.get('winner'), 'turn_times': turn_times}
+    if check_replay:
+        data = encode_replay(battle)
+        if not verify(data)[0]:
+            raise RuntimeError(f"Battle {seed} does not replay to the same state")
+        outcome['replay_bytes'] = len(data)
+    return outcome
+
+
+def run_chunk(seeds: List[int], party_size: int, level: int, max_turns: int, check_replay: bool = False) -> Dict[str, Any]:
+    """Worker entry point: a batch of battles"""
+    turn_times = []
+    turns = []
+    replay_sizes = []
+    wins = {1: 0, 2: 0, None: 0}
+    for seed in seeds:
+        outcome = run_battle(seed, party_size, level, max_turns, check_replay)
+        turn_times.extend(outcome['turn_times'])
+        turns.append(outcome['turns'])
+        if check_replay:
+            replay_sizes.append(outcome['replay_bytes'])
+        wins[outcome['winner'] if outcome['winner'] in wins else None] += 1
+    return {'turn_times': turn_times, 'turns': turns, 'wins': wins, 'replay_sizes': replay_sizes}
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max in microseconds"""
+    if not samples:
+        return {'count': 0, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1_000_000, 2)
+
+    return {'count': len(ordered), 'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99), 'max': at(1.0)}
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return None
+
+
+def run(args) -> Dict[str, Any]:
+    seeds = list(range(args.seed, args.seed + args.battles))
+    chunk_size = max(1, args.chunk_size)
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+    started = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            worker = partial(run_chunk, party_size=args.party_size, level=args.level, max_turns=args.max_turns,
+                             check_replay=args.verify_replays)
+            results = list(pool.map(worker, chunks))
+    else:
+        results = [run_chunk(chunk, args.party_size, args.level, args.max_turns, args.verify_replays) for chunk in chunks]
+    elapsed = time.perf_counter() - started
+
+    turn_times = [t for result in results for t in result['turn_times']]
+    turns = [t for result in results for t in result['turns']]
+    wins = {str(player): sum(result['wins'][player] for result in results) for player in (1, 2, None)}
+    replay_sizes = [size for result in results for size in result['replay_sizes']]
+
+    report = {
+        'commit': current_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'params': vars(args),
+        'battles': args.battles,
+        'elapsed_seconds': round(elapsed, 3),
+        'battles_per_second': round(args.battles / elapsed, 1),
+        'turns': len(turn_times),
+        'turns_per_battle': round(len(turn_times) / max(1, args.battles), 2),
+        'max_turns_in_battle': max(turns) if turns else 0,
+        'turn_time_us': percentiles(turn_times),
+        'wins': wins
+    }
+    if replay_sizes:
+        report['replay_bytes'] = {'mean': round(sum(replay_sizes) / len(replay_sizes), 1), 'max': max(replay_sizes)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate seeded random battles on the headless engine")
+    parser.add_argument('--battles', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processes to spread battles over")
+    parser.add_argument('--chunk-size', type=int, default=100, help="Battles per worker task")
+    parser.add_argument('--party-size', type=int, default=6)
+    parser.add_argument('--level', type=int, default=50)
+    parser.add_argument('--max-turns', type=int, default=1000, help="Turn cap per battle (unfinished battles count as draws)")
+    parser.add_argument('--seed', type=int, default=1, help="Seed of the first battle; battle i uses seed + i")
+    parser.add_argument('--verify-replays', action='store_true', help="Record every battle and check its replay reproduces it")
+    parser.add_argument('--output', default=None, help="Write the JSON report here as well")
+    args = parser.parse_args()
+
+    try:
+        results = run(args)
+    except Exception as e:
+        print(f"❌ Simulation failed: {e}")
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    turn_times = results['turn_time_us']
+    print(f"✅ {results['battles_per_second']} battles/s, {results['turns_per_battle']} turns/battle, "
+          f"turn p50 {turn_times['p50']}us p99 {turn_times['p99']}us")
+    if not args.output:
+        print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import random
+
+from utils.battle_engine import BattleEngine
+from utils.battle_state import BattleState, Combatant, MoveSlot, Side
+
+STATS = {'hp': 100, 'attack': 50, 'defense': 50, 'sp_attack': 50, 'sp_defense': 50, 'speed': 50}
+
+
+def make_combatant(name: str = 'Eevee') -> Combatant:
+    tackle = MoveSlot(33, 'Tackle', 'normal', 'physical', 40, None, 0, None, None, 35, 35)
+    return Combatant(None, 133, name, 50, 'normal', None, dict(STATS), [tackle])
+
+
+def make_battle() -> BattleState:
+    battle = BattleState(1, 'pvp', '1', Side(1, [make_combatant()]), Side(2, [make_combatant('Pidgey')]))
+    battle.turn_player_id = 1
+    return battle
+
+
+def test_confusion_counts_down_and_ends():
+    battle = make_battle()
+    engine = BattleEngine(random.Random(7))
+    attacker = battle.sides[0].active
+    attacker.confusion_turns = 3
+
+    actions = []
+    for _ in range(3):
+        battle.turn_player_id = 1
+        actions.extend(engine.take_turn(battle, 1, {'type': 'move', 'move_id': 33})['actions'])
+
+    assert attacker.confusion_turns == 0
+    assert actions.count("Eevee snapped out of its confusion!") == 1
+
+
+class FixedRandom(random.Random):
+    """Always rolls the given value for random(); randint stays seeded"""
+
+    def __init__(self, value: float):
+        super().__init__(0)
+        self.value = value
+
+    def random(self) -> float:
+        return self.value
+
+
+def test_confused_pokemon_can_hit_itself():
+    battle = make_battle()
+    attacker, defender = battle.sides[0].active, battle.sides[1].active
+    attacker.confusion_turns = 2
+
+    result = BattleEngine(FixedRandom(0.0)).take_turn(battle, 1, {'type': 'move', 'move_id': 33})
+
+    damage = BattleEngine.confusion_damage(attacker)
+    assert result['actions'] == [f"Eevee is confused! It hurt itself in its confusion ({damage} damage)"]
+    assert attacker.current_hp == 100 - damage
+    assert defender.current_hp == 100
+    # The move wasn't used, so it keeps its PP
+    assert attacker.moves[0].pp == 35
+
+
+def test_confused_pokemon_can_still_attack():
+    battle = make_battle()
+    attacker, defender = battle.sides[0].active, battle.sides[1].active
+    attacker.confusion_turns = 2
+
+    BattleEngine(FixedRandom(0.99)).take_turn(battle, 1, {'type': 'move', 'move_id': 33})
+
+    assert attacker.current_hp == 100
+    assert defender.current_hp < 100
+    assert attacker.confusion_turns == 1
@@ -0,0 +1,61 @@
+from utils.battle_engine import BattleEngine
+from utils.battle_replay import encode_action, encode_replay, replay, state_digest, verify
+from utils.battle_state import BattleState, Combatant, MoveSlot, Side
+
+STATS = {'hp': 120, 'attack': 50, 'defense': 50, 'sp_attack': 50, 'sp_defense': 50, 'speed': 50}
+TACKLE = {'type': 'move', 'move_id': 33}
+
+
+def make_combatant(uid: int, name: str) -> Combatant:
+    tackle = MoveSlot(33, 'Tackle', 'normal', 'physical', 40, 100, 0, None, None, 35, 35)
+    return Combatant(uid, 133, name, 50, 'normal', None, dict(STATS), [tackle])
+
+
+def make_battle() -> BattleState:
+    battle = BattleState(
+        1, 'trainer', '1',
+        Side(1, [make_combatant(10, 'Eevee'), make_combatant(11, 'Pidgey')]),
+        Side(2, [make_combatant(20, 'Rattata')]),
+        seed=1234
+    )
+    battle.start_recording()
+    return battle
+
+
+def play(battle: BattleState, action: dict) -> dict:
+    """Apply a turn the way BattleSystem does: through the battle's own RNG, recording the action"""
+    result = BattleEngine(battle.rng).take_turn(battle, battle.turn_player_id, action)
+    assert not result.get('error')
+    battle.battle_log.extend(result['actions'])
+    battle.actions.append(encode_action(action))
+    return result
+
+
+def test_restored_battle_matches_checkpointed_state():
+    battle = make_battle()
+    play(battle, TACKLE)
+    play(battle, TACKLE)
+
+    restored = replay(encode_replay(battle), battle.battle_id)
+
+    assert restored.battle_id == 1
+    assert restored.turn_player_id == battle.turn_player_id
+    assert restored.current_turn == battle.current_turn
+    assert state_digest(restored) == state_digest(battle)
+
+
+def test_restored_battle_plays_on_like_the_original():
+    battle = make_battle()
+    play(battle, TACKLE)
+
+    restored = replay(encode_replay(battle), battle.battle_id)
+
+    # The restored RNG carries on from the same point, so the same turn has the same outcome
+    for action in (TACKLE, {'type': 'switch', 'pokemon_index': 1}, TACKLE):
+        assert play(restored, action) == play(battle, action)
+        assert state_digest(restored) == state_digest(battle)
+
+    # And it keeps recording, so it can be checkpointed and restored again
+    matches, again = verify(encode_replay(restored))
+    assert matches
+    assert state_digest(again) == state_digest(battle)
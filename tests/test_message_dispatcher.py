@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from utils.message_dispatcher import MessageDispatcher, PRIORITY_FLAVOR, PRIORITY_SPAWN
+
+
+class FakeChannel:
+    """Records when each message went out"""
+
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, **kwargs):
+        self.sent.append((time.monotonic(), kwargs))
+        return kwargs
+
+
+def test_sequential_sends_stay_under_channel_rate():
+    """Awaiting each send empties the queue every time; the bucket must still apply"""
+    async def run():
+        dispatcher = MessageDispatcher(rate=5, per=0.5)
+        channel = FakeChannel(1)
+        for index in range(10):
+            await dispatcher.send(channel, content=index)
+        await dispatcher.close()
+        return channel.sent
+
+    sent = asyncio.run(run())
+    times = [at for at, _ in sent]
+    assert [kwargs['content'] for _, kwargs in sent] == list(range(10))
+    # 5 go out at once, the other 5 wait for one token each (0.1s apart)
+    assert times[-1] - times[0] >= 0.45
+    for start in range(len(times) - 5):
+        assert times[start + 5] - times[start] >= 0.09
+
+
+def test_channels_have_separate_buckets():
+    async def run():
+        dispatcher = MessageDispatcher(rate=5, per=0.5)
+        first, second = FakeChannel(1), FakeChannel(2)
+        for index in range(5):
+            await dispatcher.send(first, content=index)
+        started = time.monotonic()
+        await dispatcher.send(second, content='other')
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.05
+
+
+def test_idle_buckets_are_dropped_once_refilled():
+    async def run():
+        dispatcher = MessageDispatcher(rate=5, per=0.2)
+        first, second = FakeChannel(1), FakeChannel(2)
+        await dispatcher.send(first, content='hello')
+        await asyncio.sleep(0)
+        assert 1 in dispatcher.buckets
+
+        await asyncio.sleep(0.25)
+        await dispatcher.send(second, content='hello')
+        await asyncio.sleep(0)
+        return dispatcher
+
+    dispatcher = asyncio.run(run())
+    assert 1 not in dispatcher.buckets
+    assert not dispatcher.queues
+
+
+def test_priority_order_within_a_channel():
+    async def run():
+        dispatcher = MessageDispatcher(rate=1, per=0.05)
+        channel = FakeChannel(1)
+        futures = [dispatcher.send(channel, PRIORITY_FLAVOR, content=f'flavor {index}') for index in range(3)]
+        futures.append(dispatcher.send(channel, PRIORITY_SPAWN, content='spawn'))
+        await asyncio.gather(*futures)
+        return [kwargs['content'] for _, kwargs in channel.sent]
+
+    assert asyncio.run(run()) == ['spawn', 'flavor 0', 'flavor 1', 'flavor 2']
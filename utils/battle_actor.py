@@ -0,0 +1,66 @@
+import asyncio
+from typing import Callable, Optional, Any, Awaitable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BattleActor:
+    """A battle's inbox and the single task that works through it
+
+    Everything that changes a battle goes through call(), so turns, timeouts and
+    cancels for one battle run strictly in order while separate battles run in
+    parallel. The task exits once the battle has finished or the inbox has sat idle
+    for idle_timeout; the next call() starts a fresh actor.
+    """
+
+    def __init__(self, battle_id: int, idle_timeout: float, on_exit: Optional[Callable[['BattleActor'], None]] = None):
+        self.battle_id = battle_id
+        self.idle_timeout = idle_timeout
+        self.on_exit = on_exit
+        self.finished = False  # Set once the battle ends; the actor drains its inbox and exits
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.current: Optional[asyncio.Future] = None
+        self.task = asyncio.create_task(self.run())
+
+    def call(self, handler: Callable[..., Awaitable[Any]], *args) -> asyncio.Future:
+        """Queue handler(*args) behind everything already sent; the future carries its result"""
+        future = asyncio.get_running_loop().create_future()
+        self.inbox.put_nowait((handler, args, future))
+        return future
+
+    async def run(self):
+        try:
+            while not (self.finished and self.inbox.empty()):
+                try:
+                    handler, args, future = await asyncio.wait_for(self.inbox.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if self.inbox.empty():
+                        break
+                    continue
+
+                # The caller gave up waiting before its turn came
+                if future.cancelled():
+                    continue
+
+                self.current = future
+                try:
+                    result = await handler(*args)
+                except Exception as e:
+                    logger.error(f"Error handling message for battle {self.battle_id}: {e}")
+                    if not future.cancelled():
+                        future.set_exception(e)
+                else:
+                    if not future.cancelled():
+                        future.set_result(result)
+                self.current = None
+        finally:
+            # Callers still waiting when the task is stopped get cancelled rather than hanging
+            if self.current and not self.current.done():
+                self.current.cancel()
+            while not self.inbox.empty():
+                _, _, future = self.inbox.get_nowait()
+                if not future.done():
+                    future.cancel()
+            if self.on_exit:
+                self.on_exit(self)
@@ -0,0 +1,102 @@
+import discord
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Any, Set
+import logging
+
+from utils.battle_state import BattleState
+from utils.message_dispatcher import PRIORITY_FLAVOR
+
+logger = logging.getLogger(__name__)
+
+
+class BattleBroadcaster:
+    """Mirrors live battles into spectator channels
+
+    Turns only mark a battle as changed. Once per `interval` the battle's embed is
+    built a single time and queued as an edit to every spectator message, so the
+    outbound edits per channel are bounded by the interval, not by the turn rate.
+    """
+
+    def __init__(self, dispatcher, embed_source: Callable[[int], Awaitable[discord.Embed]],
+                 timers=None, interval: float = 5.0, max_channels: int = 10):
+        self.dispatcher = dispatcher
+        self.embed_source = embed_source
+        self.timers = timers
+        self.interval = interval
+        self.max_channels = max_channels
+        # battle_id -> channel_id -> spectator message (None while the first send is in flight)
+        self.subscribers: Dict[int, Dict[int, Any]] = {}
+        self.flushing: Set[asyncio.Task] = set()  # Immediate flushes in flight, held so they aren't garbage collected
+
+    def watching(self, battle_id: int) -> bool:
+        return bool(self.subscribers.get(battle_id))
+
+    async def subscribe(self, battle_id: int, channel) -> Dict[str, Any]:
+        """Post the battle in channel and keep that message updated until the battle ends"""
+        channels = self.subscribers.setdefault(battle_id, {})
+        if channel.id in channels:
+            return {'error': 'This channel is already following that battle'}
+        if len(channels) >= self.max_channels:
+            return {'error': f'A battle can be followed from at most {self.max_channels} channels'}
+
+        # Hold the slot so a second subscribe for this channel can't slip in during the send
+        channels[channel.id] = None
+        try:
+            embed = await self.embed_source(battle_id)
+            message = await self.dispatcher.send(channel, PRIORITY_FLAVOR, embed=embed)
+        except Exception as e:
+            logger.error(f"Error posting battle {battle_id} to channel {channel.id}: {e}")
+            channels.pop(channel.id, None)
+            return {'error': 'Could not post the battle in this channel'}
+
+        # The battle may have ended while the message was being sent
+        if self.subscribers.get(battle_id) is channels:
+            channels[channel.id] = message
+        return {'success': True}
+
+    def unsubscribe(self, battle_id: int, channel_id: int) -> bool:
+        channels = self.subscribers.get(battle_id)
+        if not channels or channels.pop(channel_id, False) is False:
+            return False
+        if not channels:
+            self._drop(battle_id)
+        return True
+
+    def publish(self, battle_id: int, battle: BattleState, result: Optional[Dict[str, Any]] = None):
+        """BattleSystem listener: note the change and make sure a flush is scheduled"""
+        if not self.watching(battle_id):
+            return
+        if self.timers is None:
+            # Nothing to coalesce over without a timer service; edit straight away
+            task = asyncio.create_task(self.flush(battle_id))
+            self.flushing.add(task)
+            task.add_done_callback(self.flushing.discard)
+        elif ('battle_broadcast', battle_id) not in self.timers:
+            self.timers.schedule(('battle_broadcast', battle_id), self.interval, self.flush, battle_id)
+
+    async def flush(self, battle_id: int):
+        """Render once and queue the edit to every spectator message"""
+        if not self.watching(battle_id):
+            return
+        try:
+            embed = await self.embed_source(battle_id)
+        except Exception as e:
+            logger.error(f"Error rendering battle {battle_id} for spectators: {e}")
+            return
+        self._fan_out(battle_id, embed)
+
+    def finish(self, battle_id: int, embed: Optional[discord.Embed]):
+        """Send the final state straight away and forget the battle's spectators"""
+        if embed is not None and self.watching(battle_id):
+            self._fan_out(battle_id, embed)
+        self._drop(battle_id)
+
+    def _fan_out(self, battle_id: int, embed: discord.Embed):
+        for message in self.subscribers.get(battle_id, {}).values():
+            if message is not None:
+                self.dispatcher.edit(message, PRIORITY_FLAVOR, embed=embed)
+
+    def _drop(self, battle_id: int):
+        self.subscribers.pop(battle_id, None)
+        if self.timers is not None:
+            self.timers.cancel(('battle_broadcast', battle_id))
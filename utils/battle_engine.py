@@ -0,0 +1,306 @@
+import random
+from typing import Dict, List, Optional, Any
+import logging
+
+from utils.battle_state import BattleState, Combatant, MoveSlot
+from utils.type_chart import matchup
+
+logger = logging.getLogger(__name__)
+
+STATUS_EFFECTS = {
+    'burn': {'damage': 0.125, 'attack_multiplier': 0.5},
+    'poison': {'damage': 0.125},
+    'toxic': {'damage': 0.125, 'increasing': True},
+    'paralysis': {'speed_multiplier': 0.25, 'paralyze_chance': 0.25},
+    'sleep': {'duration': (1, 3), 'cant_move': True},
+    'freeze': {'thaw_chance': 0.2, 'cant_move': True},
+    'confusion': {'duration': (1, 4), 'hurt_chance': 0.33},
+    'flinch': {'duration': 1, 'cant_move': True}
+}
+
+CRIT_CHANCE = 0.0625  # 6.25% base chance
+CONFUSION_POWER = 40  # Typeless physical hit a confused Pokemon deals itself
+
+
+class BattleEngine:
+    """Battle rules over a BattleState: synchronous, no I/O, no Discord
+
+    All randomness comes from self.rng, so a seeded engine replays a battle exactly.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, status_effects: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.rng = rng or random.Random()
+        self.status_effects = status_effects or STATUS_EFFECTS
+
+    def take_turn(self, battle: BattleState, player_id: Optional[int], action: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one player's action and advance the turn
+
+        Returns {'success', 'actions', 'battle_over', 'winner'} or {'error'}; an
+        error leaves the battle untouched and the turn with the same player.
+        """
+        if battle.turn_player_id != player_id:
+            return {'error': 'Not your turn'}
+
+        action_type = action.get('type')
+        if action_type == 'move':
+            result = self.use_move(battle, player_id, action['move_id'])
+        elif action_type == 'switch':
+            result = self.switch(battle, player_id, action['pokemon_index'])
+        elif action_type == 'item':
+            result = self.use_item(battle, player_id, action.get('target_pokemon'))
+        elif action_type == 'forfeit':
+            return {
+                'success': True,
+                'actions': [f"Battle forfeited! Winner: {battle.opponent_of(player_id).player_id}"],
+                'battle_over': True,
+                'winner': battle.opponent_of(player_id).player_id
+            }
+        else:
+            return {'error': f'Unknown action {action_type}'}
+
+        if result.get('error'):
+            return result
+
+        result['battle_over'] = self.is_over(battle)
+        if result['battle_over']:
+            result['winner'] = self.winner(battle)
+        else:
+            battle.turn_player_id = battle.opponent_of(player_id).player_id
+            battle.current_turn += 1
+
+        return result
+
+    def legal_actions(self, battle: BattleState, player_id: Optional[int]) -> List[Dict[str, Any]]:
+        """Moves and switches the player could make right now (items and forfeit excluded)"""
+        side = battle.side_for(player_id)
+        actions = []
+
+        if not side.active.fainted:
+            actions.extend({'type': 'move', 'move_id': move.move_id} for move in side.active.moves if move.pp > 0)
+
+        actions.extend(
+            {'type': 'switch', 'pokemon_index': index}
+            for index, pokemon in enumerate(side.party)
+            if index != side.active_index and not pokemon.fainted
+        )
+        return actions
+
+    def random_action(self, battle: BattleState, player_id: Optional[int],
+                      rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        """Any usable move, switching only when forced; forfeit if nothing is left"""
+        rng = rng or self.rng
+        actions = self.legal_actions(battle, player_id)
+        moves = [action for action in actions if action['type'] == 'move']
+        if moves:
+            return rng.choice(moves)
+        if actions:
+            return rng.choice(actions)
+        return {'type': 'forfeit'}
+
+    def use_move(self, battle: BattleState, player_id: Optional[int], move_id: int) -> Dict[str, Any]:
+        attacker = battle.side_for(player_id).active
+        defender = battle.opponent_of(player_id).active
+
+        if attacker.fainted:
+            return {'error': f'{attacker.name} has fainted; switch Pokemon'}
+
+        # Moves come from the combatant's own move slots
+        move = attacker.find_move(move_id)
+
+        if not move:
+            return {'error': 'Move not found'}
+
+        if move.pp <= 0:
+            return {'error': f'{move.name} has no PP left'}
+
+        # Check if Pokemon can move (status conditions)
+        if not self.can_move(attacker):
+            self.end_of_turn(attacker)
+            return {'success': True, 'actions': [f"{attacker.name} is unable to move!"]}
+
+        results = []
+
+        # Confusion counts down on each attempt to move and may turn the attack on the user
+        if attacker.confusion_turns:
+            attacker.confusion_turns -= 1
+            if not attacker.confusion_turns:
+                results.append(f"{attacker.name} snapped out of its confusion!")
+            elif self.rng.random() < self.status_effects['confusion']['hurt_chance']:
+                damage = self.confusion_damage(attacker)
+                attacker.current_hp = max(0, attacker.current_hp - damage)
+                self.end_of_turn(attacker)
+                return {'success': True, 'actions': [
+                    f"{attacker.name} is confused! It hurt itself in its confusion ({damage} damage)"
+                ]}
+
+        move.pp -= 1
+
+        if move.category == 'status':
+            results.append(self.status_move(attacker, defender, move))
+        else:
+            results.append(self.damage_move(attacker, defender, move))
+
+        self.end_of_turn(attacker)
+
+        return {'success': True, 'actions': results}
+
+    def switch(self, battle: BattleState, player_id: Optional[int], index: int) -> Dict[str, Any]:
+        side = battle.side_for(player_id)
+
+        if index >= len(side.party) or index < 0:
+            return {'error': 'Invalid Pokemon index'}
+
+        if side.party[index].fainted:
+            return {'error': 'That Pokemon has fainted'}
+
+        if index == side.active_index:
+            return {'error': f'{side.active.name} is already in battle'}
+
+        side.active_index = index
+        return {'success': True, 'actions': [f"Switched to {side.active.name}!"]}
+
+    def use_item(self, battle: BattleState, player_id: Optional[int], index: Optional[int]) -> Dict[str, Any]:
+        """Apply an item to a party member (inventory is the caller's concern)"""
+        side = battle.side_for(player_id)
+        if index is None:
+            index = side.active_index
+
+        if index >= len(side.party) or index < 0:
+            return {'error': 'Invalid Pokemon index'}
+
+        # Item effects are simplified
+        return {'success': True, 'actions': [f"Used item on {side.party[index].name}!"]}
+
+    def damage_move(self, attacker: Combatant, defender: Combatant, move: MoveSlot) -> str:
+        """Resolve a damage-dealing move and describe it"""
+        # Calculate accuracy check
+        if move.accuracy and self.rng.random() > move.accuracy / 100:
+            return f"{attacker.name}'s {move.name} missed!"
+
+        damage = self.calculate_damage(attacker, defender, move)
+
+        # Apply type effectiveness
+        type_effectiveness = matchup(move.type_id, defender.typing)
+        damage = int(damage * type_effectiveness)
+
+        # Critical hit
+        is_critical = self.rng.random() < CRIT_CHANCE
+        if is_critical:
+            damage = int(damage * 1.5)
+
+        defender.current_hp = max(0, defender.current_hp - damage)
+
+        result = f"{attacker.name} used {move.name}"
+
+        if is_critical:
+            result += "! A critical hit!"
+
+        if type_effectiveness == 0:
+            result += " It had no effect!"
+        elif type_effectiveness > 1:
+            result += " It's super effective!"
+        elif type_effectiveness < 1:
+            result += " It's not very effective..."
+
+        result += f" ({defender.name} took {damage} damage)"
+
+        # Apply secondary effects
+        if move.effect_chance and self.rng.random() < move.effect_chance / 100:
+            if move.ailment and not defender.fainted and defender.apply_status(move.ailment, self.rng):
+                result += f" {defender.name} was {move.ailment}!"
+
+        return result
+
+    def calculate_damage(self, attacker: Combatant, defender: Combatant, move: MoveSlot) -> int:
+        """Base damage with STAB and the random roll (effectiveness and crits are applied after)"""
+        if move.power is None:
+            return 0
+
+        if move.category == 'physical':
+            attack_stat = attacker.effective_attack
+            defense_stat = defender.defense
+        else:  # special
+            attack_stat = attacker.sp_attack
+            defense_stat = defender.sp_defense
+
+        level = attacker.level
+
+        # Base damage calculation (simplified)
+        damage = int((((2 * level / 5 + 2) * move.power * attack_stat / max(1, defense_stat)) / 50) + 2)
+
+        # STAB (Same Type Attack Bonus)
+        if attacker.has_type(move.type):
+            damage = int(damage * 1.5)
+
+        # Random variation: one of the 16 rolls from 85% to 100% (utils.damage_calc.ROLLS)
+        damage = damage * self.rng.randint(85, 100) // 100
+
+        return max(1, damage)
+
+    @staticmethod
+    def confusion_damage(pokemon: Combatant) -> int:
+        """A confused Pokemon's hit on itself: no STAB, roll, crit or type effectiveness"""
+        return int((((2 * pokemon.level / 5 + 2) * CONFUSION_POWER * pokemon.effective_attack
+                     / max(1, pokemon.defense)) / 50) + 2)
+
+    def status_move(self, attacker: Combatant, defender: Combatant, move: MoveSlot) -> str:
+        """Resolve a status move (only its ailment is modelled)"""
+        result = f"{attacker.name} used {move.name}"
+
+        if move.ailment:
+            if defender.apply_status(move.ailment, self.rng):
+                result += f" {defender.name} was {move.ailment}!"
+            else:
+                result += " But it failed!"
+
+        return result
+
+    def can_move(self, pokemon: Combatant) -> bool:
+        """Check if Pokemon can move (status condition effects)"""
+        if pokemon.flinched:
+            pokemon.flinched = False
+            return False
+
+        status = pokemon.status
+
+        if status == 'sleep':
+            # Sleep counts down and wakes the Pokemon when it runs out
+            if pokemon.status_turns > 0:
+                pokemon.status_turns -= 1
+                return False
+            pokemon.status = None
+        elif status == 'freeze':
+            if self.rng.random() >= self.status_effects['freeze']['thaw_chance']:
+                return False
+            pokemon.status = None
+        elif status == 'paralysis' and self.rng.random() < self.status_effects['paralysis']['paralyze_chance']:
+            return False
+
+        return True
+
+    def end_of_turn(self, pokemon: Combatant):
+        """Residual status damage for the Pokemon that just acted"""
+        status = pokemon.status
+
+        if status in self.status_effects and not pokemon.fainted:
+            effect = self.status_effects[status]
+
+            # Damage from status; toxic grows by 1/16 each turn
+            if effect.get('increasing'):
+                pokemon.toxic_counter += 1
+                damage = max(1, pokemon.max_hp * pokemon.toxic_counter // 16)
+                pokemon.current_hp = max(0, pokemon.current_hp - damage)
+            elif 'damage' in effect:
+                damage = max(1, int(pokemon.max_hp * effect['damage']))
+                pokemon.current_hp = max(0, pokemon.current_hp - damage)
+
+    @staticmethod
+    def is_over(battle: BattleState) -> bool:
+        """True once a side has no Pokemon left standing"""
+        return not all(side.has_remaining for side in battle.sides)
+
+    @staticmethod
+    def winner(battle: BattleState) -> Optional[int]:
+        if battle.sides[0].has_remaining:
+            return battle.player1_id
+        return battle.player2_id
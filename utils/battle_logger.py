@@ -0,0 +1,54 @@
+import asyncio
+import json
+from typing import Dict, List, Optional, Any, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BattleActionLogger:
+    """Buffers battle_actions rows and writes them in batches
+
+    Rows flush when batch_size are waiting, or flush_interval seconds after the
+    first unflushed row when a TimerService is available. Nothing commits per turn.
+    """
+
+    def __init__(self, db, batch_size: int = 50, flush_interval: float = 5.0, timers=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timers = timers
+        self.buffer: List[Tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def log(self, battle_id: int, turn_number: int, player_id: Optional[int], pokemon_uid: Optional[int],
+            action_type: str, details: Dict[str, Any], damage_dealt: int = 0, damage_received: int = 0):
+        """Queue one action record"""
+        self.buffer.append((
+            battle_id, turn_number, player_id or 0, pokemon_uid or 0, action_type,
+            json.dumps(details, separators=(',', ':')), damage_dealt, damage_received
+        ))
+
+        if len(self.buffer) >= self.batch_size:
+            if self.timers is not None:
+                self.timers.cancel(('battle_actions',))
+            # Write in the background; callers never wait on the database
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self.flush())
+        elif self.timers is not None and ('battle_actions',) not in self.timers:
+            self.timers.schedule(('battle_actions',), self.flush_interval, self.flush)
+
+    async def flush(self):
+        """Write everything buffered in one executemany"""
+        if not self.buffer:
+            return
+
+        rows, self.buffer = self.buffer, []
+        try:
+            await self.db.log_battle_actions(rows)
+        except Exception as e:
+            logger.error(f"Error writing {len(rows)} battle actions: {e}")
+            # Keep them for the next flush, but never grow without bound
+            self.buffer = (rows + self.buffer)[-self.batch_size * 20:]
+
+    def __len__(self) -> int:
+        return len(self.buffer)
@@ -0,0 +1,144 @@
+import discord
+from typing import Dict, Optional, Any, Tuple
+import logging
+
+from utils.battle_state import BattleState, Combatant
+from utils.message_dispatcher import PRIORITY_EDIT
+
+logger = logging.getLogger(__name__)
+
+
+class BattleDisplay:
+    """A message showing a live battle, the embed last queued for it and the values it shows"""
+    __slots__ = ('message', 'embed', 'names', 'values')
+
+    def __init__(self, message, embed: discord.Embed, names: Tuple[str, str], values: Tuple[str, ...]):
+        self.message = message
+        self.embed = embed
+        self.names = names
+        self.values = values
+
+
+class BattleRenderer:
+    """Keeps battle messages in sync with their battles using as few edits as possible
+
+    Each attached message keeps one embed whose title, colour and field names are set
+    once; turns only patch the parts whose text changed, skip the edit when nothing
+    visible did, and edits landing within `delay` of each other go out as one.
+    """
+
+    def __init__(self, dispatcher, timers=None, delay: float = 1.0):
+        self.dispatcher = dispatcher
+        self.timers = timers
+        self.delay = delay
+        self.displays: Dict[int, BattleDisplay] = {}
+
+    @staticmethod
+    def default_names(battle: BattleState) -> Tuple[str, str]:
+        return tuple(
+            "NPC Trainer" if side.player_id is None else f"Player {index}"
+            for index, side in enumerate(battle.sides, 1)
+        )
+
+    @staticmethod
+    def pokemon_text(pokemon: Combatant) -> str:
+        text = f"**{pokemon.name}** (Lv. {pokemon.level})\nHP: {pokemon.current_hp}/{pokemon.max_hp}\n"
+        if pokemon.status:
+            text += f"Status: {pokemon.status.title()}\n"
+        return text
+
+    def values(self, battle: BattleState, names: Tuple[str, str]) -> Tuple[str, ...]:
+        """(description, side 1 field, side 2 field, footer): everything a turn can change"""
+        turn_name = names[0] if battle.turn_player_id == battle.sides[0].player_id else names[1]
+        return (
+            f"Turn {battle.current_turn}",
+            self.pokemon_text(battle.sides[0].active),
+            self.pokemon_text(battle.sides[1].active),
+            f"It's {turn_name}'s turn"
+        )
+
+    def build_embed(self, battle: BattleState, title: Optional[str] = None,
+                    names: Optional[Tuple[str, str]] = None) -> discord.Embed:
+        """A standalone embed of the battle's current state"""
+        names = names or self.default_names(battle)
+        description, side1, side2, footer = self.values(battle, names)
+
+        embed = discord.Embed(
+            title=title or f"Battle #{battle.battle_id}",
+            description=description,
+            color=discord.Color.blue()
+        )
+        embed.add_field(name=names[0], value=side1, inline=True)
+        embed.add_field(name=names[1], value=side2, inline=True)
+        embed.set_footer(text=footer)
+        return embed
+
+    def attach(self, battle: BattleState, message, title: Optional[str] = None,
+               names: Optional[Tuple[str, str]] = None) -> discord.Embed:
+        """Start keeping message up to date with the battle; returns the embed to show now"""
+        names = names or self.default_names(battle)
+        embed = self.build_embed(battle, title, names)
+        self.displays[battle.battle_id] = BattleDisplay(message, embed, names, self.values(battle, names))
+        return embed
+
+    def update(self, battle_id: int, battle: BattleState, result: Optional[Dict[str, Any]] = None):
+        """Patch the changed parts of a battle's embed and schedule an edit (a BattleSystem listener)"""
+        display = self.displays.get(battle_id)
+        if not display:
+            return
+
+        values = self.values(battle, display.names)
+        if values == display.values:
+            return
+
+        old = display.values
+        display.values = values
+        embed = display.embed
+        if values[0] != old[0]:
+            embed.description = values[0]
+        for index in (0, 1):
+            if values[index + 1] != old[index + 1]:
+                embed.set_field_at(index, name=display.names[index], value=values[index + 1], inline=True)
+        if values[3] != old[3]:
+            embed.set_footer(text=values[3])
+
+        if self.timers is None:
+            self.flush(battle_id)
+        elif ('battle_render', battle_id) not in self.timers:
+            self.timers.schedule(('battle_render', battle_id), self.delay, self.flush, battle_id)
+
+    def flush(self, battle_id: int, **kwargs):
+        """Queue an edit with the battle's current embed; an edit still queued absorbs it"""
+        display = self.displays.get(battle_id)
+        if not display:
+            return
+        self.dispatcher.edit(display.message, PRIORITY_EDIT, embed=display.embed, **kwargs)
+
+    def live_embed(self, battle_id: int) -> Optional[discord.Embed]:
+        """A copy of what an attached battle message shows, player names included"""
+        display = self.displays.get(battle_id)
+        return display.embed.copy() if display else None
+
+    def finish(self, battle_id: int, status: str, winner_index: Optional[int] = None,
+               battle: Optional[BattleState] = None) -> Optional[discord.Embed]:
+        """Show how the battle ended (winner_index is the winning side), drop its controls and stop tracking it
+
+        Returns the final embed, built from battle if no message was attached.
+        """
+        display = self.displays.pop(battle_id, None)
+        if display:
+            embed, names = display.embed, display.names
+        elif battle:
+            names = self.default_names(battle)
+            embed = self.build_embed(battle, names=names)
+        else:
+            return None
+
+        if self.timers is not None:
+            self.timers.cancel(('battle_render', battle_id))
+
+        outcome = f"{names[winner_index]} wins!" if winner_index is not None else "The battle is over"
+        embed.set_footer(text=f"🏳️ Forfeited. {outcome}" if status == 'forfeited' else f"🏁 {outcome}")
+        if display:
+            self.dispatcher.edit(display.message, PRIORITY_EDIT, embed=embed, view=None)
+        return embed
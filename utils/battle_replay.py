@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Battle Replays
+Compact binary record of a battle: its seed, the starting parties and one
+varint per action. Replaying runs the actions back through the engine and
+checks the result against the digest stored with the replay.
+
+    python -m utils.battle_replay verify --battle 42
+    python -m utils.battle_replay verify replay.bin
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import zlib
+from typing import Dict, List, Any, Tuple
+import logging
+
+from utils.battle_engine import BattleEngine
+from utils.battle_state import BattleState
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PKRP'
+REPLAY_VERSION = 1
+
+# Action kinds live in the low two bits of each encoded action
+ACTION_KINDS = ('move', 'switch', 'item', 'forfeit')
+
+
+def write_varint(buffer: bytearray, value: int):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Value and the offset just past it"""
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_action(action: Dict[str, Any]) -> int:
+    """One engine action as a non-negative int: argument << 2 | kind"""
+    kind = action['type']
+    if kind == 'move':
+        argument = action['move_id']
+    elif kind == 'switch':
+        argument = action['pokemon_index']
+    elif kind == 'item':
+        # The engine only needs the target; inventory is outside the replay
+        argument = action.get('target_pokemon')
+        argument = 0 if argument is None else argument + 1
+    else:
+        argument = 0
+    return argument << 2 | ACTION_KINDS.index(kind)
+
+
+def decode_action(value: int) -> Dict[str, Any]:
+    kind, argument = ACTION_KINDS[value & 3], value >> 2
+    if kind == 'move':
+        return {'type': kind, 'move_id': argument}
+    if kind == 'switch':
+        return {'type': kind, 'pokemon_index': argument}
+    if kind == 'item':
+        return {'type': kind, 'item_id': None, 'target_pokemon': argument - 1 if argument else None}
+    return {'type': kind}
+
+
+def state_digest(battle: BattleState) -> bytes:
+    """8-byte fingerprint of a battle's current state"""
+    encoded = json.dumps(battle.to_payload(), separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).digest()
+
+
+def encode_replay(battle: BattleState) -> bytes:
+    """Seed, starting parties, actions so far and a digest of the current state"""
+    if battle.initial is None:
+        raise ValueError(f"Battle {battle.battle_id} was not recorded")
+
+    buffer = bytearray(MAGIC)
+    buffer.append(REPLAY_VERSION)
+    write_varint(buffer, battle.seed)
+
+    initial = zlib.compress(json.dumps(battle.initial, separators=(',', ':')).encode('utf-8'), 9)
+    write_varint(buffer, len(initial))
+    buffer.extend(initial)
+
+    write_varint(buffer, len(battle.actions))
+    for action in battle.actions:
+        write_varint(buffer, action)
+
+    buffer.extend(state_digest(battle))
+    return bytes(buffer)
+
+
+def decode_replay(data: bytes) -> Tuple[int, List[Any], List[int], bytes]:
+    """(seed, starting payload, encoded actions, state digest)"""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a battle replay")
+    if data[4] != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version {data[4]}")
+
+    seed, offset = read_varint(data, 5)
+    length, offset = read_varint(data, offset)
+    initial = json.loads(zlib.decompress(data[offset:offset + length]))
+    offset += length
+
+    count, offset = read_varint(data, offset)
+    actions = []
+    for _ in range(count):
+        action, offset = read_varint(data, offset)
+        actions.append(action)
+
+    return seed, initial, actions, data[offset:offset + 8]
+
+
+def replay(data: bytes, battle_id: int = 0) -> BattleState:
+    """Rebuild a battle by running its recorded actions through the engine
+
+    The result keeps recording, so a restored battle can carry on and be replayed again.
+    """
+    seed, initial, actions, _ = decode_replay(data)
+    battle = BattleState.from_payload(battle_id, initial, seed=seed)
+    battle.start_recording()
+    engine = BattleEngine(battle.rng)
+
+    for turn, value in enumerate(actions, 1):
+        result = engine.take_turn(battle, battle.turn_player_id, decode_action(value))
+        if result.get('error'):
+            raise ValueError(f"Replay diverged at action {turn}: {result['error']}")
+        battle.battle_log.extend(result['actions'])
+        battle.actions.append(value)
+
+    return battle
+
+
+def verify(data: bytes) -> Tuple[bool, BattleState]:
+    """Replay and compare the final state with the recorded digest"""
+    _, _, _, digest = decode_replay(data)
+    battle = replay(data)
+    return state_digest(battle) == digest, battle
+
+
+def main():
+    """Command line entry point"""
+    from config import Config
+    config = Config()
+
+    parser = argparse.ArgumentParser(description="Verify recorded battle replays")
+    parser.add_argument('command', choices=['verify', 'show'])
+    parser.add_argument('file', nargs='?', help="Replay file (otherwise --battle reads it from the database)")
+    parser.add_argument('--battle', type=int, help="Battle id whose stored replay to check")
+    parser.add_argument('--db', default=config.database_path)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'rb') as f:
+            data = f.read()
+    elif args.battle is not None:
+        conn = sqlite3.connect(args.db)
+        try:
+            row = conn.execute("SELECT checkpoint FROM active_battles WHERE battle_id = ?", (args.battle,)).fetchone()
+        finally:
+            conn.close()
+        if not row or not row[0]:
+            print(f"❌ No replay stored for battle {args.battle}")
+            sys.exit(1)
+        data = row[0]
+    else:
+        parser.error("give a replay file or --battle")
+
+    try:
+        matches, battle = verify(data)
+    except Exception as e:
+        print(f"❌ Replay could not be run: {e}")
+        sys.exit(1)
+
+    if args.command == 'show':
+        for line in battle.battle_log:
+            print(line)
+
+    if not matches:
+        print(f"❌ Replay ({len(data)} bytes, {len(battle.actions)} actions) does not reproduce the recorded state")
+        sys.exit(1)
+    print(f"✅ Replay ({len(data)} bytes, {len(battle.actions)} actions) reproduces the recorded state")
+
+
+if __name__ == "__main__":
+    main()
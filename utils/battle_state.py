@@ -0,0 +1,255 @@
+import random
+from collections import deque
+from typing import Deque, Dict, List, Optional, Any
+import logging
+
+from utils.pokemon_stats import STATS, STAT_COLUMNS, stats_for_row
+from utils.type_chart import type_id, typing_index
+
+logger = logging.getLogger(__name__)
+
+# Recent battle log lines kept in memory; full history goes to battle_actions
+BATTLE_LOG_SIZE = 50
+
+# Bump when the payload layout changes; older payloads are then rejected
+CHECKPOINT_VERSION = 2
+
+
+class MoveSlot:
+    """A known move and its remaining PP"""
+    __slots__ = ('move_id', 'name', 'type', 'category', 'power', 'accuracy', 'priority',
+                 'ailment', 'effect_chance', 'pp', 'max_pp', 'type_id')
+
+    def __init__(self, move_id: int, name: str, type: str, category: str, power: Optional[int],
+                 accuracy: Optional[int], priority: int, ailment: Optional[str],
+                 effect_chance: Optional[int], pp: int, max_pp: int):
+        self.move_id = move_id
+        self.name = name
+        self.type = type
+        self.category = category
+        self.power = power
+        self.accuracy = accuracy
+        self.priority = priority
+        self.ailment = ailment
+        self.effect_chance = effect_chance
+        self.pp = pp
+        self.max_pp = max_pp
+        self.type_id = type_id(type)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'MoveSlot':
+        # PokeAPI's "none" ailment means the move has no secondary status
+        ailment = row.get('ailment')
+        return cls(
+            row['move_id'], row['name'], row['type'], row['category'], row.get('power'),
+            row.get('accuracy'), row.get('priority') or 0,
+            ailment if ailment and ailment != 'none' else None,
+            row.get('ailment_chance') or row.get('effect_chance'), row['pp'], row['pp']
+        )
+
+    def to_list(self) -> List[Any]:
+        return [self.move_id, self.name, self.type, self.category, self.power, self.accuracy,
+                self.priority, self.ailment, self.effect_chance, self.pp, self.max_pp]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> 'MoveSlot':
+        return cls(*values)
+
+    @classmethod
+    def struggle(cls) -> 'MoveSlot':
+        """Fallback for Pokemon with no known moves"""
+        return cls(0, 'Struggle', 'Normal', 'physical', 50, None, 0, None, None, 1, 1)
+
+
+class Combatant:
+    """One Pokemon in a battle, with stats computed once at battle start"""
+    __slots__ = ('uid', 'pokemon_id', 'name', 'level', 'type1', 'type2', 'typing',
+                 'max_hp', 'current_hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed',
+                 'moves', 'status', 'status_turns', 'toxic_counter', 'confusion_turns', 'flinched')
+
+    def __init__(self, uid: Optional[int], pokemon_id: int, name: str, level: int,
+                 type1: str, type2: Optional[str], stats: Dict[str, int], moves: List[MoveSlot],
+                 current_hp: Optional[int] = None):
+        self.uid = uid
+        self.pokemon_id = pokemon_id
+        self.name = name
+        self.level = level
+        self.type1 = type1
+        self.type2 = type2
+        self.typing = typing_index(type1, type2)
+        self.max_hp = stats['hp']
+        self.current_hp = stats['hp'] if current_hp is None else min(current_hp, stats['hp'])
+        self.attack = stats['attack']
+        self.defense = stats['defense']
+        self.sp_attack = stats['sp_attack']
+        self.sp_defense = stats['sp_defense']
+        self.speed = stats['speed']
+        self.moves = moves or [MoveSlot.struggle()]
+        self.status: Optional[str] = None
+        self.status_turns = 0
+        self.toxic_counter = 0
+        self.confusion_turns = 0
+        self.flinched = False
+
+    @classmethod
+    def from_party_row(cls, row: Dict[str, Any], moves: List[MoveSlot]) -> 'Combatant':
+        """Build from a get_battle_party row; NPC rows without stored stats compute them from base stats"""
+        if row.get('attack') is not None:
+            stats = dict(zip(STATS, (row[column] for column in STAT_COLUMNS)))
+        else:
+            stats = dict(zip(STATS, stats_for_row(row)))
+        return cls(
+            row['id'], row['pokemon_id'], row.get('nickname') or row['name'], row['level'],
+            row['type1'], row.get('type2'), stats, moves
+        )
+
+    def to_list(self) -> List[Any]:
+        return [self.uid, self.pokemon_id, self.name, self.level, self.type1, self.type2,
+                [getattr(self, 'max_hp' if stat == 'hp' else stat) for stat in STATS], self.current_hp,
+                self.status, self.status_turns, self.toxic_counter, self.confusion_turns, self.flinched,
+                [move.to_list() for move in self.moves]]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> 'Combatant':
+        (uid, pokemon_id, name, level, type1, type2, stats, current_hp,
+         status, status_turns, toxic_counter, confusion_turns, flinched, moves) = values
+        combatant = cls(
+            uid, pokemon_id, name, level, type1, type2, dict(zip(STATS, stats)),
+            [MoveSlot.from_list(move) for move in moves], current_hp
+        )
+        combatant.status = status
+        combatant.status_turns = status_turns
+        combatant.toxic_counter = toxic_counter
+        combatant.confusion_turns = confusion_turns
+        combatant.flinched = flinched
+        return combatant
+
+    @property
+    def fainted(self) -> bool:
+        return self.current_hp <= 0
+
+    @property
+    def effective_attack(self) -> int:
+        # Burn halves physical attack while it lasts
+        return self.attack // 2 if self.status == 'burn' else self.attack
+
+    @property
+    def effective_speed(self) -> int:
+        return self.speed // 4 if self.status == 'paralysis' else self.speed
+
+    def has_type(self, type_name: str) -> bool:
+        return type_name == self.type1 or type_name == self.type2
+
+    def find_move(self, move_id: int) -> Optional[MoveSlot]:
+        for move in self.moves:
+            if move.move_id == move_id:
+                return move
+        return None
+
+    def apply_status(self, status: str, rng: random.Random = random) -> bool:
+        """Inflict a major status; returns False if one is already present"""
+        if status == 'confusion':
+            if self.confusion_turns:
+                return False
+            self.confusion_turns = rng.randint(1, 4)
+            return True
+
+        if self.status:
+            return False
+
+        self.status = status
+        self.status_turns = rng.randint(1, 3) if status == 'sleep' else 0
+        self.toxic_counter = 0
+        return True
+
+
+class Side:
+    """A player's party and which member is active"""
+    __slots__ = ('player_id', 'party', 'active_index')
+
+    def __init__(self, player_id: Optional[int], party: List[Combatant]):
+        self.player_id = player_id
+        self.party = party
+        self.active_index = 0
+
+    @property
+    def active(self) -> Combatant:
+        return self.party[self.active_index]
+
+    @property
+    def has_remaining(self) -> bool:
+        return any(not pokemon.fainted for pokemon in self.party)
+
+
+class BattleState:
+    """Everything the battle engine needs, built once at battle creation"""
+    __slots__ = ('battle_id', 'battle_type', 'channel_id', 'sides', 'current_turn',
+                 'turn_player_id', 'battle_log', 'weather', 'terrain', 'difficulty',
+                 'seed', 'rng', 'initial', 'actions')
+
+    def __init__(self, battle_id: int, battle_type: str, channel_id: str, side1: Side, side2: Side,
+                 difficulty: Optional[str] = None, seed: Optional[int] = None):
+        self.battle_id = battle_id
+        self.battle_type = battle_type
+        self.channel_id = channel_id
+        self.difficulty = difficulty  # NPC battles only
+        # Each battle owns its randomness, so it can be replayed from the seed
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.rng = random.Random(self.seed)
+        # Replay recording: start payload and encoded actions (None when not recording)
+        self.initial: Optional[List[Any]] = None
+        self.actions: Optional[List[int]] = None
+        self.sides = (side1, side2)
+        self.current_turn = 1
+        self.turn_player_id = side1.player_id
+        self.battle_log: Deque[str] = deque(maxlen=BATTLE_LOG_SIZE)
+        self.weather: Optional[str] = None
+        self.terrain: Optional[str] = None
+
+    @property
+    def player1_id(self) -> Optional[int]:
+        return self.sides[0].player_id
+
+    @property
+    def player2_id(self) -> Optional[int]:
+        return self.sides[1].player_id
+
+    def side_for(self, player_id: Optional[int]) -> Side:
+        return self.sides[0] if player_id == self.sides[0].player_id else self.sides[1]
+
+    def opponent_of(self, player_id: Optional[int]) -> Side:
+        return self.sides[1] if player_id == self.sides[0].player_id else self.sides[0]
+
+    def start_recording(self):
+        """Snapshot the starting parties and record every action from here on"""
+        self.initial = self.to_payload()
+        self.actions = []
+
+    def to_payload(self) -> List[Any]:
+        """Plain nested lists of everything needed to resume the battle (the log is not kept)"""
+        return [
+            CHECKPOINT_VERSION, self.battle_type, self.channel_id, self.current_turn,
+            self.turn_player_id, self.weather, self.terrain, self.difficulty,
+            [[side.player_id, side.active_index, [pokemon.to_list() for pokemon in side.party]]
+             for side in self.sides]
+        ]
+
+    @classmethod
+    def from_payload(cls, battle_id: int, payload: List[Any], seed: Optional[int] = None) -> 'BattleState':
+        """Fresh, independent battle from to_payload() output (also how simulations clone)"""
+        if payload[0] != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {payload[0]}")
+
+        _, battle_type, channel_id, current_turn, turn_player_id, weather, terrain, difficulty, sides = payload
+        restored = []
+        for player_id, active_index, party in sides:
+            side = Side(player_id, [Combatant.from_list(pokemon) for pokemon in party])
+            side.active_index = active_index
+            restored.append(side)
+
+        battle = cls(battle_id, battle_type, channel_id, *restored, difficulty=difficulty, seed=seed)
+        battle.current_turn = current_turn
+        battle.turn_player_id = turn_player_id
+        battle.weather = weather
+        battle.terrain = terrain
+        return battle
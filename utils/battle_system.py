@@ -1,424 +1,392 @@
 import discord
+import asyncio
 import random
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from utils.battle_actor import BattleActor
+from utils.battle_broadcast import BattleBroadcaster
+from utils.battle_engine import BattleEngine
+from utils.battle_state import BattleState, Side, Combatant, MoveSlot
+from utils.battle_logger import BattleActionLogger
+from utils.battle_renderer import BattleRenderer
+from utils.battle_replay import encode_action, encode_replay, replay
+from utils.message_dispatcher import MessageDispatcher
+from utils.npc_ai import NPCBattleAI
+
 logger = logging.getLogger(__name__)
 
 class BattleSystem:
-    def __init__(self, db, config):
+    def __init__(self, db, config, timers=None, action_logger=None, npc_ai=None, dispatcher=None, renderer=None,
+                 reference=None):
         self.db = db
         self.config = config
+        self.reference = reference  # Mapped reference snapshot; movesets come from the database without one
+        self.timers = timers
+        self.action_logger = action_logger or BattleActionLogger(
+            db, config.battle_log_batch_size, config.battle_log_flush_seconds, timers=timers
+        )
         self.active_battles = {}
-        self.status_effects = {
-            'burn': {'damage': 0.125, 'attack_multiplier': 0.5},
-            'poison': {'damage': 0.125},
-            'toxic': {'damage': 0.125, 'increasing': True},
-            'paralysis': {'speed_multiplier': 0.25, 'paralyze_chance': 0.25},
-            'sleep': {'duration': (1, 3), 'cant_move': True},
-            'freeze': {'thaw_chance': 0.2, 'cant_move': True},
-            'confusion': {'duration': (1, 4), 'hurt_chance': 0.33},
-            'flinch': {'duration': 1, 'cant_move': True}
-        }
-        self.type_effectiveness = {
-            'Normal': {'Rock': 0.5, 'Ghost': 0, 'Steel': 0.5},
-            'Fire': {'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 2, 'Bug': 2, 'Rock': 0.5, 'Dragon': 0.5, 'Steel': 2},
-            'Water': {'Fire': 2, 'Water': 0.5, 'Grass': 0.5, 'Ground': 2, 'Rock': 2, 'Dragon': 0.5},
-            'Electric': {'Water': 2, 'Electric': 0.5, 'Grass': 0.5, 'Ground': 0, 'Flying': 2, 'Dragon': 0.5},
-            'Grass': {'Fire': 0.5, 'Water': 2, 'Grass': 0.5, 'Poison': 0.5, 'Ground': 2, 'Flying': 0.5, 'Bug': 0.5, 'Rock': 2, 'Dragon': 0.5, 'Steel': 0.5},
-            'Ice': {'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 0.5, 'Ground': 2, 'Flying': 2, 'Dragon': 2, 'Steel': 0.5},
-            'Fighting': {'Normal': 2, 'Ice': 2, 'Poison': 0.5, 'Flying': 0.5, 'Psychic': 0.5, 'Bug': 0.5, 'Rock': 2, 'Ghost': 0, 'Dark': 2, 'Steel': 2, 'Fairy': 0.5},
-            'Poison': {'Grass': 2, 'Poison': 0.5, 'Ground': 0.5, 'Rock': 0.5, 'Ghost': 0.5, 'Steel': 0, 'Fairy': 2},
-            'Ground': {'Fire': 2, 'Electric': 2, 'Grass': 0.5, 'Poison': 2, 'Flying': 0, 'Bug': 0.5, 'Rock': 2, 'Steel': 2},
-            'Flying': {'Electric': 0.5, 'Grass': 2, 'Fighting': 2, 'Bug': 2, 'Rock': 0.5, 'Steel': 0.5},
-            'Psychic': {'Fighting': 2, 'Poison': 2, 'Psychic': 0.5, 'Dark': 0, 'Steel': 0.5},
-            'Bug': {'Fire': 0.5, 'Grass': 2, 'Fighting': 0.5, 'Poison': 0.5, 'Flying': 0.5, 'Psychic': 2, 'Ghost': 0.5, 'Dark': 2, 'Steel': 0.5, 'Fairy': 0.5},
-            'Rock': {'Fire': 2, 'Ice': 2, 'Fighting': 0.5, 'Ground': 0.5, 'Flying': 2, 'Bug': 2, 'Steel': 0.5},
-            'Ghost': {'Normal': 0, 'Psychic': 2, 'Ghost': 2, 'Dark': 0.5},
-            'Dragon': {'Dragon': 2, 'Steel': 0.5, 'Fairy': 0},
-            'Dark': {'Fighting': 0.5, 'Psychic': 2, 'Ghost': 2, 'Dark': 0.5, 'Fairy': 0.5},
-            'Steel': {'Fire': 0.5, 'Water': 0.5, 'Electric': 0.5, 'Ice': 2, 'Rock': 2, 'Steel': 0.5, 'Fairy': 2},
-            'Fairy': {'Fire': 0.5, 'Fighting': 2, 'Poison': 0.5, 'Dragon': 2, 'Dark': 2, 'Steel': 0.5}
-        }
+        self.dirty_battles = set()  # Battles changed since their last checkpoint
+        self.actors: Dict[int, BattleActor] = {}  # One inbox per battle that has work in flight
+        self.listeners: Dict[int, List[Any]] = {}  # battle_id -> callables told about every turn
+        self.npc_ai = npc_ai or NPCBattleAI(config.npc_ai_workers)
+        dispatcher = dispatcher or MessageDispatcher()
+        self.renderer = renderer or BattleRenderer(dispatcher, timers, config.battle_render_delay)
+        self.broadcaster = BattleBroadcaster(
+            dispatcher, self.get_battle_embed, timers, config.spectate_interval, config.max_spectator_channels
+        )
     
-    async def create_battle(self, player1_id: int, player2_id: int, battle_type: str, channel_id: str) -> int:
-        """Create a new battle"""
-        battle_id = await self.db.create_battle(player1_id, player2_id, battle_type, channel_id)
-        
+    async def create_battle(self, player1_id: int, player2_id: Optional[int], battle_type: str, channel_id: str,
+                            npc_party: Optional[List[Combatant]] = None, difficulty: Optional[str] = None) -> int:
+        """Create a new battle; NPC battles pass the NPC's party instead of a player2_id"""
         # Get player parties
-        player1_party = await self.db.get_user_party(player1_id)
-        player2_party = await self.db.get_user_party(player2_id)
+        player1_party = await self.db.get_battle_party(player1_id)
+        player2_party = npc_party if npc_party is not None else await self.db.get_battle_party(player2_id)
         
         if not player1_party or not player2_party:
             raise ValueError("One or both players don't have a party")
         
-        # Initialize battle state
-        battle_state = {
-            'battle_id': battle_id,
-            'player1_id': player1_id,
-            'player2_id': player2_id,
-            'player1_party': player1_party,
-            'player2_party': player2_party,
-            'current_turn': 1,
-            'turn_player_id': player1_id,
-            'battle_log': [],
-            'weather': None,
-            'terrain': None,
-            'player1_active_pokemon': 0,
-            'player2_active_pokemon': 0
-        }
+        battle_id = await self.db.create_battle(player1_id, player2_id, battle_type, channel_id)
+        
+        # Stats and movesets are computed once here; turns only touch attributes
+        battle_state = BattleState(
+            battle_id, battle_type, channel_id,
+            Side(player1_id, await self._build_combatants(player1_party)),
+            Side(player2_id, npc_party if npc_party is not None else await self._build_combatants(player2_party)),
+            difficulty=difficulty
+        )
+        battle_state.start_recording()
         
         self.active_battles[battle_id] = battle_state
+        self._reset_battle_timeout(battle_id)
+        await self._checkpoint(battle_id)
         
         return battle_id
     
-    async def process_turn(self, battle_id: int, player_id: int, action: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a turn in battle"""
+    async def _build_combatants(self, party: List[Dict[str, Any]]) -> List[Combatant]:
+        """Turn party rows into combatants with computed stats and full-PP movesets"""
+        combatants = []
+        for row in party:
+            if self.reference:
+                rows = self.reference.level_up_moves(row['pokemon_id'], row['level'])
+            else:
+                rows = await self.db.get_level_up_moves(row['pokemon_id'], row['level'])
+            moves = [MoveSlot.from_row(move) for move in rows]
+            combatants.append(Combatant.from_party_row(row, moves))
+        return combatants
+    
+    def _engine(self, battle: BattleState) -> BattleEngine:
+        """Rules live in the engine; this class handles I/O around them. Each battle has its own RNG"""
+        return BattleEngine(battle.rng)
+    
+    def _record(self, battle: BattleState, action: Dict[str, Any]):
+        """Append an applied action to the battle's replay"""
+        if battle.actions is not None:
+            battle.actions.append(encode_action(action))
+    
+    async def get_battle(self, battle_id: int) -> Optional[BattleState]:
+        """In-memory battle state, rebuilt by replaying its checkpoint after a restart"""
         battle = self.active_battles.get(battle_id)
-        if not battle:
-            return {'error': 'Battle not found'}
-        
-        if battle['turn_player_id'] != player_id:
-            return {'error': 'Not your turn'}
-        
-        result = {'success': True, 'actions': [], 'battle_over': False}
+        if battle:
+            return battle
         
         try:
-            if action['type'] == 'move':
-                result = await self._process_move_action(battle_id, player_id, action)
-            elif action['type'] == 'switch':
-                result = await self._process_switch_action(battle_id, player_id, action)
-            elif action['type'] == 'item':
-                result = await self._process_item_action(battle_id, player_id, action)
-            elif action['type'] == 'forfeit':
-                result = await self._process_forfeit_action(battle_id, player_id)
+            checkpoint = await self.db.get_battle_checkpoint(battle_id)
+            if not checkpoint:
+                return None
             
-            # Check if battle is over
-            if await self._check_battle_over(battle_id):
-                result['battle_over'] = True
-                result['winner'] = await self._determine_winner(battle_id)
-                await self._end_battle(battle_id)
-            else:
-                # Switch turns
-                battle['turn_player_id'] = battle['player2_id'] if player_id == battle['player1_id'] else battle['player1_id']
-                battle['current_turn'] += 1
+            battle = replay(checkpoint, battle_id)
             
         except Exception as e:
-            logger.error(f"Error processing turn: {e}")
-            result = {'error': 'Error processing turn'}
+            logger.error(f"Error restoring battle {battle_id}: {e}")
+            return None
         
-        return result
+        # Another caller may have restored it while we were reading
+        return self.active_battles.setdefault(battle_id, battle)
     
-    async def _process_move_action(self, battle_id: int, player_id: int, action: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a move action"""
-        battle = self.active_battles[battle_id]
-        
-        # Get active Pokemon
-        active_pokemon = self._get_active_pokemon(battle, player_id)
-        opponent_pokemon = self._get_opponent_pokemon(battle, player_id)
-        
-        # Get move details
-        move_id = action['move_id']
-        move = await self.db.fetch_one("SELECT * FROM moves WHERE move_id = ?", (move_id,))
-        
-        if not move:
-            return {'error': 'Move not found'}
-        
-        # Check if Pokemon can move (status conditions)
-        if not await self._can_pokemon_move(active_pokemon):
-            return {'success': True, 'actions': [f"{active_pokemon['name']} is unable to move!"]}
-        
-        # Calculate move effects
-        results = []
-        
-        if move['category'] == 'status':
-            results.append(await self._process_status_move(active_pokemon, opponent_pokemon, move))
-        else:
-            results.append(await self._process_damage_move(active_pokemon, opponent_pokemon, move))
-        
-        # Process status effects
-        await self._process_status_effects(active_pokemon, opponent_pokemon)
-        
-        return {'success': True, 'actions': results}
+    async def cancel_battle(self, battle_id: int):
+        """Drop a battle that was declined or cancelled before it started"""
+        await self._actor(battle_id).call(self._end_battle, battle_id, 'forfeited')
     
-    async def _process_damage_move(self, attacker: Dict[str, Any], defender: Dict[str, Any], move: Dict[str, Any]) -> str:
-        """Process a damage-dealing move"""
-        # Calculate accuracy check
-        if move['accuracy'] and random.random() > move['accuracy'] / 100:
-            return f"{attacker['name']}'s {move['name']} missed!"
-        
-        # Calculate damage
-        damage = self._calculate_damage(attacker, defender, move)
-        
-        # Apply type effectiveness
-        type_effectiveness = self._get_type_effectiveness(move['type'], defender['type1'], defender.get('type2'))
-        damage = int(damage * type_effectiveness)
-        
-        # Critical hit
-        is_critical = random.random() < 0.0625  # 6.25% base chance
-        if is_critical:
-            damage = int(damage * 1.5)
-        
-        # Apply damage
-        defender['current_hp'] = max(0, defender['current_hp'] - damage)
-        
-        # Build result message
-        result = f"{attacker['name']} used {move['name']}"
-        
-        if is_critical:
-            result += "! A critical hit!"
-        
-        if type_effectiveness > 1:
-            result += " It's super effective!"
-        elif type_effectiveness < 1:
-            result += " It's not very effective..."
-        elif type_effectiveness == 0:
-            result += " It had no effect!"
-        
-        result += f" ({defender['name']} took {damage} damage)"
-        
-        # Apply secondary effects
-        if move['effect_chance'] and random.random() < move['effect_chance'] / 100:
-            if move['ailment']:
-                defender['status_condition'] = move['ailment']
-                result += f" {defender['name']} was {move['ailment']}!"
-        
-        return result
+    def _actor(self, battle_id: int) -> BattleActor:
+        """The battle's actor, started on first use"""
+        actor = self.actors.get(battle_id)
+        if actor is None:
+            actor = BattleActor(battle_id, self.config.battle_actor_idle_seconds, on_exit=self._actor_exited)
+            self.actors[battle_id] = actor
+        return actor
     
-    def _calculate_damage(self, attacker: Dict[str, Any], defender: Dict[str, Any], move: Dict[str, Any]) -> int:
-        """Calculate damage using Pokemon damage formula"""
-        if move['power'] is None:
-            return 0
-        
-        # Get attacking and defending stats
-        if move['category'] == 'physical':
-            attack_stat = attacker['attack']
-            defense_stat = defender['defense']
-        else:  # special
-            attack_stat = attacker['sp_attack']
-            defense_stat = defender['sp_defense']
-        
-        # Level
-        level = attacker['level']
-        
-        # Base damage calculation (simplified)
-        damage = int((((2 * level / 5 + 2) * move['power'] * attack_stat / defense_stat) / 50) + 2)
-        
-        # STAB (Same Type Attack Bonus)
-        if move['type'] in [attacker['type1'], attacker.get('type2')]:
-            damage = int(damage * 1.5)
-        
-        # Random variation (85-100%)
-        damage = int(damage * random.uniform(0.85, 1.0))
-        
-        return max(1, damage)
+    def _actor_exited(self, actor: BattleActor):
+        if self.actors.get(actor.battle_id) is actor:
+            del self.actors[actor.battle_id]
     
-    def _get_type_effectiveness(self, move_type: str, defender_type1: str, defender_type2: Optional[str] = None) -> float:
-        """Calculate type effectiveness"""
-        effectiveness = 1.0
-        
-        # Check against first type
-        if move_type in self.type_effectiveness:
-            type_matchups = self.type_effectiveness[move_type]
-            if defender_type1 in type_matchups:
-                effectiveness *= type_matchups[defender_type1]
-        
-        # Check against second type
-        if defender_type2 and move_type in self.type_effectiveness:
-            type_matchups = self.type_effectiveness[move_type]
-            if defender_type2 in type_matchups:
-                effectiveness *= type_matchups[defender_type2]
-        
-        return effectiveness
+    async def stop_actors(self):
+        """Stop every battle actor; turns still queued are cancelled"""
+        actors = list(self.actors.values())
+        for actor in actors:
+            actor.task.cancel()
+        await asyncio.gather(*(actor.task for actor in actors), return_exceptions=True)
     
-    async def _process_status_move(self, attacker: Dict[str, Any], defender: Dict[str, Any], move: Dict[str, Any]) -> str:
-        """Process a status move"""
-        # This is a simplified implementation
-        # In a full implementation, you'd handle specific status effects
-        result = f"{attacker['name']} used {move['name']}"
-        
-        if move['ailment']:
-            defender['status_condition'] = move['ailment']
-            result += f" {defender['name']} was {move['ailment']}!"
-        
-        return result
+    def subscribe(self, battle_id: int, listener):
+        """Call listener(battle_id, battle, result) after every turn of a battle, until it ends"""
+        self.listeners.setdefault(battle_id, []).append(listener)
     
-    async def _process_switch_action(self, battle_id: int, player_id: int, action: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a Pokemon switch action"""
-        battle = self.active_battles[battle_id]
-        
-        # Get the party
-        party = battle['player1_party'] if player_id == battle['player1_id'] else battle['player2_party']
-        
-        # Validate switch
-        new_pokemon_index = action['pokemon_index']
-        if new_pokemon_index >= len(party) or new_pokemon_index < 0:
-            return {'error': 'Invalid Pokemon index'}
-        
-        # Update active Pokemon
-        if player_id == battle['player1_id']:
-            battle['player1_active_pokemon'] = new_pokemon_index
-        else:
-            battle['player2_active_pokemon'] = new_pokemon_index
-        
-        new_pokemon = party[new_pokemon_index]
-        
-        return {
-            'success': True,
-            'actions': [f"Switched to {new_pokemon['name']}!"]
-        }
+    def unsubscribe(self, battle_id: int, listener):
+        listeners = self.listeners.get(battle_id)
+        if listeners and listener in listeners:
+            listeners.remove(listener)
     
-    async def _process_item_action(self, battle_id: int, player_id: int, action: Dict[str, Any]) -> Dict[str, Any]:
-        """Process an item usage action"""
-        # Simplified implementation
-        item_id = action['item_id']
-        target_pokemon = action['target_pokemon']
-        
-        # Remove item from inventory
-        success = await self.db.remove_item_from_inventory(player_id, item_id)
-        
-        if not success:
-            return {'error': 'Item not found in inventory'}
-        
-        # Apply item effect (simplified)
-        return {
-            'success': True,
-            'actions': [f"Used item on {target_pokemon['name']}!"]
-        }
+    def _publish(self, battle_id: int, battle: BattleState, result: Dict[str, Any]):
+        for listener in list(self.listeners.get(battle_id, ())):
+            try:
+                listener(battle_id, battle, result)
+            except Exception as e:
+                logger.error(f"Battle {battle_id} listener failed: {e}")
+    
+    async def _checkpoint(self, battle_id: int):
+        """Mark a battle changed; writes are batched over battle_checkpoint_delay"""
+        self.dirty_battles.add(battle_id)
+        
+        if self.timers is None:
+            await self.flush_checkpoints()
+        elif ('battle_checkpoint',) not in self.timers:
+            self.timers.schedule(('battle_checkpoint',), self.config.battle_checkpoint_delay, self.flush_checkpoints)
     
-    async def _process_forfeit_action(self, battle_id: int, player_id: int) -> Dict[str, Any]:
-        """Process a forfeit action"""
-        battle = self.active_battles[battle_id]
+    async def flush_checkpoints(self):
+        """Write every changed battle's checkpoint in one batch"""
+        dirty, self.dirty_battles = self.dirty_battles, set()
         
-        # Determine winner
-        winner_id = battle['player2_id'] if player_id == battle['player1_id'] else battle['player1_id']
+        rows = []
+        for battle_id in dirty:
+            battle = self.active_battles.get(battle_id)
+            if battle:
+                rows.append((encode_replay(battle), battle.current_turn, battle.turn_player_id, battle_id))
         
-        # End battle
-        await self._end_battle(battle_id)
+        if not rows:
+            return
         
-        return {
-            'success': True,
-            'actions': [f"Battle forfeited! Winner: {winner_id}"],
-            'battle_over': True,
-            'winner': winner_id
-        }
+        try:
+            await self.db.save_battle_checkpoints(rows)
+        except Exception as e:
+            logger.error(f"Error saving {len(rows)} battle checkpoints: {e}")
+            self.dirty_battles.update(dirty)
+    
+    async def process_turn(self, battle_id: int, player_id: int, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a turn in battle; turns for one battle are applied one at a time, in arrival order"""
+        return await self._actor(battle_id).call(self._process_turn, battle_id, player_id, action)
     
-    async def _can_pokemon_move(self, pokemon: Dict[str, Any]) -> bool:
-        """Check if Pokemon can move (status condition effects)"""
-        status = pokemon.get('status_condition')
+    async def _process_turn(self, battle_id: int, player_id: int, action: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a turn; only ever runs on the battle's actor"""
+        battle = await self.get_battle(battle_id)
+        if not battle:
+            return {'error': 'Battle not found'}
         
-        if not status:
-            return True
+        if battle.turn_player_id != player_id:
+            return {'error': 'Not your turn'}
         
-        if status in ['sleep', 'freeze', 'paralysis']:
-            # Check status-specific effects
-            if status == 'paralysis' and random.random() < 0.25:
-                return False
-            elif status in ['sleep', 'freeze']:
-                return False
+        try:
+            turn = battle.current_turn
+            attacker = battle.side_for(player_id).active
+            defender = battle.opponent_of(player_id).active
+            attacker_hp, defender_hp = attacker.current_hp, defender.current_hp
+            
+            # Inventory is the only part of a turn that touches the database; the item is
+            # checked first and only used up once the engine has accepted the turn
+            if action['type'] == 'item' and await self.db.get_item_quantity(player_id, action['item_id']) < 1:
+                return {'error': 'Item not found in inventory'}
+            
+            result = self._engine(battle).take_turn(battle, player_id, action)
+            if result.get('error'):
+                return result
+            
+            if action['type'] == 'item' and not await self.db.remove_item_from_inventory(player_id, action['item_id']):
+                logger.warning(f"Item {action['item_id']} left player {player_id}'s inventory during battle {battle_id}")
+            
+            self._record(battle, action)
+            battle.battle_log.extend(result['actions'])
+            self.action_logger.log(
+                battle_id, turn, player_id, attacker.uid, action['type'],
+                {key: value for key, value in action.items() if key not in ('type', 'player_id')},
+                max(0, defender_hp - defender.current_hp), max(0, attacker_hp - attacker.current_hp)
+            )
+            
+            # The NPC answers straight away; its search runs off the event loop
+            if battle.battle_type == 'npc' and not result['battle_over'] and battle.turn_player_id is None:
+                npc_result = await self._npc_turn(battle)
+                result['actions'].extend(npc_result.get('actions', []))
+                result['battle_over'] = npc_result.get('battle_over', False)
+                result['winner'] = npc_result.get('winner')
+            
+            self._publish(battle_id, battle, result)
+            
+            if result['battle_over']:
+                await self._end_battle(battle_id, status='forfeited' if action['type'] == 'forfeit' else 'completed')
+            else:
+                self._reset_battle_timeout(battle_id)
+                await self._checkpoint(battle_id)
+            
+        except Exception as e:
+            logger.error(f"Error processing turn: {e}")
+            result = {'error': 'Error processing turn'}
         
-        return True
+        return result
     
-    async def _process_status_effects(self, pokemon: Dict[str, Any], opponent: Dict[str, Any]):
-        """Process status effects at the end of turn"""
-        status = pokemon.get('status_condition')
+    async def _npc_turn(self, battle: BattleState) -> Dict[str, Any]:
+        """Let the NPC side pick and play its action"""
+        turn = battle.current_turn
+        npc = battle.side_for(None).active
+        player = battle.opponent_of(None).active
+        npc_hp, player_hp = npc.current_hp, player.current_hp
+        
+        action = await self.npc_ai.choose_action(battle, None, battle.difficulty)
+        engine = self._engine(battle)
+        result = engine.take_turn(battle, None, action)
+        
+        if result.get('error'):
+            # Search results are always legal; fall back rather than stall the battle
+            logger.error(f"NPC action {action} rejected in battle {battle.battle_id}: {result['error']}")
+            # Picked off the battle's RNG so the replay only depends on the recorded action
+            action = engine.random_action(battle, None, random.Random())
+            result = engine.take_turn(battle, None, action)
+        
+        if not result.get('error'):
+            self._record(battle, action)
+            battle.battle_log.extend(result['actions'])
+            self.action_logger.log(
+                battle.battle_id, turn, None, npc.uid, action['type'],
+                {key: value for key, value in action.items() if key != 'type'},
+                max(0, player_hp - player.current_hp), max(0, npc_hp - npc.current_hp)
+            )
         
-        if status in self.status_effects:
-            effect = self.status_effects[status]
-            
-            # Damage from status
-            if 'damage' in effect:
-                damage = int(pokemon['max_hp'] * effect['damage'])
-                pokemon['current_hp'] = max(0, pokemon['current_hp'] - damage)
-            
-            # Stat modifications
-            if 'attack_multiplier' in effect:
-                pokemon['attack'] = int(pokemon['attack'] * effect['attack_multiplier'])
+        return result
     
-    def _get_active_pokemon(self, battle: Dict[str, Any], player_id: int) -> Dict[str, Any]:
+    def _get_active_pokemon(self, battle: BattleState, player_id: int) -> Combatant:
         """Get the active Pokemon for a player"""
-        party = battle['player1_party'] if player_id == battle['player1_id'] else battle['player2_party']
-        active_index = battle['player1_active_pokemon'] if player_id == battle['player1_id'] else battle['player2_active_pokemon']
-        return party[active_index]
+        return battle.side_for(player_id).active
     
-    def _get_opponent_pokemon(self, battle: Dict[str, Any], player_id: int) -> Dict[str, Any]:
+    def _get_opponent_pokemon(self, battle: BattleState, player_id: int) -> Combatant:
         """Get the opponent's active Pokemon"""
-        opponent_id = battle['player2_id'] if player_id == battle['player1_id'] else battle['player1_id']
-        return self._get_active_pokemon(battle, opponent_id)
+        return battle.opponent_of(player_id).active
     
-    async def _check_battle_over(self, battle_id: int) -> bool:
-        """Check if battle is over"""
-        battle = self.active_battles[battle_id]
-        
-        # Check if any player has no Pokemon left
-        player1_has_pokemon = any(p['current_hp'] > 0 for p in battle['player1_party'])
-        player2_has_pokemon = any(p['current_hp'] > 0 for p in battle['player2_party'])
-        
-        return not player1_has_pokemon or not player2_has_pokemon
+    def _reset_battle_timeout(self, battle_id: int):
+        """(Re)start the inactivity timer for a battle"""
+        if self.timers is not None:
+            self.timers.schedule(('battle', battle_id), self.config.battle_timeout, self.timeout_battle, battle_id)
     
-    async def _determine_winner(self, battle_id: int) -> int:
-        """Determine the winner of the battle"""
-        battle = self.active_battles[battle_id]
-        
-        player1_has_pokemon = any(p['current_hp'] > 0 for p in battle['player1_party'])
-        player2_has_pokemon = any(p['current_hp'] > 0 for p in battle['player2_party'])
+    async def timeout_battle(self, battle_id: int):
+        """Forfeit a battle for the player who let battle_timeout run out"""
+        await self._actor(battle_id).call(self._timeout_battle, battle_id)
+    
+    async def _timeout_battle(self, battle_id: int):
+        # A turn queued ahead of the timeout restarted the timer; the battle is still live
+        if self.timers is not None and ('battle', battle_id) in self.timers:
+            return
         
-        if player1_has_pokemon:
-            return battle['player1_id']
-        else:
-            return battle['player2_id']
+        try:
+            battle = await self.get_battle(battle_id)
+            
+            if battle:
+                loser_id = battle.turn_player_id
+                winner_id = battle.opponent_of(loser_id).player_id
+                logger.info(f"Battle {battle_id} timed out; winner: {winner_id}")
+            
+            await self._end_battle(battle_id, status='forfeited')
+            
+        except Exception as e:
+            logger.error(f"Error timing out battle {battle_id}: {e}")
     
-    async def _end_battle(self, battle_id: int):
+    async def _end_battle(self, battle_id: int, status: str = 'completed'):
         """End a battle and distribute rewards"""
-        battle = self.active_battles[battle_id]
-        
-        # Remove from active battles
-        if battle_id in self.active_battles:
-            del self.active_battles[battle_id]
+        # Remove from active battles, keeping its final replay for audits
+        battle = self.active_battles.pop(battle_id, None)
+        final_replay = encode_replay(battle) if battle and battle.initial is not None else None
+        self.dirty_battles.discard(battle_id)
+        self.listeners.pop(battle_id, None)
+        
+        # Its actor answers anything already queued ("Battle not found") and exits
+        actor = self.actors.get(battle_id)
+        if actor:
+            actor.finished = True
+        
+        if self.timers is not None:
+            self.timers.cancel(('battle', battle_id))
+        
+        # Final edit of the battle message; forfeits and timeouts go against the player whose turn it was
+        winner_index = None
+        if battle and status == 'completed':
+            winner_index = 0 if battle.sides[0].has_remaining else 1
+        elif battle:
+            winner_index = 1 if battle.turn_player_id == battle.sides[0].player_id else 0
+        final_embed = self.renderer.finish(battle_id, status, winner_index, battle)
+        self.broadcaster.finish(battle_id, final_embed)
         
         # Update battle status in database
         await self.db.execute(
-            "UPDATE active_battles SET status = 'completed' WHERE battle_id = ?",
-            (battle_id,)
+            "UPDATE active_battles SET status = ?, checkpoint = COALESCE(?, checkpoint) WHERE battle_id = ? AND status = 'active'",
+            (status, final_replay, battle_id)
         )
         
         logger.info(f"Battle {battle_id} ended")
     
+    async def spectate(self, battle_id: int, channel) -> Dict[str, Any]:
+        """Follow a live battle from channel; updates there are coalesced to one per spectate_interval"""
+        if not await self.get_battle(battle_id):
+            return {'error': 'Battle not found'}
+        
+        result = await self.broadcaster.subscribe(battle_id, channel)
+        if (result.get('success') and battle_id in self.active_battles
+                and self.broadcaster.publish not in self.listeners.get(battle_id, ())):
+            self.subscribe(battle_id, self.broadcaster.publish)
+        return result
+    
+    def stop_spectating(self, battle_id: int, channel_id: int) -> bool:
+        """Stop updating a battle in channel; False if it wasn't being followed there"""
+        if not self.broadcaster.unsubscribe(battle_id, channel_id):
+            return False
+        if not self.broadcaster.watching(battle_id):
+            self.unsubscribe(battle_id, self.broadcaster.publish)
+        return True
+    
     async def get_battle_embed(self, battle_id: int) -> discord.Embed:
         """Create an embed showing the current battle state"""
-        battle = self.active_battles.get(battle_id)
+        battle = await self.get_battle(battle_id)
         if not battle:
             return discord.Embed(title="Battle not found", color=discord.Color.red())
         
-        embed = discord.Embed(
-            title=f"Battle #{battle_id}",
-            description=f"Turn {battle['current_turn']}",
-            color=discord.Color.blue()
-        )
-        
-        # Show active Pokemon for both players
-        player1_pokemon = self._get_active_pokemon(battle, battle['player1_id'])
-        player2_pokemon = self._get_active_pokemon(battle, battle['player2_id'])
-        
-        # Player 1's Pokemon
-        player1_info = f"**{player1_pokemon['name']}** (Lv. {player1_pokemon['level']})\n"
-        player1_info += f"HP: {player1_pokemon['current_hp']}/{player1_pokemon['max_hp']}\n"
-        if player1_pokemon.get('status_condition'):
-            player1_info += f"Status: {player1_pokemon['status_condition'].title()}\n"
-        
-        # Player 2's Pokemon
-        player2_info = f"**{player2_pokemon['name']}** (Lv. {player2_pokemon['level']})\n"
-        player2_info += f"HP: {player2_pokemon['current_hp']}/{player2_pokemon['max_hp']}\n"
-        if player2_pokemon.get('status_condition'):
-            player2_info += f"Status: {player2_pokemon['status_condition'].title()}\n"
-        
-        embed.add_field(name="Player 1", value=player1_info, inline=True)
-        embed.add_field(name="Player 2", value=player2_info, inline=True)
+        # An attached battle message already has the current embed, with player names
+        return self.renderer.live_embed(battle_id) or self.renderer.build_embed(battle)
+    
+    async def show_battle(self, battle_id: int, message, title: Optional[str] = None,
+                          names: Optional[Tuple[str, str]] = None) -> Optional[discord.Embed]:
+        """Keep message's embed in step with the battle from now on; returns the embed to show"""
+        battle = await self.get_battle(battle_id)
+        if not battle:
+            return None
         
-        # Show whose turn it is
-        current_player = battle['turn_player_id']
-        embed.set_footer(text=f"It's Player {current_player}'s turn")
+        embed = self._attach(battle, message, title, names)
+        await self.db.set_battle_message(battle_id, str(message.id))
+        return embed
+    
+    async def resume_battle(self, battle_id: int, message, names: Optional[Tuple[str, str]] = None) -> bool:
+        """Pick a started battle back up after a restart; False if it can't be restored
+
+        Its message is kept up to date again and the player to move gets a full
+        battle_timeout, rather than whatever was left when the bot went down.
+        """
+        battle = await self.get_battle(battle_id)
+        if not battle:
+            return False
         
+        self._attach(battle, message, None, names)
+        self._reset_battle_timeout(battle_id)
+        return True
+    
+    def _attach(self, battle: BattleState, message, title: Optional[str],
+                names: Optional[Tuple[str, str]]) -> discord.Embed:
+        embed = self.renderer.attach(battle, message, title, names)
+        if self.renderer.update not in self.listeners.get(battle.battle_id, ()):
+            self.subscribe(battle.battle_id, self.renderer.update)
         return embed
\ No newline at end of file
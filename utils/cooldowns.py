@@ -0,0 +1,91 @@
+import heapq
+import json
+import time
+from typing import Dict, List, Hashable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CooldownStore:
+    """Bounded cooldown map on monotonic time with heap-ordered expiry"""
+
+    def __init__(self, namespace: str, max_size: int = 200000):
+        self.namespace = namespace
+        self.max_size = max_size
+        self.expiries: Dict[Hashable, float] = {}
+        # (expiry, key); entries go stale when a key is re-set or reset, and are skipped
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def remaining(self, key: Hashable) -> float:
+        """Seconds left on a cooldown, 0 if none"""
+        expiry = self.expiries.get(key)
+        if expiry is None:
+            return 0.0
+
+        left = expiry - time.monotonic()
+        if left <= 0:
+            del self.expiries[key]
+            return 0.0
+        return left
+
+    def is_active(self, key: Hashable) -> bool:
+        """Whether a cooldown is running for key"""
+        return self.remaining(key) > 0
+
+    def set(self, key: Hashable, duration: float):
+        """Start (or restart) a cooldown"""
+        if key not in self.expiries:
+            self._evict(self.max_size - 1)
+        expiry = time.monotonic() + duration
+        self.expiries[key] = expiry
+        heapq.heappush(self._heap, (expiry, key))
+
+    def try_acquire(self, key: Hashable, duration: float) -> bool:
+        """Start a cooldown unless one is running; returns True if it was started"""
+        if self.is_active(key):
+            return False
+        self.set(key, duration)
+        return True
+
+    def reset(self, key: Hashable) -> bool:
+        """Clear a cooldown; returns True if one was running"""
+        return self.expiries.pop(key, None) is not None
+
+    def __len__(self) -> int:
+        return len(self.expiries)
+
+    def _evict(self, limit: int):
+        """Drop expired entries, then the soonest-expiring ones while above limit"""
+        now = time.monotonic()
+        heap = self._heap
+        while heap and (heap[0][0] <= now or len(self.expiries) > limit):
+            expiry, key = heapq.heappop(heap)
+            if self.expiries.get(key) == expiry:
+                del self.expiries[key]
+
+        # Re-set and reset keys leave stale heap entries behind; compact occasionally
+        if len(heap) > 2 * len(self.expiries) + 1024:
+            self._heap = [(expiry, key) for key, expiry in self.expiries.items()]
+            heapq.heapify(self._heap)
+
+    async def snapshot(self, db):
+        """Persist running cooldowns (as wall-clock expiry) so they survive restarts"""
+        self._evict(self.max_size)
+        offset = time.time() - time.monotonic()
+        rows = [(json.dumps(key), expiry + offset) for key, expiry in self.expiries.items()]
+        await db.replace_cooldowns(self.namespace, rows)
+
+    async def restore(self, db):
+        """Load cooldowns saved by snapshot()"""
+        rows = await db.fetch_all(
+            "SELECT cooldown_key, expires_at FROM cooldowns WHERE namespace = ? AND expires_at > ?",
+            (self.namespace, time.time())
+        )
+
+        now = time.time()
+        for row in rows:
+            self.set(json.loads(row['cooldown_key']), row['expires_at'] - now)
+
+        if rows:
+            logger.info(f"Restored {len(rows)} {self.namespace} cooldowns")
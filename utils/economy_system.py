@@ -4,6 +4,8 @@ from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import logging
 
+from utils.cooldowns import CooldownStore
+
 logger = logging.getLogger(__name__)
 
 class EconomySystem:
@@ -13,9 +15,15 @@ class EconomySystem:
         self.daily_bonus_amount = 100
         self.vote_bonus_amount = 1500
         self.upvote_point_value = 10
+        
+        # Users who already claimed today, so repeat ;daily calls skip the database
+        self.daily_cooldowns = CooldownStore('daily', config.cooldown_max_entries)
     
     async def give_daily_bonus(self, user_id: int) -> Dict[str, any]:
         """Give daily bonus to user"""
+        if self.daily_cooldowns.is_active(user_id):
+            return {'success': False, 'error': 'Daily bonus already claimed today'}
+        
         try:
             user = await self.db.fetch_one(
                 "SELECT * FROM users WHERE user_id = ?",
@@ -30,6 +38,7 @@ class EconomySystem:
             if last_daily:
                 last_date = datetime.fromisoformat(last_daily).date()
                 if last_date >= datetime.now().date():
+                    self.daily_cooldowns.set(user_id, self._seconds_until_midnight())
                     return {'success': False, 'error': 'Daily bonus already claimed today'}
             
             # Give daily bonus
@@ -40,6 +49,7 @@ class EconomySystem:
                 "UPDATE users SET last_daily = datetime('now') WHERE user_id = ?",
                 (user_id,)
             )
+            self.daily_cooldowns.set(user_id, self._seconds_until_midnight())
             
             return {
                 'success': True,
@@ -51,6 +61,12 @@ class EconomySystem:
             logger.error(f"Error giving daily bonus: {e}")
             return {'success': False, 'error': 'Database error'}
     
+    def _seconds_until_midnight(self) -> float:
+        """Time until the daily bonus resets"""
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - now).total_seconds()
+    
     async def process_vote(self, user_id: int) -> Dict[str, any]:
         """Process user vote reward"""
         try:
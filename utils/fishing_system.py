@@ -2,9 +2,10 @@ import discord
 import random
 import asyncio
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
 import logging
 
+from utils.cooldowns import CooldownStore
+
 logger = logging.getLogger(__name__)
 
 class FishingSystem:
@@ -41,22 +42,16 @@ class FishingSystem:
             'rare': [9, 65, 73, 134, 148, 149, 230, 245, 249, 382]  # Blastoise, Gyarados, etc.
         }
         
-        # Fishing cooldowns
-        self.user_cooldowns = {}
+        # Fishing cooldowns, keyed by Discord user ID
+        self.user_cooldowns = CooldownStore('fishing', config.cooldown_max_entries)
     
     async def can_fish(self, user_id: int) -> bool:
         """Check if user can fish (cooldown check)"""
-        if user_id in self.user_cooldowns:
-            if datetime.now() < self.user_cooldowns[user_id]:
-                return False
-        return True
+        return not self.user_cooldowns.is_active(user_id)
     
     async def get_fishing_cooldown_remaining(self, user_id: int) -> int:
         """Get remaining cooldown time in seconds"""
-        if user_id in self.user_cooldowns:
-            remaining = (self.user_cooldowns[user_id] - datetime.now()).total_seconds()
-            return max(0, int(remaining))
-        return 0
+        return int(self.user_cooldowns.remaining(user_id))
     
     async def get_user_rod(self, user_id: int) -> str:
         """Get the best fishing rod a user owns"""
@@ -93,7 +88,7 @@ class FishingSystem:
             # Check if fishing is successful
             if random.random() > rod['catch_rate']:
                 # Set cooldown for failed attempt (shorter)
-                self.user_cooldowns[user_id] = datetime.now() + timedelta(minutes=1)
+                self.user_cooldowns.set(user_id, 60)
                 
                 return {
                     'success': False,
@@ -156,7 +151,7 @@ class FishingSystem:
                 leveled_up = True
             
             # Set cooldown
-            self.user_cooldowns[user_id] = datetime.now() + timedelta(seconds=self.config.fish_cooldown)
+            self.user_cooldowns.set(user_id, self.config.fish_cooldown)
             
             # Get Pokemon details
             pokemon = await self.db.fetch_one(
@@ -227,22 +222,6 @@ class FishingSystem:
                 'success': False,
                 'error': 'Database error'
             }
-    
-    async def cleanup_cooldowns(self):
-        """Clean up expired cooldowns"""
-        try:
-            current_time = datetime.now()
-            expired_users = []
-            
-            for user_id, cooldown_time in self.user_cooldowns.items():
-                if current_time >= cooldown_time:
-                    expired_users.append(user_id)
-            
-            for user_id in expired_users:
-                del self.user_cooldowns[user_id]
-                
-        except Exception as e:
-            logger.error(f"Error cleaning up cooldowns: {e}")
 
 class FishingView(discord.ui.View):
     def __init__(self, bot, user_id):
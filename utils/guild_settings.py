@@ -0,0 +1,105 @@
+import json
+from typing import Dict, Optional, Any, FrozenSet, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Features a guild can switch off
+FEATURES = ('spawns', 'fishing')
+
+
+class GuildSettings:
+    """Settings for one guild"""
+    __slots__ = ('guild_id', 'spawn_channel_id', 'spawn_rate_multiplier', 'disabled_features', 'spawn_generations')
+
+    def __init__(self, guild_id: Optional[str], spawn_channel_id: Optional[str] = None,
+                 spawn_rate_multiplier: float = 1.0, disabled_features: FrozenSet[str] = frozenset(),
+                 spawn_generations: Optional[Tuple[int, ...]] = None):
+        self.guild_id = guild_id
+        self.spawn_channel_id = spawn_channel_id
+        self.spawn_rate_multiplier = spawn_rate_multiplier
+        self.disabled_features = disabled_features
+        self.spawn_generations = spawn_generations  # None uses config.spawn_generations
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'GuildSettings':
+        return cls(
+            row['guild_id'],
+            row['spawn_channel_id'],
+            row['spawn_rate_multiplier'] if row['spawn_rate_multiplier'] is not None else 1.0,
+            frozenset(json.loads(row['disabled_features'] or '[]')),
+            tuple(json.loads(row['spawn_generations'])) if row.get('spawn_generations') else None
+        )
+
+    def is_enabled(self, feature: str) -> bool:
+        return feature not in self.disabled_features
+
+    @property
+    def spawn_multiplier(self) -> float:
+        """Spawn rate multiplier, 0 when spawns are disabled"""
+        return self.spawn_rate_multiplier if self.is_enabled('spawns') else 0.0
+
+
+class GuildSettingsCache:
+    """All guild settings held in memory; writes go to the database and refresh the entry"""
+
+    def __init__(self, db):
+        self.db = db
+        self.settings: Dict[str, GuildSettings] = {}
+        self.listeners = []  # Callables told (guild_id, settings) after a guild's settings change
+
+    async def load(self):
+        """Load every guild's settings (startup)"""
+        rows = await self.db.get_all_guild_settings()
+        self.settings = {row['guild_id']: GuildSettings.from_row(row) for row in rows}
+        logger.info(f"Loaded settings for {len(self.settings)} guilds")
+
+    def get(self, guild_id) -> GuildSettings:
+        """Settings for a guild, defaults if it has none"""
+        key = str(guild_id) if guild_id is not None else None
+        settings = self.settings.get(key)
+        if settings is None:
+            return GuildSettings(key)
+        return settings
+
+    async def invalidate(self, guild_id):
+        """Re-read one guild's settings after a change"""
+        row = await self.db.get_guild_settings(str(guild_id))
+        if row:
+            self.settings[str(guild_id)] = GuildSettings.from_row(row)
+        else:
+            self.settings.pop(str(guild_id), None)
+
+        settings = self.get(guild_id)
+        for listener in self.listeners:
+            listener(str(guild_id), settings)
+
+    async def set_spawn_channel(self, guild_id, channel_id: Optional[int]):
+        await self.db.update_guild_setting(
+            str(guild_id), 'spawn_channel_id', str(channel_id) if channel_id else None
+        )
+        await self.invalidate(guild_id)
+
+    async def set_spawn_rate(self, guild_id, multiplier: float):
+        await self.db.update_guild_setting(str(guild_id), 'spawn_rate_multiplier', multiplier)
+        await self.invalidate(guild_id)
+
+    async def set_feature_enabled(self, guild_id, feature: str, enabled: bool):
+        if feature not in FEATURES:
+            raise ValueError(f"Unknown feature {feature}")
+
+        disabled = set(self.get(guild_id).disabled_features)
+        if enabled:
+            disabled.discard(feature)
+        else:
+            disabled.add(feature)
+
+        await self.db.update_guild_setting(str(guild_id), 'disabled_features', json.dumps(sorted(disabled)))
+        await self.invalidate(guild_id)
+
+    async def set_spawn_generations(self, guild_id, generations: Optional[Tuple[int, ...]]):
+        """Limit a guild's spawns to some generations; None goes back to the global setting"""
+        await self.db.update_guild_setting(
+            str(guild_id), 'spawn_generations', json.dumps(sorted(set(generations))) if generations else None
+        )
+        await self.invalidate(guild_id)
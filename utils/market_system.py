@@ -5,14 +5,24 @@ from typing import Dict, List, Optional
 logger = logging.getLogger(__name__)
 
 class MarketSystem:
-    def __init__(self, db, config):
+    def __init__(self, db, config, timers=None):
         self.db = db
         self.config = config
+        self.timers = timers
     
     async def create_listing(self, seller_id: int, pokemon_uid: int, price: int) -> int:
         """Create a market listing"""
         try:
-            listing_id = await self.db.create_market_listing(seller_id, pokemon_uid, price)
+            listing_id = await self.db.create_market_listing(
+                seller_id, pokemon_uid, price, days=self.config.max_listing_days
+            )
+            
+            if self.timers is not None:
+                self.timers.schedule(
+                    ('listing', listing_id), self.config.max_listing_days * 86400,
+                    self.db.expire_market_listing, listing_id
+                )
+            
             return listing_id
         except Exception as e:
             logger.error(f"Error creating market listing: {e}")
@@ -65,6 +75,9 @@ class MarketSystem:
                 (buyer_id, listing_id)
             )
             
+            if self.timers is not None:
+                self.timers.cancel(('listing', listing_id))
+            
             return {
                 'success': True,
                 'pokemon_uid': listing['pokemon_uid'],
@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Any, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lower goes first
+PRIORITY_SPAWN = 0
+PRIORITY_CATCH = 1
+PRIORITY_EDIT = 2
+PRIORITY_FLAVOR = 3
+
+
+class OutboundMessage:
+    """One queued send or edit"""
+    __slots__ = ('priority', 'seq', 'kind', 'target', 'kwargs', 'embeds', 'future', 'sent')
+
+    def __init__(self, priority: int, seq: int, kind: str, target, kwargs: Dict[str, Any]):
+        self.priority = priority
+        self.seq = seq
+        self.kind = kind  # 'send', 'edit' or 'catch'
+        self.target = target  # channel for sends, message for edits
+        self.kwargs = kwargs
+        self.embeds: List[Any] = []  # catch announcements merged into this one
+        self.future = asyncio.get_running_loop().create_future()
+        self.sent = False
+
+    def __lt__(self, other: 'OutboundMessage') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ChannelQueue:
+    """Pending messages and rate-limit bucket for one channel"""
+    __slots__ = ('channel_id', 'heap', 'edits', 'catch_batch', 'tokens', 'refilled_at', 'worker')
+
+    def __init__(self, channel_id: int, capacity: float):
+        self.channel_id = channel_id
+        self.heap: List[OutboundMessage] = []
+        self.edits: Dict[int, OutboundMessage] = {}
+        self.catch_batch: Optional[OutboundMessage] = None
+        self.tokens = capacity
+        self.refilled_at = time.monotonic()
+        self.worker: Optional[asyncio.Task] = None
+
+
+class MessageDispatcher:
+    """Per-channel outbound queues that stay under Discord's channel rate limit
+
+    Callers get a future for the resulting message and can return without awaiting it.
+    Only `channel.id`, `channel.send(**kwargs)`, `message.id`, `message.channel` and
+    `message.edit(**kwargs)` are used, so any object with those works as a channel.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0):
+        # Discord allows roughly 5 messages per 5 seconds per channel
+        self.capacity = float(rate)
+        self.per = per
+        self.refill_rate = rate / per
+        self.queues: Dict[int, ChannelQueue] = {}
+        # channel_id -> (tokens, refilled_at) for channels whose queue emptied before their bucket refilled
+        self.buckets: Dict[int, Tuple[float, float]] = {}
+        self._seq = itertools.count()
+
+    def send(self, channel, priority: int = PRIORITY_FLAVOR, **kwargs) -> asyncio.Future:
+        """Queue channel.send(**kwargs)"""
+        queue = self._queue(channel.id)
+        item = OutboundMessage(priority, next(self._seq), 'send', channel, kwargs)
+        self._push(queue, item)
+        return item.future
+
+    def edit(self, message, priority: int = PRIORITY_EDIT, **kwargs) -> asyncio.Future:
+        """Queue message.edit(**kwargs); a newer edit to the same message replaces a queued one"""
+        queue = self._queue(message.channel.id)
+
+        pending = queue.edits.get(message.id)
+        if pending is not None and not pending.sent:
+            pending.kwargs.update(kwargs)
+            return pending.future
+
+        item = OutboundMessage(priority, next(self._seq), 'edit', message, kwargs)
+        queue.edits[message.id] = item
+        self._push(queue, item)
+        return item.future
+
+    def announce_catch(self, channel, embed) -> asyncio.Future:
+        """Queue a catch announcement, merged with any others still waiting in the channel"""
+        queue = self._queue(channel.id)
+
+        batch = queue.catch_batch
+        if batch is not None and not batch.sent:
+            batch.embeds.append(embed)
+            return batch.future
+
+        item = OutboundMessage(PRIORITY_CATCH, next(self._seq), 'catch', channel, {})
+        item.embeds.append(embed)
+        queue.catch_batch = item
+        self._push(queue, item)
+        return item.future
+
+    def pending(self, channel_id: int) -> int:
+        """Messages waiting in a channel's queue"""
+        queue = self.queues.get(channel_id)
+        return len(queue.heap) if queue else 0
+
+    async def close(self):
+        """Stop all workers; queued messages are dropped"""
+        for queue in list(self.queues.values()):
+            if queue.worker:
+                queue.worker.cancel()
+            for item in queue.heap:
+                if not item.future.done():
+                    item.future.cancel()
+        self.queues.clear()
+        self.buckets.clear()
+
+    def _queue(self, channel_id: int) -> ChannelQueue:
+        queue = self.queues.get(channel_id)
+        if queue is None:
+            queue = self.queues[channel_id] = ChannelQueue(channel_id, self.capacity)
+            bucket = self.buckets.pop(channel_id, None)
+            if bucket is not None:
+                queue.tokens, queue.refilled_at = bucket
+        return queue
+
+    def _push(self, queue: ChannelQueue, item: OutboundMessage):
+        heapq.heappush(queue.heap, item)
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.create_task(self._drain(queue))
+
+    async def _drain(self, queue: ChannelQueue):
+        """Send a channel's queue in priority order, one bucket token per message"""
+        while queue.heap:
+            await self._take_token(queue)
+
+            item = heapq.heappop(queue.heap)
+            item.sent = True
+            if queue.catch_batch is item:
+                queue.catch_batch = None
+            if item.kind == 'edit' and queue.edits.get(item.target.id) is item:
+                del queue.edits[item.target.id]
+
+            try:
+                result = await self._deliver(item)
+                if not item.future.done():
+                    item.future.set_result(result)
+            except Exception as e:
+                logger.error(f"Error delivering {item.kind} to channel {queue.channel_id}: {e}")
+                if not item.future.done():
+                    item.future.set_exception(e)
+                    # Fire-and-forget callers never read it; don't warn about that
+                    item.future.exception()
+
+        if self.queues.get(queue.channel_id) is queue:
+            self._forget(queue)
+
+    def _forget(self, queue: ChannelQueue):
+        """Drop an idle channel's queue, keeping its bucket only until it has refilled"""
+        del self.queues[queue.channel_id]
+
+        # Buckets are stored in time order and every one is full `per` seconds after it was stored
+        now = time.monotonic()
+        while self.buckets:
+            oldest = next(iter(self.buckets))
+            if now - self.buckets[oldest][1] < self.per:
+                break
+            del self.buckets[oldest]
+
+        tokens = min(self.capacity, queue.tokens + (now - queue.refilled_at) * self.refill_rate)
+        if tokens < self.capacity:
+            self.buckets[queue.channel_id] = (tokens, now)
+
+    async def _take_token(self, queue: ChannelQueue):
+        while True:
+            now = time.monotonic()
+            queue.tokens = min(self.capacity, queue.tokens + (now - queue.refilled_at) * self.refill_rate)
+            queue.refilled_at = now
+            if queue.tokens >= 1:
+                queue.tokens -= 1
+                return
+            await asyncio.sleep((1 - queue.tokens) / self.refill_rate)
+
+    async def _deliver(self, item: OutboundMessage):
+        if item.kind == 'edit':
+            return await item.target.edit(**item.kwargs)
+
+        if item.kind == 'catch':
+            return await item.target.send(embed=self._merge_catches(item.embeds))
+
+        return await item.target.send(**item.kwargs)
+
+    @staticmethod
+    def _merge_catches(embeds: List[Any]):
+        """One embed listing every catch, styled after the first"""
+        if len(embeds) == 1:
+            return embeds[0]
+
+        merged = embeds[0].copy()
+        merged.title = f"🎉 {len(embeds)} Pokemon Caught!"
+        merged.description = "\n".join(embed.description for embed in embeds if embed.description)
+        # Fields (type, level) describe a single catch
+        merged.clear_fields()
+        return merged
@@ -0,0 +1,106 @@
+import asyncio
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any
+import logging
+
+from utils.battle_engine import BattleEngine
+from utils.battle_state import BattleState
+
+logger = logging.getLogger(__name__)
+
+# Difficulty -> (rollouts per candidate action, rollout depth in turns); no rollouts plays randomly
+DIFFICULTY_BUDGETS = {
+    'easy': (0, 0),
+    'normal': (12, 4),
+    'hard': (64, 12)
+}
+
+
+def evaluate(battle: BattleState, player_id: Optional[int]) -> float:
+    """Score in [-1, 1] from player_id's point of view: a win, a loss, or the HP balance"""
+    mine = battle.side_for(player_id)
+    theirs = battle.opponent_of(player_id)
+
+    if not theirs.has_remaining:
+        return 1.0
+    if not mine.has_remaining:
+        return -1.0
+
+    def health(side) -> float:
+        return sum(pokemon.current_hp / max(1, pokemon.max_hp) for pokemon in side.party) / len(side.party)
+
+    # Stay below a real win or loss so finishing the battle always wins out
+    return 0.9 * (health(mine) - health(theirs))
+
+
+def search_action(payload: List[Any], player_id: Optional[int], rollouts: int, depth: int, seed: int) -> Dict[str, Any]:
+    """Depth-limited Monte Carlo search: the legal action with the best mean rollout score
+
+    Runs in a worker process; takes a BattleState payload so only plain lists are pickled.
+    """
+    rng = random.Random(seed)
+    engine = BattleEngine(rng)
+    root = BattleState.from_payload(0, payload)
+
+    actions = engine.legal_actions(root, player_id)
+    if not actions:
+        return {'type': 'forfeit'}
+    if len(actions) == 1 or rollouts <= 0:
+        return rng.choice(actions)
+
+    best_action, best_score = actions[0], float('-inf')
+    for action in actions:
+        score = 0.0
+        for _ in range(rollouts):
+            battle = BattleState.from_payload(0, payload)
+            result = engine.take_turn(battle, player_id, action)
+
+            # Both sides play randomly for `depth` turns each
+            for _ in range(depth * 2):
+                if result.get('error') or result.get('battle_over'):
+                    break
+                acting = battle.turn_player_id
+                result = engine.take_turn(battle, acting, engine.random_action(battle, acting))
+
+            score += evaluate(battle, player_id)
+
+        if score > best_score:
+            best_action, best_score = action, score
+
+    return best_action
+
+
+class NPCBattleAI:
+    """Chooses NPC actions; searches run in a process pool so the event loop never waits on them"""
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+
+    async def choose_action(self, battle: BattleState, player_id: Optional[int], difficulty: Optional[str]) -> Dict[str, Any]:
+        rollouts, depth = DIFFICULTY_BUDGETS.get(difficulty or 'normal', DIFFICULTY_BUDGETS['normal'])
+        seed = random.getrandbits(32)
+
+        if rollouts <= 0:
+            return BattleEngine(random.Random(seed)).random_action(battle, player_id)
+
+        if self.pool is None:
+            # Spawned (not forked) workers: the bot process has database and HTTP threads running
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.pool, search_action, battle.to_payload(), player_id, rollouts, depth, seed
+            )
+        except Exception as e:
+            logger.error(f"NPC search failed for battle {battle.battle_id}, playing randomly: {e}")
+            return BattleEngine(random.Random(seed)).random_action(battle, player_id)
+
+    def close(self):
+        """Shut the worker processes down"""
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,62 @@
+import random
+from functools import lru_cache
+from typing import Dict, Optional, Any, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATS = ('hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed')
+
+# Nature -> (raised stat, lowered stat); the five neutral natures change nothing
+NATURES = {
+    'Hardy': (None, None), 'Lonely': ('attack', 'defense'), 'Brave': ('attack', 'speed'),
+    'Adamant': ('attack', 'sp_attack'), 'Naughty': ('attack', 'sp_defense'),
+    'Bold': ('defense', 'attack'), 'Docile': (None, None), 'Relaxed': ('defense', 'speed'),
+    'Impish': ('defense', 'sp_attack'), 'Lax': ('defense', 'sp_defense'),
+    'Timid': ('speed', 'attack'), 'Hasty': ('speed', 'defense'), 'Serious': (None, None),
+    'Jolly': ('speed', 'sp_attack'), 'Naive': ('speed', 'sp_defense'),
+    'Modest': ('sp_attack', 'attack'), 'Mild': ('sp_attack', 'defense'), 'Quiet': ('sp_attack', 'speed'),
+    'Bashful': (None, None), 'Rash': ('sp_attack', 'sp_defense'),
+    'Calm': ('sp_defense', 'attack'), 'Gentle': ('sp_defense', 'defense'), 'Sassy': ('sp_defense', 'speed'),
+    'Careful': ('sp_defense', 'sp_attack'), 'Quirky': (None, None)
+}
+
+# Columns on player_pokemon holding each computed stat
+STAT_COLUMNS = ('max_hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed')
+
+
+def calculate_stat(base: int, iv: int, ev: int, level: int, is_hp: bool = False, nature: int = 10) -> int:
+    """Standard stat formula; nature is the modifier in tenths (9, 10 or 11)"""
+    core = (2 * base + iv + ev // 4) * level // 100
+    if is_hp:
+        return core + level + 10
+    return (core + 5) * nature // 10
+
+
+def random_nature(rng: random.Random = random) -> str:
+    return rng.choice(tuple(NATURES))
+
+
+@lru_cache(maxsize=65536)
+def compute_stats(base_stats: Tuple[int, ...], level: int, ivs: Tuple[int, ...], evs: Tuple[int, ...],
+                  nature: Optional[str] = None) -> Tuple[int, ...]:
+    """All six stats in STATS order, memoized on (species base stats, level, IVs, EVs, nature)
+
+    Pass tuples so the arguments are hashable; unknown natures count as neutral.
+    """
+    raised, lowered = NATURES.get(nature, (None, None))
+    return tuple(
+        calculate_stat(base, iv, ev, level, stat == 'hp', 11 if stat == raised else 9 if stat == lowered else 10)
+        for stat, base, iv, ev in zip(STATS, base_stats, ivs, evs)
+    )
+
+
+def stats_for_row(row: Dict[str, Any], level: Optional[int] = None) -> Tuple[int, ...]:
+    """Stats for a player_pokemon row joined with its species base stats"""
+    return compute_stats(
+        tuple(row[f'base_{stat}'] for stat in STATS),
+        row['level'] if level is None else level,
+        tuple(row.get(f'{stat}_iv') or 0 for stat in STATS),
+        tuple(row.get(f'{stat}_ev') or 0 for stat in STATS),
+        row.get('nature')
+    )
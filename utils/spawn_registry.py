@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional, Any
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SpawnRegistry:
+    """Authoritative in-memory view of active spawns, keyed by channel ID"""
+
+    def __init__(self):
+        self.channels: Dict[str, List[Dict[str, Any]]] = {}
+        self.spawns: Dict[int, Dict[str, Any]] = {}
+
+    async def load(self, db):
+        """Rebuild the registry from the active_spawns table (startup only)"""
+        self.channels.clear()
+        self.spawns.clear()
+
+        for spawn in await db.get_all_active_spawns():
+            self.add(spawn)
+
+        # Rows that already expired are handled by the regular cleanup
+        self.prune_expired()
+        logger.info(f"Loaded {len(self.spawns)} active spawns in {len(self.channels)} channels")
+
+    def add(self, spawn: Dict[str, Any]):
+        """Register a new spawn; spawn must include spawn_id, channel_id and despawn_time"""
+        spawn = dict(spawn)
+        spawn['channel_id'] = str(spawn['channel_id'])
+        if isinstance(spawn.get('despawn_time'), str):
+            spawn['despawn_time'] = datetime.fromisoformat(spawn['despawn_time'])
+
+        self.spawns[spawn['spawn_id']] = spawn
+        self.channels.setdefault(spawn['channel_id'], []).append(spawn)
+
+    def remove(self, spawn_id: int) -> Optional[Dict[str, Any]]:
+        """Drop a spawn (caught or despawned); returns it if it was registered"""
+        spawn = self.spawns.pop(spawn_id, None)
+        if not spawn:
+            return None
+
+        channel_spawns = self.channels.get(spawn['channel_id'])
+        if channel_spawns is not None:
+            channel_spawns.remove(spawn)
+            if not channel_spawns:
+                del self.channels[spawn['channel_id']]
+
+        return spawn
+
+    def get(self, channel_id: str) -> List[Dict[str, Any]]:
+        """Active, unexpired spawns in a channel, oldest first"""
+        channel_spawns = self.channels.get(str(channel_id))
+        if not channel_spawns:
+            return []
+
+        now = datetime.now()
+        return [spawn for spawn in channel_spawns if not spawn.get('despawn_time') or spawn['despawn_time'] > now]
+
+    def count(self, channel_id: str) -> int:
+        """Number of active spawns in a channel"""
+        return len(self.get(channel_id))
+
+    def prune_expired(self) -> List[Dict[str, Any]]:
+        """Remove and return every spawn whose despawn time has passed"""
+        now = datetime.now()
+        expired = [
+            spawn for spawn in self.spawns.values()
+            if spawn.get('despawn_time') and spawn['despawn_time'] <= now
+        ]
+
+        for spawn in expired:
+            self.remove(spawn['spawn_id'])
+
+        return expired
+
+    def __len__(self) -> int:
+        return len(self.spawns)
@@ -0,0 +1,73 @@
+import aiohttp
+import asyncio
+import io
+from collections import OrderedDict
+from typing import Optional
+import logging
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+class SpawnRenderer:
+    """Downloads sprites and renders the black silhouettes shown on spawn messages"""
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self.session = None
+
+    async def close(self):
+        """Close the HTTP session"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def render_silhouette(self, sprite_url: Optional[str]) -> Optional[bytes]:
+        """PNG bytes of the sprite's silhouette, or None if it can't be fetched"""
+        if not sprite_url:
+            return None
+
+        if sprite_url in self.cache:
+            self.cache.move_to_end(sprite_url)
+            return self.cache[sprite_url]
+
+        try:
+            if self.session is None:
+                self.session = aiohttp.ClientSession()
+
+            async with self.session.get(sprite_url) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to fetch sprite {sprite_url}: {response.status}")
+                    return None
+                sprite = await response.read()
+
+            # Image work is CPU-bound; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            image = await loop.run_in_executor(None, self._silhouette, sprite)
+
+        except Exception as e:
+            logger.error(f"Error rendering silhouette for {sprite_url}: {e}")
+            return None
+
+        self.cache[sprite_url] = image
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+        return image
+
+    @staticmethod
+    def _silhouette(sprite: bytes) -> bytes:
+        """Paint every opaque pixel black, keeping the alpha channel"""
+        with Image.open(io.BytesIO(sprite)) as source:
+            alpha = source.convert('RGBA').getchannel('A')
+
+        silhouette = Image.new('RGBA', alpha.size, (0, 0, 0, 255))
+        silhouette.putalpha(alpha)
+
+        # Sprites are tiny; upscale so the shape reads in the embed
+        silhouette = silhouette.resize((alpha.width * 2, alpha.height * 2), Image.NEAREST)
+
+        output = io.BytesIO()
+        silhouette.save(output, format='PNG', optimize=True)
+        return output.getvalue()
@@ -0,0 +1,199 @@
+import random
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Which species categories each rarity tier draws from
+RARITY_CATEGORIES = {
+    'common': ['normal'],
+    'uncommon': ['normal'],
+    'rare': ['normal', 'legendary'],
+    'legendary': ['legendary'],
+    'mythical': ['mythical'],
+    'ultra_beast': ['ultra_beast']
+}
+
+# Highest national dex number that is allowed to spawn
+MAX_SPAWN_POKEMON_ID = 1008
+
+
+class AliasTable:
+    """Vose alias table for O(1) weighted sampling"""
+    __slots__ = ('items', 'prob', 'alias')
+
+    def __init__(self, items: List[Any], weights: List[float]):
+        total = float(sum(weights))
+        if not items or total <= 0:
+            raise ValueError("Alias table needs at least one positive weight")
+
+        count = len(items)
+        scaled = [w * count / total for w in weights]
+        prob = [0.0] * count
+        alias = [0] * count
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Whatever is left over is (up to float error) exactly 1.0
+        for i in large + small:
+            prob[i] = 1.0
+
+        self.items = items
+        self.prob = prob
+        self.alias = alias
+
+    def sample(self, rng: random.Random = random) -> Any:
+        """Draw one item in O(1)"""
+        column = int(rng.random() * len(self.items))
+        if rng.random() < self.prob[column]:
+            return self.items[column]
+        return self.items[self.alias[column]]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class SpawnSampler:
+    """Precompiled per-rarity spawn tables built from the species catalog"""
+
+    def __init__(self, config, category_weights: Dict[str, float]):
+        self.config = config
+        self.category_weights = category_weights
+
+        # (pokemon_id, category, generation) for every spawnable species
+        self.catalog: List[Tuple[int, str, Optional[int]]] = []
+        self.catalog_loaded = False
+
+        # Per-guild overrides: category_weights, generations, pokemon_weights
+        self.guild_overrides: Dict[str, Dict[str, Any]] = {}
+        # Global event override, applied on top of the guild settings
+        self.event_override: Optional[Dict[str, Any]] = None
+
+        # (guild scope, rarity) -> AliasTable, or None for an empty tier
+        self._tables: Dict[Tuple[Optional[str], str], Optional[AliasTable]] = {}
+
+    async def ensure_loaded(self, db):
+        """Load the species catalog once"""
+        if not self.catalog_loaded:
+            await self.refresh_catalog(db)
+
+    async def refresh_catalog(self, db):
+        """Reload the species catalog from the database and rebuild all tables"""
+        rows = await db.fetch_all(
+            "SELECT pokemon_id, category, generation FROM pokemon_species WHERE pokemon_id <= ?",
+            (MAX_SPAWN_POKEMON_ID,)
+        )
+        self.load_catalog((row['pokemon_id'], row['category'], row['generation']) for row in rows)
+
+    def load_catalog(self, entries: Iterable[Tuple[int, Optional[str], Optional[int]]]):
+        """Replace the species catalog with (pokemon_id, category, generation) entries and drop every compiled table
+
+        Takes plain tuples so a snapshot can feed its species columns in without building row dicts.
+        """
+        self.catalog = [
+            (pokemon_id, category or 'normal', generation)
+            for pokemon_id, category, generation in entries
+            if pokemon_id <= MAX_SPAWN_POKEMON_ID
+        ]
+        self.catalog_loaded = True
+        self.invalidate()
+        logger.info(f"Spawn sampler loaded {len(self.catalog)} species")
+
+    def invalidate(self):
+        """Drop compiled tables; call after changing weights or spawn config"""
+        self._tables.clear()
+
+    def set_guild_override(self, guild_id: str, category_weights: Optional[Dict[str, float]] = None,
+                           generations: Optional[List[int]] = None,
+                           pokemon_weights: Optional[Dict[int, float]] = None):
+        """Set per-guild spawn weights and generation filter"""
+        self.guild_overrides[str(guild_id)] = {
+            'category_weights': category_weights,
+            'generations': generations,
+            'pokemon_weights': pokemon_weights
+        }
+        self._drop_scope(str(guild_id))
+
+    def clear_guild_override(self, guild_id: str):
+        """Remove a guild's override so it uses the global tables again"""
+        if self.guild_overrides.pop(str(guild_id), None) is not None:
+            self._drop_scope(str(guild_id))
+
+    def set_event_override(self, category_weights: Optional[Dict[str, float]] = None,
+                           pokemon_weights: Optional[Dict[int, float]] = None):
+        """Start a global spawn event (multipliers on top of the normal weights)"""
+        self.event_override = {
+            'category_weights': category_weights,
+            'pokemon_weights': pokemon_weights
+        }
+        self.invalidate()
+
+    def clear_event_override(self):
+        """End the current spawn event"""
+        self.event_override = None
+        self.invalidate()
+
+    def pick(self, rarity: str, guild_id: Optional[str] = None, rng: random.Random = random) -> Optional[int]:
+        """Pick a Pokemon ID for the given rarity tier without touching the database"""
+        scope = str(guild_id) if guild_id is not None and str(guild_id) in self.guild_overrides else None
+        key = (scope, rarity)
+
+        if key not in self._tables:
+            self._tables[key] = self._build_table(scope, rarity)
+
+        table = self._tables[key]
+        return table.sample(rng) if table else None
+
+    def _drop_scope(self, scope: str):
+        for key in [k for k in self._tables if k[0] == scope]:
+            del self._tables[key]
+
+    def _build_table(self, scope: Optional[str], rarity: str) -> Optional[AliasTable]:
+        """Compile the alias table for one (guild, rarity) pair"""
+        categories = set(RARITY_CATEGORIES.get(rarity, ['normal']))
+        override = self.guild_overrides.get(scope, {}) if scope else {}
+
+        category_weights = dict(self.category_weights)
+        category_weights.update(override.get('category_weights') or {})
+
+        generations = override.get('generations') or getattr(self.config, 'spawn_generations', None)
+        generations = set(generations) if generations else None
+
+        pokemon_weights = override.get('pokemon_weights') or {}
+        event = self.event_override or {}
+        event_categories = event.get('category_weights') or {}
+        event_pokemon = event.get('pokemon_weights') or {}
+
+        items = []
+        weights = []
+        for pokemon_id, category, generation in self.catalog:
+            if category not in categories:
+                continue
+            if generations and generation not in generations:
+                continue
+
+            weight = category_weights.get(category, 0)
+            weight *= pokemon_weights.get(pokemon_id, 1)
+            weight *= event_categories.get(category, 1)
+            weight *= event_pokemon.get(pokemon_id, 1)
+
+            if weight > 0:
+                items.append(pokemon_id)
+                weights.append(weight)
+
+        if not items:
+            return None
+
+        return AliasTable(items, weights)
@@ -0,0 +1,120 @@
+from collections import deque
+from typing import Dict, List, Optional, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelActivity:
+    """Message counters and spawn budget for one channel"""
+    __slots__ = ('channel', 'guild_id', 'pending', 'window', 'window_total', 'tokens')
+
+    def __init__(self, channel, window_size: int):
+        self.channel = channel
+        guild = getattr(channel, 'guild', None)
+        self.guild_id = guild.id if guild else None
+        self.pending = 0
+        self.window = deque(maxlen=window_size)
+        self.window_total = 0
+        self.tokens = 0.0
+
+
+class SpawnScheduler:
+    """Decides spawns from per-channel activity instead of a per-message coin flip"""
+
+    def __init__(self, config, registry, window_size: int = 6, guild_settings=None):
+        self.config = config
+        self.registry = registry
+        self.guild_settings = guild_settings
+        self.window_size = window_size
+        self.channels: Dict[int, ChannelActivity] = {}
+        self.guild_tokens: Dict[Optional[int], float] = {}
+
+    def record_message(self, channel):
+        """Count a message; this is the only per-message work"""
+        state = self.channels.get(channel.id)
+        if state is None:
+            state = self.channels[channel.id] = ChannelActivity(channel, self.window_size)
+        state.pending += 1
+
+    def message_rate(self, channel_id: int) -> float:
+        """Messages per minute over the sliding window"""
+        state = self.channels.get(channel_id)
+        if not state or not state.window:
+            return 0.0
+        return state.window_total * 60.0 / (len(state.window) * self.config.spawn_tick_seconds)
+
+    def tick(self) -> List[Any]:
+        """Advance one interval; returns the channels that should spawn now"""
+        tick_seconds = self.config.spawn_tick_seconds
+        # Messages beyond this many per tick do not earn extra spawns
+        message_cap = self.config.spawn_message_cap * tick_seconds / 60.0
+        guild_refill = self.config.guild_spawns_per_minute * tick_seconds / 60.0
+
+        refilled = []
+        for guild_id in self.guild_tokens:
+            self.guild_tokens[guild_id] = min(
+                self.guild_tokens[guild_id] + guild_refill, self.config.guild_spawn_burst
+            )
+            if self.guild_tokens[guild_id] >= self.config.guild_spawn_burst:
+                refilled.append(guild_id)
+
+        # A full bucket is what a new guild starts with, so there is nothing to keep
+        for guild_id in refilled:
+            del self.guild_tokens[guild_id]
+
+        due = []
+        idle = []
+        for channel_id, state in self.channels.items():
+            # Slide the window forward by one bucket
+            if len(state.window) == state.window.maxlen:
+                state.window_total -= state.window[0]
+            state.window.append(state.pending)
+            state.window_total += state.pending
+
+            earned = min(state.pending, message_cap) * self.config.spawn_rate * self._multiplier(state)
+            state.pending = 0
+            state.tokens = min(state.tokens + earned, self.config.spawn_channel_burst)
+
+            if state.window_total == 0 and state.tokens < 1:
+                idle.append(channel_id)
+                continue
+
+            if state.tokens < 1:
+                continue
+
+            if state.guild_id not in self.guild_tokens:
+                self.guild_tokens[state.guild_id] = float(self.config.guild_spawn_burst)
+            if self.guild_tokens[state.guild_id] < 1:
+                continue
+
+            if self.registry.count(channel_id) >= self.config.max_spawns_per_channel:
+                continue
+
+            state.tokens -= 1
+            self.guild_tokens[state.guild_id] -= 1
+            due.append(state.channel)
+
+        # Forget channels that have gone quiet so memory tracks active channels only
+        for channel_id in idle:
+            del self.channels[channel_id]
+
+        return due
+
+    def refund(self, channel):
+        """Give back the channel and guild budget tick() spent on a spawn that didn't happen"""
+        state = self.channels.get(channel.id)
+        if state is None:
+            return
+        state.tokens = min(state.tokens + 1, self.config.spawn_channel_burst)
+        # A guild missing from guild_tokens already has a full bucket
+        if state.guild_id in self.guild_tokens:
+            self.guild_tokens[state.guild_id] = min(
+                self.guild_tokens[state.guild_id] + 1, self.config.guild_spawn_burst
+            )
+
+    def _multiplier(self, state: ChannelActivity) -> float:
+        """Per-guild spawn rate adjustment (0 when the guild disabled spawns)"""
+        if self.guild_settings is None:
+            return 1.0
+        return self.guild_settings.get(state.guild_id).spawn_multiplier
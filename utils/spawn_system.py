@@ -1,16 +1,39 @@
 import discord
 import random
 import asyncio
+import io
+from collections import OrderedDict
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import logging
 
+from utils.spawn_sampler import SpawnSampler
+from utils.spawn_registry import SpawnRegistry
+from utils.cooldowns import CooldownStore
+from utils.spawn_renderer import SpawnRenderer
+from utils.message_dispatcher import MessageDispatcher, PRIORITY_SPAWN, PRIORITY_FLAVOR
+from utils.guild_settings import GuildSettings, GuildSettingsCache
+
 logger = logging.getLogger(__name__)
 
+class PreparedSpawn:
+    """A channel's next spawn, rolled and rendered ahead of time"""
+    __slots__ = ('pokemon', 'is_shiny', 'embed', 'image')
+    
+    def __init__(self, pokemon: Dict, is_shiny: bool, embed: discord.Embed, image: Optional[bytes]):
+        self.pokemon = pokemon
+        self.is_shiny = is_shiny
+        self.embed = embed
+        self.image = image
+
 class SpawnSystem:
-    def __init__(self, db, config):
+    def __init__(self, db, config, bot=None, timers=None, dispatcher=None, guild_settings=None):
         self.db = db
         self.config = config
+        self.bot = bot
+        self.timers = timers
+        self.dispatcher = dispatcher or MessageDispatcher()
+        self.guild_settings = guild_settings or GuildSettingsCache(db)
         self.spawn_rates = {
             'common': 0.7,      # 70%
             'uncommon': 0.2,    # 20%
@@ -28,24 +51,122 @@ class SpawnSystem:
             'ultra_beast': 0.3
         }
         
+        # Precompiled alias tables over the species catalog
+        self.sampler = SpawnSampler(config, self.category_weights)
+        if getattr(config, 'spawn_event_weights', None):
+            self.sampler.set_event_override(category_weights=config.spawn_event_weights)
+        for guild_id, settings in self.guild_settings.settings.items():
+            self.apply_guild_settings(guild_id, settings)
+        self.guild_settings.listeners.append(self.apply_guild_settings)
+        
+        # In-memory active spawns, written through on create/catch/despawn
+        self.registry = SpawnRegistry()
+        
+        # Species rows are static, so fetch each one at most once
+        self.species_cache = {}
+        
         # Spawn cooldowns per channel
-        self.channel_cooldowns = {}
+        self.channel_cooldowns = CooldownStore('spawn', config.cooldown_max_entries)
         self.cooldown_time = 300  # 5 minutes
+        
+        # Next spawn per channel, so a trigger is just the send plus one insert
+        self.renderer = SpawnRenderer()
+        self.prepared: "OrderedDict[str, PreparedSpawn]" = OrderedDict()
+        self.max_prepared = 1000
+        self.preparing = set()  # Running _prepare_next tasks, held so they aren't garbage collected
+    
+    def apply_guild_settings(self, guild_id: str, settings: GuildSettings):
+        """Keep the guild's spawn tables in line with its settings (a GuildSettingsCache listener)"""
+        if settings.spawn_generations:
+            self.sampler.set_guild_override(guild_id, generations=list(settings.spawn_generations))
+        else:
+            self.sampler.clear_guild_override(guild_id)
     
     async def handle_spawn(self, channel: discord.TextChannel) -> bool:
-        """Handle Pokemon spawning in a channel"""
-        channel_id = 824750721990656061
+        """Handle Pokemon spawning for activity in a channel"""
+        guild = getattr(channel, 'guild', None)
+        settings = self.guild_settings.get(guild.id if guild else None)
+        if not settings.is_enabled('spawns'):
+            return False
+        
+        # Route to the guild's spawn channel when one is configured
+        if settings.spawn_channel_id and self.bot:
+            channel = self.bot.get_channel(int(settings.spawn_channel_id)) or channel
+        channel_id = str(channel.id)
         
         # Check cooldown
-        if channel_id in self.channel_cooldowns:
-            if datetime.now() < self.channel_cooldowns[channel_id]:
-                return False
+        if self.channel_cooldowns.is_active(channel_id):
+            return False
         
         # Check if channel has too many spawns
-        active_spawns = await self.db.get_active_spawns(channel_id)
-        if len(active_spawns) >= self.config.max_spawns_per_channel:
+        if self.registry.count(channel_id) >= self.config.max_spawns_per_channel:
+            return False
+        
+        prepared = self.prepared.pop(channel_id, None)
+        if prepared is None:
+            prepared = await self.prepare_spawn(str(guild.id) if guild else None)
+            if not prepared:
+                return False
+        
+        pokemon = prepared.pokemon
+        
+        # Send spawn message (ahead of anything else queued for the channel)
+        try:
+            if prepared.image:
+                message = await self.dispatcher.send(
+                    channel, PRIORITY_SPAWN, embed=prepared.embed,
+                    file=discord.File(io.BytesIO(prepared.image), filename='spawn.png')
+                )
+            else:
+                message = await self.dispatcher.send(channel, PRIORITY_SPAWN, embed=prepared.embed)
+        except Exception as e:
+            logger.error(f"Error sending spawn message: {e}")
             return False
         
+        # Create spawn
+        despawn_time = datetime.now() + timedelta(seconds=self.config.despawn_time)
+        spawn_id = await self.db.create_spawn(
+            channel_id, pokemon['pokemon_id'], prepared.is_shiny, despawn_time, str(message.id)
+        )
+        
+        if self.timers is not None:
+            self.timers.schedule_at(('spawn', spawn_id), despawn_time, self.expire_spawn, spawn_id)
+        
+        self.registry.add({
+            'spawn_id': spawn_id,
+            'channel_id': channel_id,
+            'pokemon_id': pokemon['pokemon_id'],
+            'is_shiny': prepared.is_shiny,
+            'despawn_time': despawn_time,
+            'is_caught': False,
+            'hint_used': False,
+            'message_id': str(message.id),
+            'name': pokemon['name'],
+            'type1': pokemon['type1'],
+            'type2': pokemon['type2'],
+            'sprite_url': pokemon['sprite_url'],
+            'shiny_sprite_url': pokemon['shiny_sprite_url'],
+            'category': pokemon['category'],
+            'base_hp': pokemon['base_hp'],
+            'base_attack': pokemon['base_attack'],
+            'base_defense': pokemon['base_defense'],
+            'base_sp_attack': pokemon['base_sp_attack'],
+            'base_sp_defense': pokemon['base_sp_defense'],
+            'base_speed': pokemon['base_speed']
+        })
+        
+        # Set cooldown
+        self.channel_cooldowns.set(channel_id, self.cooldown_time)
+        
+        # Roll and render the next one while the channel is on cooldown
+        task = asyncio.create_task(self._prepare_next(channel_id, channel))
+        self.preparing.add(task)
+        task.add_done_callback(self.preparing.discard)
+        
+        return True
+    
+    async def prepare_spawn(self, guild_id: Optional[str] = None) -> Optional[PreparedSpawn]:
+        """Roll species and shininess, and build the spawn embed and silhouette"""
         # Determine spawn rarity
         rarity_roll = random.random()
         cumulative = 0
@@ -58,119 +179,103 @@ class SpawnSystem:
                 break
         
         # Get Pokemon to spawn based on rarity
-        pokemon_id = await self._select_pokemon_for_spawn(selected_rarity)
+        pokemon_id = await self._select_pokemon_for_spawn(selected_rarity, guild_id)
         
         if not pokemon_id:
-            return False
+            return None
         
         # Determine if shiny
         is_shiny = random.random() < self.config.shiny_rate
         
-        # Create spawn
-        spawn_id = await self.db.create_spawn(channel_id, pokemon_id, is_shiny)
-        
-        # Send spawn message
-        await self._send_spawn_message(channel, spawn_id, pokemon_id, is_shiny)
+        pokemon = await self._get_species(pokemon_id)
+        if not pokemon:
+            return None
         
-        # Set cooldown
-        self.channel_cooldowns[channel_id] = datetime.now() + timedelta(seconds=self.cooldown_time)
+        image = await self.renderer.render_silhouette(pokemon['sprite_url'])
+        embed = self._build_spawn_embed(pokemon, is_shiny, image is not None)
         
-        return True
+        return PreparedSpawn(pokemon, is_shiny, embed, image)
     
-    async def _select_pokemon_for_spawn(self, rarity: str) -> Optional[int]:
-        """Select a Pokemon to spawn based on rarity"""
+    async def _prepare_next(self, channel_id, channel: discord.TextChannel):
+        """Fill a channel's prepared slot in the background"""
         try:
-            # Define rarity categories
-            rarity_categories = {
-                'common': ['normal'],
-                'uncommon': ['normal'],
-                'rare': ['normal', 'legendary'],
-                'legendary': ['legendary'],
-                'mythical': ['mythical'],
-                'ultra_beast': ['ultra_beast']
-            }
-            
-            categories = rarity_categories.get(rarity, ['normal'])
-            
-            # Build query based on categories
-            placeholders = ','.join('?' * len(categories))
-            query = f"""
-                SELECT pokemon_id FROM pokemon_species 
-                WHERE category IN ({placeholders}) 
-                AND pokemon_id <= 1008
-                ORDER BY RANDOM() 
-                LIMIT 1
-            """
-            
-            result = await self.db.fetch_one(query, tuple(categories))
+            guild = getattr(channel, 'guild', None)
+            prepared = await self.prepare_spawn(str(guild.id) if guild else None)
+            if not prepared:
+                return
             
-            return result['pokemon_id'] if result else None
+            self.prepared[channel_id] = prepared
+            self.prepared.move_to_end(channel_id)
+            if len(self.prepared) > self.max_prepared:
+                self.prepared.popitem(last=False)
+                
+        except Exception as e:
+            logger.error(f"Error preparing next spawn: {e}")
+    
+    async def _select_pokemon_for_spawn(self, rarity: str, guild_id: Optional[str] = None) -> Optional[int]:
+        """Select a Pokemon to spawn based on rarity"""
+        try:
+            await self.sampler.ensure_loaded(self.db)
+            return self.sampler.pick(rarity, guild_id)
             
         except Exception as e:
             logger.error(f"Error selecting Pokemon for spawn: {e}")
             return None
     
-    async def _send_spawn_message(self, channel: discord.TextChannel, spawn_id: int, pokemon_id: int, is_shiny: bool):
-        """Send a spawn message to the channel"""
-        try:
-            # Get Pokemon details
+    async def _get_species(self, pokemon_id: int) -> Optional[Dict]:
+        """Get a species row, cached after the first lookup"""
+        if pokemon_id not in self.species_cache:
             pokemon = await self.db.fetch_one(
                 "SELECT * FROM pokemon_species WHERE pokemon_id = ?",
                 (pokemon_id,)
             )
             
             if not pokemon:
-                return
+                return None
             
-            # Create embed
-            embed = discord.Embed(
-                title=f"A wild Pokemon appeared!",
-                description=f"Type the Pokemon's name to catch it!",
-                color=discord.Color.gold() if is_shiny else discord.Color.green()
-            )
-            
-            # Set Pokemon image
-            sprite_url = pokemon['shiny_sprite_url'] if is_shiny else pokemon['sprite_url']
-            if sprite_url:
-                embed.set_thumbnail(url=sprite_url)
-            
-            # Add Pokemon details
-            embed.add_field(name="Name", value="???", inline=True)
-            # Corrected line: removed the backslashes from the inner f-string
-            embed.add_field(name="Type", value=f"{pokemon['type1']}{'/' + pokemon['type2'] if pokemon['type2'] else ''}", inline=True)
-
-
-            
-            if is_shiny:
-                embed.add_field(name="Special", value="✨ Shiny ✨", inline=True)
-            
-            # Add rarity indicator
-            rarity_emoji = {
-                'normal': '⚪',
-                'legendary': '🟡',
-                'mythical': '🟣',
-                'ultra_beast': '🟠'
-            }
-            rarity = pokemon['category']
-            embed.set_footer(text=f"{rarity_emoji.get(rarity, '⚪')} {rarity.title()}")
-            
-            # Send message
-            message = await channel.send(embed=embed)
-            
-            # Store spawn message ID for updates
-            await self.db.execute(
-                "UPDATE active_spawns SET message_id = ? WHERE spawn_id = ?",
-                (str(message.id), spawn_id)
-            )
-            
-        except Exception as e:
-            logger.error(f"Error sending spawn message: {e}")
+            self.species_cache[pokemon_id] = pokemon
+        
+        return self.species_cache[pokemon_id]
+    
+    def _build_spawn_embed(self, pokemon: Dict, is_shiny: bool, silhouette: bool) -> discord.Embed:
+        """Build the embed for a spawn message"""
+        embed = discord.Embed(
+            title=f"A wild Pokemon appeared!",
+            description=f"Type the Pokemon's name to catch it!",
+            color=discord.Color.gold() if is_shiny else discord.Color.green()
+        )
+        
+        # Set Pokemon image, falling back to the sprite when no silhouette was rendered
+        sprite_url = pokemon['shiny_sprite_url'] if is_shiny else pokemon['sprite_url']
+        if silhouette:
+            embed.set_image(url="attachment://spawn.png")
+        elif sprite_url:
+            embed.set_thumbnail(url=sprite_url)
+        
+        # Add Pokemon details
+        embed.add_field(name="Name", value="???", inline=True)
+        embed.add_field(name="Type", value=f"{pokemon['type1']}{'/' + pokemon['type2'] if pokemon['type2'] else ''}", inline=True)
+        
+        if is_shiny:
+            embed.add_field(name="Special", value="✨ Shiny ✨", inline=True)
+        
+        # Add rarity indicator
+        rarity_emoji = {
+            'normal': '⚪',
+            'legendary': '🟡',
+            'mythical': '🟣',
+            'ultra_beast': '🟠'
+        }
+        rarity = pokemon['category']
+        embed.set_footer(text=f"{rarity_emoji.get(rarity, '⚪')} {rarity.title()}")
+        
+        return embed
     
     async def handle_hint_request(self, channel: discord.TextChannel, user: discord.User) -> bool:
         """Handle hint request for Pokemon spawning"""
         try:
             channel_id = str(channel.id)
-            active_spawns = await self.db.get_active_spawns(channel_id)
+            active_spawns = self.registry.get(channel_id)
             
             if not active_spawns:
                 return False
@@ -178,17 +283,8 @@ class SpawnSystem:
             # Get the oldest active spawn
             spawn = active_spawns[0]
             
-            # Get Pokemon details
-            pokemon = await self.db.fetch_one(
-                "SELECT * FROM pokemon_species WHERE pokemon_id = ?",
-                (spawn['pokemon_id'],)
-            )
-            
-            if not pokemon:
-                return False
-            
             # Generate hint
-            hint = self._generate_pokemon_hint(pokemon['name'])
+            hint = self._generate_pokemon_hint(spawn['name'])
             
             # Create hint embed
             embed = discord.Embed(
@@ -200,9 +296,10 @@ class SpawnSystem:
             embed.add_field(name="Hint", value=hint, inline=False)
             embed.set_footer(text=f"Requested by {user.display_name}")
             
-            await channel.send(embed=embed, delete_after=30)
+            self.dispatcher.send(channel, PRIORITY_FLAVOR, embed=embed, delete_after=30)
             
             # Mark hint as used
+            spawn['hint_used'] = True
             await self.db.execute(
                 "UPDATE active_spawns SET hint_used = TRUE WHERE spawn_id = ?",
                 (spawn['spawn_id'],)
@@ -258,7 +355,7 @@ class SpawnSystem:
         """Handle Pokemon catching attempt"""
         try:
             channel_id = str(message.channel.id)
-            active_spawns = await self.db.get_active_spawns(channel_id)
+            active_spawns = self.registry.get(channel_id)
             
             if not active_spawns:
                 return False
@@ -266,49 +363,32 @@ class SpawnSystem:
             # Get the oldest active spawn
             spawn = active_spawns[0]
             
-            # Get Pokemon details
-            pokemon = await self.db.fetch_one(
-                "SELECT * FROM pokemon_species WHERE pokemon_id = ?",
-                (spawn['pokemon_id'],)
-            )
-            
-            if not pokemon:
-                return False
-            
             # Check if the message contains the Pokemon name
             message_content = message.content.lower()
-            pokemon_name = pokemon['name'].lower()
+            pokemon_name = spawn['name'].lower()
             
             if pokemon_name not in message_content and message_content not in pokemon_name:
                 return False
             
-            # Get or create user
-            user = await self.db.get_or_create_user(str(message.author.id), message.author.display_name)
+            # Claim the spawn, add the Pokemon and grant rewards in one transaction
+            caught = await self.db.catch_spawn(
+                spawn, str(message.author.id), message.author.display_name,
+                self.config.catch_credits, self.config.catch_exp
+            )
             
-            # Catch the Pokemon
-            success = await self.db.catch_spawn(spawn['spawn_id'], user['user_id'])
+            # Caught here or by someone else first, either way it's gone
+            self.registry.remove(spawn['spawn_id'])
             
-            if success:
-                # Add to user's collection
-                pokemon_uid = await self.db.add_pokemon_to_user(
-                    user['user_id'],
-                    spawn['pokemon_id'],
-                    is_shiny=spawn['is_shiny']
-                )
-                
-                # Update user stats
-                await self.db.update_user_credits(user['user_id'], self.config.catch_credits)
-                await self.db.update_user_exp(user['user_id'], self.config.catch_exp)
-                
+            if caught:
                 # Send success message
                 embed = discord.Embed(
                     title="🎉 Pokemon Caught!",
-                    description=f"**{message.author.display_name}** caught a{' shiny ' if spawn['is_shiny'] else ' '}{pokemon['name']}!",
+                    description=f"**{message.author.display_name}** caught a{' shiny ' if spawn['is_shiny'] else ' '}{spawn['name']}!",
                     color=discord.Color.gold() if spawn['is_shiny'] else discord.Color.green()
                 )
                 
-                if pokemon['sprite_url']:
-                    sprite_url = pokemon['shiny_sprite_url'] if spawn['is_shiny'] else pokemon['sprite_url']
+                if spawn['sprite_url']:
+                    sprite_url = spawn['shiny_sprite_url'] if spawn['is_shiny'] else spawn['sprite_url']
                     embed.set_thumbnail(url=sprite_url)
                 
                 embed.add_field(name="Credits Earned", value=f"+{self.config.catch_credits}", inline=True)
@@ -317,15 +397,10 @@ class SpawnSystem:
                 # Show Pokemon stats
                 embed.add_field(name="Level", value="5", inline=True)
                 # Corrected line: removed the backslashes from the inner f-string
-                embed.add_field(name="Type", value=f"{pokemon['type1']}{'/' + pokemon['type2'] if pokemon['type2'] else ''}", inline=True)
-
-
-
-                
-                await message.channel.send(embed=embed)
+                embed.add_field(name="Type", value=f"{spawn['type1']}{'/' + spawn['type2'] if spawn['type2'] else ''}", inline=True)
                 
-                # Update mission progress
-                # This would integrate with the mission system
+                # Catches landing together go out as one message
+                self.dispatcher.announce_catch(message.channel, embed)
                 
                 return True
             
@@ -335,53 +410,49 @@ class SpawnSystem:
             logger.error(f"Error handling catch attempt: {e}")
             return False
     
-    async def cleanup_expired_spawns(self):
-        """Clean up expired spawns"""
+    async def schedule_despawns(self):
+        """Schedule despawn timers for every spawn row (startup)"""
+        for row in await self.db.get_spawn_expiries():
+            despawn_time = row['despawn_time']
+            if isinstance(despawn_time, str):
+                despawn_time = datetime.fromisoformat(despawn_time)
+            self.timers.schedule_at(('spawn', row['spawn_id']), despawn_time or datetime.now(), self.expire_spawn, row['spawn_id'])
+    
+    async def expire_spawn(self, spawn_id: int):
+        """Despawn a Pokemon when its timer fires"""
         try:
-            # Get expired spawns
-            expired_spawns = await self.db.fetch_all("""
-                SELECT * FROM active_spawns 
-                WHERE despawn_time < datetime('now') AND is_caught = FALSE
-            """)
+            # Still registered means nobody caught it
+            spawn = self.registry.remove(spawn_id)
             
-            for spawn in expired_spawns:
+            if spawn and spawn.get('message_id') and self.bot:
                 # Try to find the original message and update it
                 try:
-                    if spawn.get('message_id'):
-                        # This assumes self.bot exists, which isn't defined in SpawnSystem __init__
-                        # but likely defined when SpawnSystem is instantiated in bot.py
-                        channel = self.bot.get_channel(int(spawn['channel_id']))
-                        if channel:
-                            message = await channel.fetch_message(int(spawn['message_id']))
-                            
-                            # Create despawn embed
-                            embed = discord.Embed(
-                                title="The Pokemon fled!",
-                                description="The wild Pokemon got away...",
-                                color=discord.Color.red()
-                            )
-                            
-                            await message.edit(embed=embed)
-                            
+                    channel = self.bot.get_channel(int(spawn['channel_id']))
+                    if channel:
+                        message = channel.get_partial_message(int(spawn['message_id']))
+                        
+                        # Create despawn embed
+                        embed = discord.Embed(
+                            title="The Pokemon fled!",
+                            description="The wild Pokemon got away...",
+                            color=discord.Color.red()
+                        )
+                        
+                        self.dispatcher.edit(message, embed=embed)
+                        
                 except Exception as e:
                     logger.error(f"Error updating despawn message: {e}")
-                
-                # Remove from database
-                await self.db.execute(
-                    "DELETE FROM active_spawns WHERE spawn_id = ?",
-                    (spawn['spawn_id'],)
-                )
             
-            if expired_spawns:
-                logger.info(f"Cleaned up {len(expired_spawns)} expired spawns")
-                
+            # Remove from database (caught spawns are kept until now as well)
+            await self.db.delete_spawn(spawn_id)
+            
         except Exception as e:
-            logger.error(f"Error cleaning up expired spawns: {e}")
+            logger.error(f"Error expiring spawn {spawn_id}: {e}")
     
     async def get_spawn_stats(self, channel_id: str) -> Dict[str, any]:
         """Get spawn statistics for a channel"""
         try:
-            active_spawns = await self.db.get_active_spawns(channel_id)
+            active_spawns = self.registry.get(channel_id)
             
             stats = {
                 'active_spawns': len(active_spawns),
@@ -389,20 +460,14 @@ class SpawnSystem:
             }
             
             for spawn in active_spawns:
-                pokemon = await self.db.fetch_one(
-                    "SELECT * FROM pokemon_species WHERE pokemon_id = ?",
-                    (spawn['pokemon_id'],)
-                )
-                
-                if pokemon:
-                    stats['spawn_list'].append({
-                        'name': pokemon['name'],
-                        'is_shiny': spawn['is_shiny'],
-                        'type1': pokemon['type1'],
-                        'type2': pokemon['type2'],
-                        'category': pokemon['category'],
-                        'time_remaining': (datetime.fromisoformat(spawn['despawn_time']) - datetime.now()).total_seconds()
-                    })
+                stats['spawn_list'].append({
+                    'name': spawn['name'],
+                    'is_shiny': spawn['is_shiny'],
+                    'type1': spawn['type1'],
+                    'type2': spawn['type2'],
+                    'category': spawn['category'],
+                    'time_remaining': (spawn['despawn_time'] - datetime.now()).total_seconds()
+                })
             
             return stats
             
@@ -0,0 +1,155 @@
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Any, Callable, Hashable, Set
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    """One scheduled callback"""
+    __slots__ = ('key', 'deadline', 'callback', 'args', 'bucket')
+
+    def __init__(self, key: Hashable, deadline: int, callback: Callable, args: tuple):
+        self.key = key
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.bucket: Optional[Set['Timer']] = None
+
+
+class TimerWheel:
+    """Hierarchical timing wheel with O(1) insert and cancel, measured in ticks"""
+
+    def __init__(self, slot_bits: int = 6, levels: int = 4):
+        self.slot_bits = slot_bits
+        self.slot_count = 1 << slot_bits
+        self.mask = self.slot_count - 1
+        self.span = 1 << (slot_bits * levels)
+        self.levels: List[List[Set[Timer]]] = [
+            [set() for _ in range(self.slot_count)] for _ in range(levels)
+        ]
+        self.current = 0
+
+    def insert(self, timer: Timer):
+        """Place a timer whose deadline is at or after the current tick"""
+        delta = timer.deadline - self.current
+        # Deadlines past the top level park in its furthest slot and are re-placed on cascade
+        target = timer.deadline if delta < self.span else self.current + self.span - 1
+        delta = target - self.current
+
+        level = 0
+        while level < len(self.levels) - 1 and delta >= 1 << (self.slot_bits * (level + 1)):
+            level += 1
+
+        slot = (target >> (self.slot_bits * level)) & self.mask
+        bucket = self.levels[level][slot]
+        bucket.add(timer)
+        timer.bucket = bucket
+
+    def remove(self, timer: Timer):
+        """Cancel a timer"""
+        if timer.bucket is not None:
+            timer.bucket.discard(timer)
+            timer.bucket = None
+
+    def advance(self) -> List[Timer]:
+        """Move forward one tick and return the timers that are due"""
+        self.current += 1
+
+        # Cascade higher levels whose slot boundary we just crossed
+        for level in range(1, len(self.levels)):
+            if self.current & ((1 << (self.slot_bits * level)) - 1):
+                break
+            slot = (self.current >> (self.slot_bits * level)) & self.mask
+            bucket = self.levels[level][slot]
+            self.levels[level][slot] = set()
+            for timer in bucket:
+                self.insert(timer)
+
+        slot = self.current & self.mask
+        due = self.levels[0][slot]
+        self.levels[0][slot] = set()
+        for timer in due:
+            timer.bucket = None
+        return list(due)
+
+
+class TimerService:
+    """In-process scheduler for expiries (despawns, listings, trades, battles)"""
+
+    def __init__(self, resolution: float = 1.0):
+        self.resolution = resolution
+        self.wheel = TimerWheel()
+        self.timers: Dict[Hashable, Timer] = {}
+        self._started_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self.running: Set[asyncio.Task] = set()  # Coroutine callbacks in flight, held so they aren't garbage collected
+
+    def start(self):
+        """Start ticking on the running event loop"""
+        if self._task is None:
+            self._started_at = time.monotonic() - self.wheel.current * self.resolution
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop ticking; pending timers are kept"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable, *args: Any):
+        """Run callback(*args) after delay seconds, replacing any timer with the same key"""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.resolution))
+        timer = Timer(key, self.wheel.current + ticks, callback, args)
+        self.wheel.insert(timer)
+        self.timers[key] = timer
+
+    def schedule_at(self, key: Hashable, when: datetime, callback: Callable, *args: Any):
+        """Run callback(*args) at a (naive, local) wall-clock time"""
+        self.schedule(key, (when - datetime.now()).total_seconds(), callback, *args)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel a pending timer; returns True if one was pending"""
+        timer = self.timers.pop(key, None)
+        if timer is None:
+            return False
+        self.wheel.remove(timer)
+        return True
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.timers
+
+    def __len__(self) -> int:
+        return len(self.timers)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.resolution)
+            self.advance_to(int((time.monotonic() - self._started_at) / self.resolution))
+
+    def advance_to(self, tick: int):
+        """Fire everything due up to and including tick"""
+        while self.wheel.current < tick:
+            for timer in self.wheel.advance():
+                if self.timers.get(timer.key) is timer:
+                    del self.timers[timer.key]
+                self._fire(timer)
+
+    def _fire(self, timer: Timer):
+        try:
+            result = timer.callback(*timer.args)
+            if asyncio.iscoroutine(result):
+                task = asyncio.create_task(result)
+                self.running.add(task)
+                task.add_done_callback(self._finished)
+        except Exception as e:
+            logger.error(f"Error running timer {timer.key}: {e}")
+
+    def _finished(self, task: asyncio.Task):
+        self.running.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error running timer callback: {task.exception()}")
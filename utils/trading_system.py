@@ -5,15 +5,20 @@ from typing import Dict, List, Optional
 logger = logging.getLogger(__name__)
 
 class TradingSystem:
-    def __init__(self, db, config):
+    def __init__(self, db, config, timers=None):
         self.db = db
         self.config = config
+        self.timers = timers
         self.active_trades = {}
     
     async def create_trade(self, initiator_id: int, recipient_id: int) -> int:
         """Create a new trade"""
         try:
             trade_id = await self.db.create_trade(initiator_id, recipient_id)
+            
+            if self.timers is not None:
+                self.timers.schedule(('trade', trade_id), self.config.trade_timeout, self.expire_trade, trade_id)
+            
             return trade_id
         except Exception as e:
             logger.error(f"Error creating trade: {e}")
@@ -59,6 +64,10 @@ class TradingSystem:
                 (trade_id,)
             )
             
+            if self.timers is not None:
+                self.timers.cancel(('trade', trade_id))
+            self.active_trades.pop(trade_id, None)
+            
             return {
                 'success': True,
                 'trade_id': trade_id,
@@ -79,7 +88,20 @@ class TradingSystem:
                 "UPDATE trades SET status = 'cancelled' WHERE trade_id = ?",
                 (trade_id,)
             )
+            
+            if self.timers is not None:
+                self.timers.cancel(('trade', trade_id))
+            self.active_trades.pop(trade_id, None)
             return True
         except Exception as e:
             logger.error(f"Error cancelling trade: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    async def expire_trade(self, trade_id: int):
+        """Cancel a trade that hit trade_timeout while still pending"""
+        try:
+            if await self.db.expire_trade(trade_id):
+                logger.info(f"Trade {trade_id} timed out")
+            self.active_trades.pop(trade_id, None)
+        except Exception as e:
+            logger.error(f"Error expiring trade: {e}")
\ No newline at end of file
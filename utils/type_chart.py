@@ -0,0 +1,75 @@
+"""Type effectiveness chart shared by the battle system and reference data tools"""
+
+from typing import Optional
+
+# Attacking type -> defending type -> multiplier (missing entries are 1x)
+TYPE_EFFECTIVENESS = {
+    'Normal': {'Rock': 0.5, 'Ghost': 0, 'Steel': 0.5},
+    'Fire': {'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 2, 'Bug': 2, 'Rock': 0.5, 'Dragon': 0.5, 'Steel': 2},
+    'Water': {'Fire': 2, 'Water': 0.5, 'Grass': 0.5, 'Ground': 2, 'Rock': 2, 'Dragon': 0.5},
+    'Electric': {'Water': 2, 'Electric': 0.5, 'Grass': 0.5, 'Ground': 0, 'Flying': 2, 'Dragon': 0.5},
+    'Grass': {'Fire': 0.5, 'Water': 2, 'Grass': 0.5, 'Poison': 0.5, 'Ground': 2, 'Flying': 0.5, 'Bug': 0.5, 'Rock': 2, 'Dragon': 0.5, 'Steel': 0.5},
+    'Ice': {'Fire': 0.5, 'Water': 0.5, 'Grass': 2, 'Ice': 0.5, 'Ground': 2, 'Flying': 2, 'Dragon': 2, 'Steel': 0.5},
+    'Fighting': {'Normal': 2, 'Ice': 2, 'Poison': 0.5, 'Flying': 0.5, 'Psychic': 0.5, 'Bug': 0.5, 'Rock': 2, 'Ghost': 0, 'Dark': 2, 'Steel': 2, 'Fairy': 0.5},
+    'Poison': {'Grass': 2, 'Poison': 0.5, 'Ground': 0.5, 'Rock': 0.5, 'Ghost': 0.5, 'Steel': 0, 'Fairy': 2},
+    'Ground': {'Fire': 2, 'Electric': 2, 'Grass': 0.5, 'Poison': 2, 'Flying': 0, 'Bug': 0.5, 'Rock': 2, 'Steel': 2},
+    'Flying': {'Electric': 0.5, 'Grass': 2, 'Fighting': 2, 'Bug': 2, 'Rock': 0.5, 'Steel': 0.5},
+    'Psychic': {'Fighting': 2, 'Poison': 2, 'Psychic': 0.5, 'Dark': 0, 'Steel': 0.5},
+    'Bug': {'Fire': 0.5, 'Grass': 2, 'Fighting': 0.5, 'Poison': 0.5, 'Flying': 0.5, 'Psychic': 2, 'Ghost': 0.5, 'Dark': 2, 'Steel': 0.5, 'Fairy': 0.5},
+    'Rock': {'Fire': 2, 'Ice': 2, 'Fighting': 0.5, 'Ground': 0.5, 'Flying': 2, 'Bug': 2, 'Steel': 0.5},
+    'Ghost': {'Normal': 0, 'Psychic': 2, 'Ghost': 2, 'Dark': 0.5},
+    'Dragon': {'Dragon': 2, 'Steel': 0.5, 'Fairy': 0},
+    'Dark': {'Fighting': 0.5, 'Psychic': 2, 'Ghost': 2, 'Dark': 0.5, 'Fairy': 0.5},
+    'Steel': {'Fire': 0.5, 'Water': 0.5, 'Electric': 0.5, 'Ice': 2, 'Rock': 2, 'Steel': 0.5, 'Fairy': 2},
+    'Fairy': {'Fire': 0.5, 'Fighting': 2, 'Poison': 0.5, 'Dragon': 2, 'Dark': 2, 'Steel': 0.5}
+}
+
+# Canonical type order, used wherever types are stored by index
+TYPES = list(TYPE_EFFECTIVENESS.keys())
+
+# Types interned to small ints; lowercase names (as some callers store them) map to the same id
+TYPE_IDS = {name: index for index, name in enumerate(TYPES)}
+TYPE_IDS.update({name.lower(): index for index, name in enumerate(TYPES)})
+TYPE_COUNT = len(TYPES)
+
+# Flat TYPE_COUNT x TYPE_COUNT chart: EFFECTIVENESS[attacking * TYPE_COUNT + defending]
+EFFECTIVENESS = tuple(
+    float(TYPE_EFFECTIVENESS[attacker].get(defender, 1.0)) for attacker in TYPES for defender in TYPES
+)
+
+# Every defensive typing: the single types first, then each unordered pair (18 + 153 = 171)
+DEFENSIVE_TYPINGS = tuple(
+    [(first, None) for first in range(TYPE_COUNT)] +
+    [(first, second) for first in range(TYPE_COUNT) for second in range(first + 1, TYPE_COUNT)]
+)
+DEFENSIVE_COUNT = len(DEFENSIVE_TYPINGS)
+_TYPING_INDEX = {typing: index for index, typing in enumerate(DEFENSIVE_TYPINGS)}
+
+# Flat TYPE_COUNT x DEFENSIVE_COUNT chart: DUAL_EFFECTIVENESS[attacking * DEFENSIVE_COUNT + typing]
+DUAL_EFFECTIVENESS = tuple(
+    EFFECTIVENESS[attacker * TYPE_COUNT + first] *
+    (EFFECTIVENESS[attacker * TYPE_COUNT + second] if second is not None else 1.0)
+    for attacker in range(TYPE_COUNT) for first, second in DEFENSIVE_TYPINGS
+)
+
+
+def type_id(name: Optional[str]) -> Optional[int]:
+    """Interned id for a type name, None if unknown"""
+    return TYPE_IDS.get(name) if name else None
+
+
+def typing_index(type1: Optional[str], type2: Optional[str] = None) -> Optional[int]:
+    """Row of DEFENSIVE_TYPINGS for a Pokemon's types, None if the primary type is unknown"""
+    first, second = type_id(type1), type_id(type2)
+    if first is None:
+        return None
+    if second is None or second == first:
+        return first
+    return _TYPING_INDEX[(min(first, second), max(first, second))]
+
+
+def matchup(attacking_id: Optional[int], defending_index: Optional[int]) -> float:
+    """Multiplier for an attacking type id against a typing index; unknowns are neutral"""
+    if attacking_id is None or defending_index is None:
+        return 1.0
+    return DUAL_EFFECTIVENESS[attacking_id * DEFENSIVE_COUNT + defending_index]